@@ -23,11 +23,26 @@ class Screen(object):
         # by default...
         self.return_screen = self
 
+        # the screen is only rendered again when something might have changed
+        self.render_requested = True
+
     def prepare_screen(self):
         # always return to itself by default
         self.return_screen = self
+        self.render_requested = True
+
+    def request_render(self):
+        # for changes that do not come from events (e.g. background tasks)
+        self.render_requested = True
+
+    def needs_render(self):
+        return self.render_requested or self.elements.is_animated()
 
     def handle_events(self, event_list):
+        # any event might change the controls (or the window might need to be drawn again)
+        if len(event_list) > 0:
+            self.render_requested = True
+
         # handle all events...
         for event in event_list:
             if event.type == pygame.QUIT:
@@ -43,4 +58,5 @@ class Screen(object):
 
     def render(self, background):
         # render all controls
+        self.render_requested = False
         self.elements.render(background, 0, 0)
@@ -492,15 +492,17 @@ class ScreenCanvasPointSet(ScreenCanvasElement):
         if not self.visible:
             return -1
 
-        offset_points = (self.points + np.array([[off_x, off_y]])).tolist()
+        offset_points = (self.points + np.array([[off_x, off_y]]))
 
         half = hl_size / 2
 
-        # against any highlighted point
-        for idx, (x, y) in enumerate(offset_points):
-            if (x - half <= px <= x + half) and (y - half <= py <= y + half):
-                # the index of the point being dragged + 1
-                return 1 + idx
+        # against any highlighted point (all points at once, the first one found is used)
+        all_x = offset_points[:, 0]
+        all_y = offset_points[:, 1]
+        inside = (all_x - half <= px) & (px <= all_x + half) & (all_y - half <= py) & (py <= all_y + half)
+        if inside.any():
+            # the index of the point being dragged + 1
+            return 1 + int(np.argmax(inside))
 
         # there is no intersection or edge dragging for point set  ...
         # so, at the moment there is no way to define drag type 0 (move everything)
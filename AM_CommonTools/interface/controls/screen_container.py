@@ -53,6 +53,10 @@ class ScreenContainer(ScreenElement):
         
         self.text_focus = None
         
+        # called before rendering when the visible area of the contents changes (if set)
+        self.viewport_callback = None
+        self.last_viewport = None
+        
     def set_text_focus(self, focus_reference):
         if self.parent is None:
             # the case of the root container...
@@ -67,6 +71,23 @@ class ScreenContainer(ScreenElement):
             return self.parent.set_text_focus( focus_reference )
 
         
+    def is_animated(self):
+        if not self.visible:
+            return False
+        
+        for element in self.elements:
+            if element.visible and element.is_animated():
+                return True
+        
+        return False
+        
+    def get_viewport(self):
+        # visible area of the contents (x, y, width, height) using the same offsets used for rendering
+        if self.h_scroll.active or self.v_scroll.active:
+            return (self.h_scroll.value, self.v_scroll.value, self.width, self.height)
+        else:
+            return (0, 0, self.width, self.height)
+        
     def v_scroll_changed(self, scroll):
         pass
     
@@ -338,6 +359,13 @@ class ScreenContainer(ScreenElement):
             # not visible equal not rendering
             return
                                 
+        # let the owner update the contents of the visible area first (if needed)
+        if self.viewport_callback is not None:
+            viewport = self.get_viewport()
+            if viewport != self.last_viewport:
+                self.last_viewport = viewport
+                self.viewport_callback(self, viewport)
+        
         # clean buffer...
         self.container_buffer.fill( self.back_color )
         
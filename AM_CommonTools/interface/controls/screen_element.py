@@ -20,6 +20,10 @@ class ScreenElement:
         self.mouse_button_down_callback = None
 
 
+    def is_animated(self):
+        # True for elements that change over time (they must be rendered on every frame while visible)
+        return False
+
     def get_left(self):
         return self.position[0]
     
@@ -14,6 +14,10 @@ class ScreenImage(ScreenElement):
         self.border_color = (0, 0, 0)
         
         self.click_callback = None
+        
+        # RGB pixels shared with the surface (uint8 images only), re-used while the size does not change
+        self.surface_buffer = None
+        self.image_surface = None
                 
         self.set_image(image, width, height, keep_aspect, interpolation)
         
@@ -54,6 +58,13 @@ class ScreenImage(ScreenElement):
                 interpolation = cv2.INTER_LINEAR
             self.image = cv2.resize( self.image, (self.width, self.height),interpolation=interpolation)
         
+        if self.image.dtype == np.uint8 and (len(self.image.shape) == 2 or self.image.shape[2] == 3):
+            #copy the pixels to the buffer of the surface (gray scale images are copied on R, G and B)...
+            self.update_surface_buffer()
+            return
+        
+        self.surface_buffer = None
+        
         if len(self.image.shape) == 2:
             #A Grayscale image.... create a 24-bit version of the same image...
             new_img = np.zeros( (self.image.shape[0], self.image.shape[1], 3) )
@@ -65,8 +76,32 @@ class ScreenImage(ScreenElement):
             
         #now, create the surface...
         self.image_surface = pygame.surfarray.make_surface(np.transpose( self.image, (1,0,2) ) )
+        
+    def update_surface_buffer(self):
+        height, width = self.image.shape[:2]
+        
+        if self.surface_buffer is None or self.surface_buffer.shape[:2] != (height, width):
+            #new size, the surface uses the new buffer directly (no copies when rendering)...
+            self.surface_buffer = np.zeros((height, width, 3), dtype=np.uint8)
+            self.image_surface = pygame.image.frombuffer(self.surface_buffer, (width, height), "RGB")
+            
+        if len(self.image.shape) == 2:
+            cv2.cvtColor(self.image, cv2.COLOR_GRAY2RGB, dst=self.surface_buffer)
+        else:
+            np.copyto(self.surface_buffer, self.image)
 
     def update_image_region(self, new_region, region_pos):
+        if self.surface_buffer is not None and not isinstance(new_region, pygame.Surface) and \
+           new_region.dtype == np.uint8 and len(new_region.shape) == 3 and new_region.shape[2] == 3:
+            #copy directly to the buffer of the surface (clipped to the image) ...
+            x, y = int(region_pos[0]), int(region_pos[1])
+            x1, y1 = max(x, 0), max(y, 0)
+            x2 = min(x + new_region.shape[1], self.surface_buffer.shape[1])
+            y2 = min(y + new_region.shape[0], self.surface_buffer.shape[0])
+            if x1 < x2 and y1 < y2:
+                self.surface_buffer[y1:y2, x1:x2] = new_region[y1 - y:y2 - y, x1 - x:x2 - x]
+            return
+        
         if not isinstance(new_region, pygame.Surface):
             new_region = pygame.surfarray.make_surface(np.transpose(new_region, (1,0,2)))
 
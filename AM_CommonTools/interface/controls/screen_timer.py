@@ -33,6 +33,10 @@ class ScreenTimer(ScreenElement):
         # store for next cycle
         self.last_time = current_time
 
+    def is_animated(self):
+        # the timer is checked when rendering
+        return self.enabled
+
     def stop_timer(self):
         self.enabled = False
         self.accumulated_time = 0.0
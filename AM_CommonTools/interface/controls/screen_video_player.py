@@ -90,6 +90,10 @@ class ScreenVideoPlayer(ScreenElement):
         self.render_location = (self.position[0] + (self.width - render_width) / 2,
                                 self.position[1] + (self.height - render_height) / 2)
 
+    def is_animated(self):
+        # frames of the video are read when rendering
+        return self.video_player is not None
+
     def play(self):
         self.video_player.play()
 
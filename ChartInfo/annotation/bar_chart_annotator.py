@@ -30,14 +30,10 @@ class BarChartAnnotator(BaseImageAnnotator):
     AutoBarColorVariance = 1
     AutoBarLegendColorAlignment = 2
 
-    def __init__(self, size, panel_image, panel_info, parent_screen):
+    def __init__(self, size, panel_image, panel_info, parent_screen, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Bar Chart Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
         self.panel_info = panel_info
 
@@ -664,79 +660,26 @@ class BarChartAnnotator(BaseImageAnnotator):
             # assume they start at the left
             bar_baseline = x1
 
-        current_lines = []
-        self.tempo_red_lines = []
-        self.tempo_green_lines = []
-        self.tempo_bar_polygon_index = []
-
-        if self.data.bar_grouping == BarData.GroupingByCategory:
-            # bar are grouped by categorical value ...
-            for cat_idx, category in enumerate(self.data.categories):
-                for group_idx, group in enumerate(self.data.bar_sorting.order):
-                    bar_end = bar_start + bar_width
-
-                    # add stacked bars ...
-                    polygons, polygon_index = BarData.get_stacked_bar_lines(self.data.bar_vertical, cat_idx, group,
-                                                                            bar_lengths, bar_baseline, bar_start,
-                                                                            bar_end)
-
-                    # For drawing ...
-                    if self.edition_mode in [BarChartAnnotator.ModeDataEdit, BarChartAnnotator.ModeDataSelect]:
-                        if self.tempo_data_layer < len(polygons):
-                            self.tempo_green_lines += [polygons[self.tempo_data_layer]]
-                        self.tempo_red_lines += polygons[:self.tempo_data_layer]
-                        self.tempo_red_lines += polygons[self.tempo_data_layer + 1:]
-                    else:
-                        self.tempo_red_lines += polygons
-
-                    # for mapping clicks ...
-                    current_lines += polygons
-                    self.tempo_bar_polygon_index += polygon_index
-
-                    # move to end of the bar ... (+ width)
-                    bar_start += bar_width
-                    # check if move to the next stack of bars on same grouping
-                    if group_idx + 1 < len(self.data.bar_sorting.order):
-                        # + distance between contiguous bars
-                        bar_start += bar_inner_dist
-
-                # next group of bars ...
-                bar_start += bar_outer_dist
+        polygons, self.tempo_bar_polygon_index = BarData.ComputeBarLayout(self.data.bar_vertical,
+                                                                          self.data.bar_grouping,
+                                                                          self.data.bar_sorting.order,
+                                                                          len(self.data.categories), bar_lengths,
+                                                                          bar_start, bar_baseline, bar_width,
+                                                                          bar_inner_dist, bar_outer_dist)
+
+        # For drawing ...
+        if self.edition_mode in [BarChartAnnotator.ModeDataEdit, BarChartAnnotator.ModeDataSelect]:
+            # highlight the bars of the current layer ...
+            in_layer = np.array([stack_idx == self.tempo_data_layer
+                                 for _, _, stack_idx, _ in self.tempo_bar_polygon_index], dtype=bool)
+            self.tempo_green_lines = polygons[in_layer]
+            self.tempo_red_lines = polygons[np.logical_not(in_layer)]
         else:
-            # bar are grouped by data series
-            for group_idx, group in enumerate(self.data.bar_sorting.order):
-                for cat_idx, category in enumerate(self.data.categories):
-                    bar_end = bar_start + bar_width
-
-                    # draw stacked bars ...
-                    polygons, polygon_index = BarData.get_stacked_bar_lines(self.data.bar_vertical, cat_idx, group,
-                                                                            bar_lengths, bar_baseline, bar_start,
-                                                                            bar_end)
-
-                    # for drawing ...
-                    if self.edition_mode in [BarChartAnnotator.ModeDataEdit, BarChartAnnotator.ModeDataSelect]:
-                        if self.tempo_data_layer < len(polygons):
-                            self.tempo_green_lines += [polygons[self.tempo_data_layer]]
-                        self.tempo_red_lines += polygons[:self.tempo_data_layer]
-                        self.tempo_red_lines += polygons[self.tempo_data_layer + 1:]
-                    else:
-                        self.tempo_red_lines += polygons
-
-                    # for click processing ...
-                    current_lines += polygons
-                    self.tempo_bar_polygon_index += polygon_index
-
-                    # move to the end of the bar
-                    bar_start += bar_width
-                    # check if move to the next stack of bars on same grouping
-                    if cat_idx + 1 < len(self.data.categories):
-                        bar_start += bar_inner_dist
-
-                # next group of bars ...
-                bar_start += bar_outer_dist
+            self.tempo_green_lines = polygons[0:0]
+            self.tempo_red_lines = polygons
 
-        current_lines = np.array(current_lines).round().astype(np.int32)
-        self.tempo_bar_polygons = current_lines
+        # for mapping clicks ...
+        self.tempo_bar_polygons = polygons.round().astype(np.int32)
 
     def custom_view_update(self, modified_image):
         x1, y1, x2, y2 = self.panel_info.axes.bounding_box
@@ -754,10 +697,10 @@ class BarChartAnnotator(BaseImageAnnotator):
 
         # modified_image = cv2.polylines(modified_image, current_lines, False, (255, 0, 0))
         if len(self.tempo_red_lines) > 0:
-            red_lines = np.array(self.tempo_red_lines).round().astype(np.int32)
+            red_lines = self.tempo_red_lines.round().astype(np.int32)
             modified_image = cv2.polylines(modified_image, red_lines, False, (255, 0, 0))
         if len(self.tempo_green_lines) > 0:
-            green_lines = np.array(self.tempo_green_lines).round().astype(np.int32)
+            green_lines = self.tempo_green_lines.round().astype(np.int32)
             modified_image = cv2.polylines(modified_image, green_lines, False, (0, 255, 0))
 
     def update_current_view(self, resized=False):
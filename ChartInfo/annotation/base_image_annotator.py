@@ -1,4 +1,6 @@
 
+from collections import OrderedDict
+
 import numpy as np
 import cv2
 
@@ -9,6 +11,8 @@ from AM_CommonTools.interface.controls.screen_image import ScreenImage
 from AM_CommonTools.interface.controls.screen_container import ScreenContainer
 from AM_CommonTools.interface.controls.screen_canvas import ScreenCanvas
 
+from ChartInfo.annotation.panel_image_analysis import PanelImageAnalysis
+
 class BaseImageAnnotator(Screen):
     # four view modes for the image ...
     ViewModeRawData = 0
@@ -18,18 +22,47 @@ class BaseImageAnnotator(Screen):
     ViewModeInvertedNoData = 4
     ViewModeGrayNoData = 5
 
+    # incremental view updates: changes are located using tiles of this size (image pixels) ...
+    ViewDirtyTileSize = 64
+    # ... and the full view is rendered again when more than this fraction of the tiles changed
+    ViewDirtyMaxRatio = 0.5
+    # scaled versions of the base images (per view image and zoom level) are cached up to this size (LRU)
+    ViewPyramidMaxBytes = 256 * 1024 * 1024
+    # ... levels larger than this are never scaled as a whole (only their visible window is)
+    ViewPyramidMaxLevelBytes = 64 * 1024 * 1024
+    # only the visible part of the view is rendered, plus this margin (view pixels) on each side for scrolling
+    ViewWindowMargin = 256
+
     def __init__(self, title, size):
         Screen.__init__(self, title, size)
 
         self.base_rgb_image = None
         self.base_inv_image = None
         self.base_gray_image = None
+        # shared analysis of the panel being annotated (if any)
+        self.panel_analysis = None
 
         self.view_mode = BaseImageAnnotator.ViewModeRawData
         self.view_scale = 1.0
 
         self.view_overlay_opacity = 1.0
 
+        # last rendered view (image resolution, including overlays), the settings used to render it, and the image
+        # pixels used for each view row/column (nearest neighbor scaling)
+        self.view_frame = None
+        self.view_frame_settings = None
+        self.view_map_x = None
+        self.view_map_y = None
+        # scaled base image of the current view, taken from the zoom pyramid cache (None for large views)
+        self.view_scaled_base = None
+        # size of the full view, and the part of it currently rendered (x1, y1, x2, y2 ... view coordinates)
+        self.view_size = None
+        self.view_window = None
+
+        # key = (base image id, view width, view height), value = scaled base image
+        self.view_pyramid = OrderedDict()
+        self.view_pyramid_bytes = 0
+
         self.container_view_buttons = None
         self.lbl_zoom = None
         self.btn_zoom_reduce = None
@@ -51,6 +84,21 @@ class BaseImageAnnotator(Screen):
         self.canvas_display = None
         self.img_main = None
 
+    def set_panel_image(self, panel_image, panel_analysis=None):
+        # re-use the analysis of the panel if it has been computed before (by other annotators)
+        if panel_analysis is None:
+            panel_analysis = PanelImageAnalysis(panel_image)
+
+        self.panel_analysis = panel_analysis
+        self.base_rgb_image = panel_analysis.rgb_image
+        self.base_gray_image = panel_analysis.get_gray_image()
+        self.base_inv_image = None
+
+        # scaled images of the previous panel are no longer valid
+        self.view_frame = None
+        self.view_pyramid.clear()
+        self.view_pyramid_bytes = 0
+
     def create_image_annotator_controls(self, container_top, container_width, general_background, text_color,
                                         button_text_color, button_back_color):
         # View panel with view control buttons
@@ -155,6 +203,7 @@ class BaseImageAnnotator(Screen):
         image_height = self.height - container_top - 10
         self.container_images = ScreenContainer("container_images", (image_width, image_height), back_color=(0, 0, 0))
         self.container_images.position = (10, container_top)
+        self.container_images.viewport_callback = self.container_images_viewport_changed
         self.elements.append(self.container_images)
 
         # ... image objects ...
@@ -293,17 +342,24 @@ class BaseImageAnnotator(Screen):
         # update scale text ...
         self.lbl_zoom.set_text("Zoom: " + str(int(round(self.view_scale * 100,0))) + "%")
 
-    def update_current_view(self, resized=False):
+    def get_view_base_image(self):
         if self.view_mode in [BaseImageAnnotator.ViewModeGrayData, BaseImageAnnotator.ViewModeGrayNoData]:
             # gray scale mode
             base_image = self.base_gray_image
         elif self.view_mode in [BaseImageAnnotator.ViewModeInvertedData, BaseImageAnnotator.ViewModeInvertedNoData]:
             if self.base_inv_image is None:
-                self.base_inv_image = 255 - self.base_rgb_image
+                if self.panel_analysis is not None:
+                    self.base_inv_image = self.panel_analysis.get_inverted_image()
+                else:
+                    self.base_inv_image = 255 - self.base_rgb_image
             base_image = self.base_inv_image
         else:
             base_image = self.base_rgb_image
 
+        return base_image
+
+    def update_current_view(self, resized=False):
+        base_image = self.get_view_base_image()
         h, w, c = base_image.shape
 
         modified_image = base_image.copy()
@@ -317,27 +373,211 @@ class BaseImageAnnotator(Screen):
         else:
             self.canvas_display.visible = False
 
-        # finally, resize ...
-        modified_image = cv2.resize(modified_image, (int(w * self.view_scale), int(h * self.view_scale)),
-                                    interpolation=cv2.INTER_NEAREST)
+        view_settings = (id(base_image), self.view_mode, self.view_scale, self.view_overlay_opacity)
+        if not resized and self.view_frame is not None and self.view_frame_settings == view_settings:
+            # same view as before ... try to update only the regions that changed
+            dirty_regions = self.get_view_dirty_regions(modified_image, self.view_frame)
+            if dirty_regions is not None:
+                self.view_frame = modified_image
+                for region in dirty_regions:
+                    view_region = self.get_view_region(base_image, *region)
+                    if view_region is not None:
+                        window_x, window_y, region_image = view_region
+                        self.img_main.update_image_region(region_image, (window_x, window_y))
+                return
+
+        self.view_frame = modified_image
+        self.view_frame_settings = view_settings
 
-        if self.view_overlay_opacity < 1.0:
-            resized_base = cv2.resize(base_image, (int(w * self.view_scale), int(h * self.view_scale)),
-                                      interpolation=cv2.INTER_NEAREST)
-
-            # add transparency effect ...
-            modified_image = resized_base.astype(np.float64) * 0.5 + modified_image.astype(np.float64) * 0.5
-            modified_image = modified_image.astype(np.uint8)
+        # finally, resize ...
+        view_w, view_h = int(w * self.view_scale), int(h * self.view_scale)
+        self.view_size = (view_w, view_h)
+        self.view_map_x = BaseImageAnnotator.NearestSourceIndices(w, view_w)
+        self.view_map_y = BaseImageAnnotator.NearestSourceIndices(h, view_h)
+        self.view_scaled_base = self.get_view_scaled_base(base_image, view_w, view_h)
 
         # update canvas size ....
-        self.canvas_select.height, self.canvas_select.width, _ = modified_image.shape
-        self.canvas_display.height, self.canvas_display.width, _ = modified_image.shape
+        self.canvas_select.height, self.canvas_select.width = view_h, view_w
+        self.canvas_display.height, self.canvas_display.width = view_h, view_w
 
-        # replace/update image
-        self.img_main.set_image(modified_image, 0, 0, True, cv2.INTER_NEAREST)
+        # replace/update image (visible part only)
+        self.update_view_window(base_image, self.get_view_window(self.container_images.get_viewport()))
         if resized:
             self.container_images.recalculate_size()
 
+    def get_view_window(self, viewport):
+        # part of the view to render for the given visible area (x, y, width, height) of the view
+        view_x, view_y, visible_w, visible_h = viewport
+        view_w, view_h = self.view_size
+        margin = BaseImageAnnotator.ViewWindowMargin
+
+        window_x1 = min(max(int(view_x) - margin, 0), view_w - 1)
+        window_y1 = min(max(int(view_y) - margin, 0), view_h - 1)
+        window_x2 = max(min(int(np.ceil(view_x + visible_w)) + margin, view_w), window_x1 + 1)
+        window_y2 = max(min(int(np.ceil(view_y + visible_h)) + margin, view_h), window_y1 + 1)
+
+        return window_x1, window_y1, window_x2, window_y2
+
+    def update_view_window(self, base_image, window):
+        # renders the given part of the view (x1, y1, x2, y2 ... view coordinates, exclusive ends)
+        self.view_window = window
+        window_x1, window_y1, window_x2, window_y2 = window
+
+        if self.view_scaled_base is not None:
+            # only the regions with overlays need to be scaled, the rest comes from the scaled base image
+            overlay_regions = self.get_view_dirty_regions(self.view_frame, base_image)
+        else:
+            overlay_regions = None
+
+        if overlay_regions is None:
+            # too many overlays (or no scaled base image) ...
+            window_pixels = np.ix_(self.view_map_y[window_y1:window_y2], self.view_map_x[window_x1:window_x2])
+            window_image = self.view_frame[window_pixels]
+
+            if self.view_overlay_opacity < 1.0:
+                # add transparency effect ...
+                window_image = BaseImageAnnotator.BlendHalf(self.get_view_window_base(base_image, *window),
+                                                            window_image)
+        else:
+            window_image = self.view_scaled_base[window_y1:window_y2, window_x1:window_x2]
+
+            view_regions = [self.get_view_region(base_image, *region) for region in overlay_regions]
+            view_regions = [view_region for view_region in view_regions if view_region is not None]
+            if len(view_regions) > 0:
+                window_image = window_image.copy()
+                for region_x, region_y, region_image in view_regions:
+                    region_h, region_w, _ = region_image.shape
+                    window_image[region_y:region_y + region_h, region_x:region_x + region_w] = region_image
+
+        self.img_main.set_image(window_image, 0, 0, True, cv2.INTER_NEAREST)
+        self.img_main.position = (window_x1, window_y1)
+
+    def get_view_window_base(self, base_image, x1, y1, x2, y2):
+        # scaled base image for the given part of the view (view coordinates)
+        if self.view_scaled_base is not None:
+            return self.view_scaled_base[y1:y2, x1:x2]
+        else:
+            return base_image[np.ix_(self.view_map_y[y1:y2], self.view_map_x[x1:x2])]
+
+    def container_images_viewport_changed(self, container, viewport):
+        if self.view_window is None:
+            return
+
+        # render again only if the visible area is no longer inside of the rendered window
+        view_x, view_y, visible_w, visible_h = viewport
+        view_w, view_h = self.view_size
+        window_x1, window_y1, window_x2, window_y2 = self.view_window
+        if (window_x1 <= view_x and min(view_x + visible_w, view_w) <= window_x2 and
+                window_y1 <= view_y and min(view_y + visible_h, view_h) <= window_y2):
+            return
+
+        self.update_view_window(self.get_view_base_image(), self.get_view_window(viewport))
+
+    def get_view_scaled_base(self, base_image, view_w, view_h):
+        # scaled version of the base image, from the zoom pyramid cache if it has been used recently
+        key = (id(base_image), view_w, view_h)
+        if key in self.view_pyramid:
+            self.view_pyramid.move_to_end(key)
+            return self.view_pyramid[key]
+
+        if view_w * view_h * base_image.shape[2] > BaseImageAnnotator.ViewPyramidMaxLevelBytes:
+            # too large ...
+            return None
+
+        scaled_image = cv2.resize(base_image, (view_w, view_h), interpolation=cv2.INTER_NEAREST)
+        scaled_image.flags.writeable = False
+
+        self.view_pyramid[key] = scaled_image
+        self.view_pyramid_bytes += scaled_image.nbytes
+        while self.view_pyramid_bytes > BaseImageAnnotator.ViewPyramidMaxBytes:
+            _, old_image = self.view_pyramid.popitem(last=False)
+            self.view_pyramid_bytes -= old_image.nbytes
+
+        return scaled_image
+
+    def get_view_dirty_regions(self, new_frame, prev_frame):
+        # list of (x1, y1, x2, y2) regions (image coordinates) where the new frame differs from the previous one
+        # (None if too many regions changed and the full view should be rendered again)
+        h, w, c = new_frame.shape
+        changed = (new_frame != prev_frame).reshape((h, w * c))
+
+        # changes per tile (only bands of rows with changes are checked per column) ...
+        tile_size = BaseImageAnnotator.ViewDirtyTileSize
+        band_starts = np.arange(0, h, tile_size)
+        dirty_bands = np.logical_or.reduceat(changed.any(axis=1), band_starts)
+
+        dirty_tiles = np.zeros((band_starts.shape[0], int(np.ceil(w / tile_size))), dtype=bool)
+        for tile_y in np.nonzero(dirty_bands)[0].tolist():
+            band_changes = changed[tile_y * tile_size:(tile_y + 1) * tile_size].any(axis=0)
+            dirty_tiles[tile_y] = np.logical_or.reduceat(band_changes, np.arange(0, w * c, tile_size * c))
+
+        if dirty_tiles.sum() > dirty_tiles.size * BaseImageAnnotator.ViewDirtyMaxRatio:
+            return None
+
+        # ... merge consecutive dirty tiles on each row of tiles
+        dirty_regions = []
+        for tile_y in np.nonzero(dirty_tiles.any(axis=1))[0].tolist():
+            row = np.concatenate(([False], dirty_tiles[tile_y], [False]))
+            run_starts = np.nonzero(row[1:] & ~row[:-1])[0].tolist()
+            run_ends = np.nonzero(~row[1:] & row[:-1])[0].tolist()
+            for tile_x1, tile_x2 in zip(run_starts, run_ends):
+                dirty_regions.append((tile_x1 * tile_size, tile_y * tile_size,
+                                      min(tile_x2 * tile_size, w), min((tile_y + 1) * tile_size, h)))
+
+        return dirty_regions
+
+    def get_view_region(self, base_image, x1, y1, x2, y2):
+        # renders the part of the view showing the given region of the current frame (x2, y2 are exclusive)
+        # (view pixels are taken from the image exactly like the full rendering does)
+        # returns (x, y, region image) relative to the rendered window, or None if the region is not visible
+        window_x1, window_y1, window_x2, window_y2 = self.view_window
+        view_x1, view_x2 = np.searchsorted(self.view_map_x, [x1, x2]).tolist()
+        view_y1, view_y2 = np.searchsorted(self.view_map_y, [y1, y2]).tolist()
+        view_x1, view_x2 = max(view_x1, window_x1), min(view_x2, window_x2)
+        view_y1, view_y2 = max(view_y1, window_y1), min(view_y2, window_y2)
+        if view_x1 >= view_x2 or view_y1 >= view_y2:
+            return None
+
+        region_pixels = np.ix_(self.view_map_y[view_y1:view_y2], self.view_map_x[view_x1:view_x2])
+        region_image = self.view_frame[region_pixels]
+
+        if self.view_overlay_opacity < 1.0:
+            # add transparency effect ...
+            region_base = self.get_view_window_base(base_image, view_x1, view_y1, view_x2, view_y2)
+            region_image = BaseImageAnnotator.BlendHalf(region_base, region_image)
+
+        return view_x1 - window_x1, view_y1 - window_y1, region_image
+
+    @staticmethod
+    def NearestSourceIndices(src_size, dst_size):
+        # source pixel used for each destination pixel by cv2.resize (INTER_NEAREST)
+        inv_scale = 1.0 / (dst_size / src_size)
+        return np.minimum(np.floor(np.arange(dst_size) * inv_scale).astype(np.int64), src_size - 1)
+
+    @staticmethod
+    def BlendHalf(image_a, image_b):
+        # average of two uint8 images (truncated)
+        return ((image_a.astype(np.uint16) + image_b) // 2).astype(np.uint8)
+
+    def get_preview_value_description(self, img_x, img_y):
+        # values of the point at the given image position, projected using the axes of the panel being annotated
+        # (annotators can override this, e.g. to report points which cannot be added)
+        return self.panel_info.axes.get_projected_point_description(img_x, img_y)
+
+    def update_preview_value(self, img_x, img_y):
+        # live readout (on lbl_preview_value, created by the annotators which add points) of the values of the point
+        # to add (None if there is no point)
+        if img_x is None:
+            description = ""
+        else:
+            description = self.get_preview_value_description(img_x, img_y)
+
+        if description == "":
+            description = "[ No Values ]"
+
+        if description != self.lbl_preview_value.text:
+            self.lbl_preview_value.set_text(description)
+
     def img_main_mouse_button_down(self, img, pos, button):
         pass
 
@@ -34,14 +34,10 @@ class BoxChartAnnotator(BaseImageAnnotator):
     DataWhiskerMaximum = 4
     DataBoxSliders = 5
 
-    def __init__(self, size, panel_image, panel_info, parent_screen):
+    def __init__(self, size, panel_image, panel_info, parent_screen, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Box Chart Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
         self.panel_info = panel_info
 
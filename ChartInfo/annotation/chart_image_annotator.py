@@ -27,6 +27,7 @@ from ChartInfo.annotation.bar_chart_annotator import BarChartAnnotator
 from ChartInfo.annotation.box_chart_annotator import BoxChartAnnotator
 from ChartInfo.annotation.line_chart_annotator import LineChartAnnotator
 from ChartInfo.annotation.scatter_chart_annotator import ScatterChartAnnotator
+from ChartInfo.annotation.panel_image_analysis import PanelImageAnalysis
 
 from ChartInfo.util.time_stats import TimeStats
 from ChartInfo.util.json_exporter import ChartJSON_Exporter
@@ -95,6 +96,9 @@ class ChartImageAnnotator(BaseImageAnnotator):
         self.selected_panel = 0
         self.unsaved_changes = False
 
+        # image analysis of each panel (key = image identity + panel boundaries), shared by all annotators
+        self.panel_analysis_cache = {}
+
         self.elements.back_color = self.general_background
 
         self.label_title = None
@@ -579,9 +583,18 @@ class ChartImageAnnotator(BaseImageAnnotator):
         # create dirs (if they don't exist)
         os.makedirs(self.output_dir, exist_ok=True)
 
-        xml_str = self.image_info.to_XML()
-        with open(self.annotation_filename, 'w', encoding="utf-8") as out_file:
-            out_file.write(xml_str)
+        # stream the annotation to a temporary file first, a failed save should never corrupt the previous one
+        tempo_filename = self.annotation_filename + ".tmp"
+        try:
+            with open(tempo_filename, 'w', encoding="utf-8") as out_file:
+                self.image_info.write_XML(out_file)
+        except:
+            # do not leave the incomplete file next to the annotations
+            if os.path.exists(tempo_filename):
+                os.remove(tempo_filename)
+            raise
+
+        os.replace(tempo_filename, self.annotation_filename)
 
         print("Data saved to: " + self.annotation_filename)
         self.unsaved_changes = False
@@ -655,10 +668,11 @@ class ChartImageAnnotator(BaseImageAnnotator):
         self.time_stats.time_main += delta
         self.wait_mode = ChartImageAnnotator.WaitModeText
 
-        panel_image = self.image_info.get_panel_image(self.selected_panel)
+        panel_analysis = self.get_panel_analysis(self.selected_panel)
 
-        text_annotator = ChartTextAnnotator(self.size, panel_image, self.image_info.panels[self.selected_panel], self,
-                                            self.admin_mode)
+        text_annotator = ChartTextAnnotator(self.size, panel_analysis.rgb_image,
+                                            self.image_info.panels[self.selected_panel], self, self.admin_mode,
+                                            panel_analysis)
         text_annotator.prepare_screen()
         # text_annotator.copy_view(self)
 
@@ -670,9 +684,10 @@ class ChartImageAnnotator(BaseImageAnnotator):
         self.time_stats.time_main += delta
         self.wait_mode = ChartImageAnnotator.WaitModeLegend
 
-        panel_image = self.image_info.get_panel_image(self.selected_panel)
+        panel_analysis = self.get_panel_analysis(self.selected_panel)
 
-        legend_annotator = ChartLegendAnnotator(self.size, panel_image, self.image_info.panels[self.selected_panel], self)
+        legend_annotator = ChartLegendAnnotator(self.size, panel_analysis.rgb_image,
+                                                self.image_info.panels[self.selected_panel], self, panel_analysis)
         legend_annotator.prepare_screen()
 
         self.return_screen = legend_annotator
@@ -683,13 +698,25 @@ class ChartImageAnnotator(BaseImageAnnotator):
         self.time_stats.time_main += delta
         self.wait_mode = ChartImageAnnotator.WaitModeAxes
 
-        panel_image = self.image_info.get_panel_image(self.selected_panel)
+        panel_analysis = self.get_panel_analysis(self.selected_panel)
 
-        axes_annotator = ChartAxesAnnotator(self.size, panel_image, self.image_info.panels[self.selected_panel], self)
+        axes_annotator = ChartAxesAnnotator(self.size, panel_analysis.rgb_image,
+                                            self.image_info.panels[self.selected_panel], self, panel_analysis)
         axes_annotator.prepare_screen()
 
         self.return_screen = axes_annotator
 
+    def get_panel_analysis(self, panel_idx):
+        # analysis of the panel (created on first use, panels with new boundaries are analyzed again)
+        panel_node = self.image_info.panel_tree.root.get_leaves()[panel_idx]
+        panel_key = (id(self.image_info.image), panel_node.x1, panel_node.y1, panel_node.x2, panel_node.y2)
+
+        if not panel_key in self.panel_analysis_cache:
+            panel_image = self.image_info.get_panel_image(panel_idx)
+            self.panel_analysis_cache[panel_key] = PanelImageAnalysis(panel_image)
+
+        return self.panel_analysis_cache[panel_key]
+
     def btn_edit_data_click(self, button):
         current_panel = self.image_info.panels[self.selected_panel]
 
@@ -705,16 +732,17 @@ class ChartImageAnnotator(BaseImageAnnotator):
             print("Axes must be annotated first!")
             return
 
-        panel_image = self.image_info.get_panel_image(self.selected_panel)
+        panel_analysis = self.get_panel_analysis(self.selected_panel)
+        panel_image = panel_analysis.rgb_image
 
         if self.image_info.panels[self.selected_panel].type == ChartInfo.TypeBar:
-            data_annotator = BarChartAnnotator(self.size, panel_image, current_panel, self)
+            data_annotator = BarChartAnnotator(self.size, panel_image, current_panel, self, panel_analysis)
         elif self.image_info.panels[self.selected_panel].type == ChartInfo.TypeBox:
-            data_annotator = BoxChartAnnotator(self.size, panel_image, current_panel, self)
+            data_annotator = BoxChartAnnotator(self.size, panel_image, current_panel, self, panel_analysis)
         elif self.image_info.panels[self.selected_panel].type == ChartInfo.TypeLine:
-            data_annotator = LineChartAnnotator(self.size, panel_image, current_panel, self)
+            data_annotator = LineChartAnnotator(self.size, panel_image, current_panel, self, panel_analysis)
         elif self.image_info.panels[self.selected_panel].type == ChartInfo.TypeScatter:
-            data_annotator = ScatterChartAnnotator(self.size, panel_image, current_panel, self)
+            data_annotator = ScatterChartAnnotator(self.size, panel_image, current_panel, self, panel_analysis)
         else:
             raise Exception("Not implemented!!")
 
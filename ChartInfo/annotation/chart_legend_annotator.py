@@ -25,14 +25,10 @@ class ChartLegendAnnotator(BaseImageAnnotator):
     ModeRectangleEdit = 2
     ModeConfirmExit = 3
 
-    def __init__(self, size, panel_image, panel_info, parent_screen):
+    def __init__(self, size, panel_image, panel_info, parent_screen, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Chart Legend Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
         self.panel_info = panel_info
 
@@ -137,8 +133,7 @@ class ChartLegendAnnotator(BaseImageAnnotator):
             # hard to auto-validate, do not create an estimation
             return
 
-        otsu_t, binarized = cv2.threshold(self.base_gray_image[:, :, 0], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        binarized = 255 - binarized
+        binarized = 255 - self.panel_analysis.get_binarized_image()
 
         # subtract the all text  ...
         for txt_label in self.panel_info.get_all_text():
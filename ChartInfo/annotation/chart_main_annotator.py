@@ -1,7 +1,8 @@
 
 import os
+from collections import OrderedDict
+
 import numpy as np
-import cv2
 
 from AM_CommonTools.interface.controls.screen import Screen
 from AM_CommonTools.interface.controls.screen_container import ScreenContainer
@@ -13,10 +14,12 @@ from AM_CommonTools.interface.controls.screen_paginator import ScreenPaginator
 from .chart_image_annotator import ChartImageAnnotator
 from ChartInfo.data.image_info import ImageInfo
 from ChartInfo.util.time_stats import TimeStats
+from ChartInfo.util.status_index import StatusIndex
+from .thumbnail_prefetcher import ThumbnailPrefetcher
 
 class ChartMainAnnotator(Screen):
 
-    def __init__(self, size, chart_dir, annotation_dir, admin_mode):
+    def __init__(self, size, chart_dir, annotation_dir, admin_mode, use_status_index=True, thumbnail_cache=None):
         Screen.__init__(self, "Chart Ground Truth Annotation Interface", size)
 
         # load the chart directory info ...
@@ -50,6 +53,12 @@ class ChartMainAnnotator(Screen):
         self.chart_dir = chart_dir
         self.annotation_dir = annotation_dir
 
+        # persistent index of annotation statuses (avoids re-parsing the XML files of each page)
+        if use_status_index:
+            self.status_index = StatusIndex.Open(annotation_dir)
+        else:
+            self.status_index = None
+
         # define here all graphic object references ....
         # ...for thumbnails ....
         self.container_thumbnails = None
@@ -57,6 +66,8 @@ class ChartMainAnnotator(Screen):
         self.thumbnails_status = None
         self.thumbnails_labels = None
         self.cache_raw_status = None
+        self.tb_empty = None
+        self.default_status = None
         self.paginator = None
         # ... right side image options ...
         self.lbl_page_descriptor = None
@@ -78,6 +89,20 @@ class ChartMainAnnotator(Screen):
         # ... create them!!! .....
         self.create_controllers()
 
+        # persistent cache of downsized images (optional)
+        self.thumbnail_cache = thumbnail_cache
+
+        # images and statuses are loaded in the background, previews are kept for a few pages only
+        if self.thumbnail_cache is not None:
+            preview_size = self.thumbnail_cache.max_dimension
+        else:
+            preview_size = self.container_image_info.width - 20
+        self.prefetcher = ThumbnailPrefetcher(chart_dir, preview_size, preview_size, self.thumbnail_cache)
+        self.cache_previews = OrderedDict()
+        self.cache_previews_size = len(self.thumbnails_images) * 6
+        # key = chart path, value = (annotation signature, status_ints)
+        self.cache_summaries = {}
+
         # ... load current page data ....
         self.current_page = None
         self.selected_element = 0
@@ -88,8 +113,9 @@ class ChartMainAnnotator(Screen):
         button_back_color = (228, 228, 228)
 
         # thumbnail grid parameters
-        tb_empty = np.zeros((3, 4, 3), dtype=np.uint8)
-        default_status = self.gen_status_image([0] * 6, self.tb_width, self.tb_progress_h, self.tb_progress_border)
+        self.tb_empty = np.zeros((3, 4, 3), dtype=np.uint8)
+        self.default_status = self.gen_status_image([0] * 6, self.tb_width, self.tb_progress_h,
+                                                    self.tb_progress_border)
 
         # create the thumbnail container ....
         tb_contained_width = self.tb_col_width * self.tb_grid_cols + self.tb_outer_margin
@@ -109,14 +135,14 @@ class ChartMainAnnotator(Screen):
                 corner_x = self.tb_outer_margin + self.tb_col_width * col
                 corner_y = self.tb_outer_margin + self.tb_row_height * row
 
-                tb_image = ScreenImage("tb_image_{0:d}_{1:d}".format(row, col), tb_empty, self.tb_width, self.tb_height, True)
+                tb_image = ScreenImage("tb_image_{0:d}_{1:d}".format(row, col), self.tb_empty, self.tb_width, self.tb_height, True)
                 tb_image.position = (corner_x, corner_y)
                 tb_image.tag = (row, col)
                 tb_image.click_callback = self.thumbnail_image_click
                 self.container_thumbnails.append(tb_image)
                 self.thumbnails_images.append(tb_image)
 
-                tb_status = ScreenImage("tb_status_{0:d}_{1:d}".format(row, col), default_status, self.tb_width, self.tb_progress_h)
+                tb_status = ScreenImage("tb_status_{0:d}_{1:d}".format(row, col), self.default_status, self.tb_width, self.tb_progress_h)
                 tb_status.position = (corner_x, tb_image.get_bottom() + self.tb_inner_margin)
                 self.container_thumbnails.append(tb_status)
                 self.thumbnails_status.append(tb_status)
@@ -271,6 +297,11 @@ class ChartMainAnnotator(Screen):
 
     def btn_exit_click(self, button):
         # Just exit
+        self.prefetcher.stop()
+
+        if self.status_index is not None:
+            self.status_index.close()
+
         self.return_screen = None
         print("APPLICATION FINISHED")
 
@@ -284,6 +315,146 @@ class ChartMainAnnotator(Screen):
         if self.admin_mode:
             print(str(self.annotation_times))
 
+    def get_annotation_filename(self, chart_path):
+        relative_dir, img_filename = os.path.split(chart_path)
+        img_base, ext = os.path.splitext(img_filename)
+
+        return self.annotation_dir + relative_dir + "/" + img_base + ".xml"
+
+    def get_page_elements(self, page):
+        page_size = len(self.thumbnails_images)
+        return self.chart_image_list[page * page_size:(page + 1) * page_size]
+
+    def get_cached_preview(self, chart_path):
+        if chart_path in self.cache_previews:
+            self.cache_previews.move_to_end(chart_path)
+            return self.cache_previews[chart_path]
+
+        if self.thumbnail_cache is not None:
+            # small files ... much faster than decoding the original image
+            preview = self.thumbnail_cache.get(self.chart_dir + chart_path, chart_path)
+            if preview is not None:
+                self.add_cached_preview(chart_path, preview)
+
+            return preview
+
+        return None
+
+    def add_cached_preview(self, chart_path, preview):
+        self.cache_previews[chart_path] = preview
+        self.cache_previews.move_to_end(chart_path)
+        while len(self.cache_previews) > self.cache_previews_size:
+            self.cache_previews.popitem(last=False)
+
+    def get_cached_status(self, chart_path):
+        # returns the last known status of the image and whether it is up-to-date or not
+        annotation_filename = self.get_annotation_filename(chart_path)
+        signature = StatusIndex.GetSignature(annotation_filename)
+        if signature is None:
+            # no annotation
+            return ImageInfo.GetAllStatuses(None), True
+
+        if chart_path in self.cache_summaries:
+            cached_signature, status_ints = self.cache_summaries[chart_path]
+            if cached_signature == signature:
+                return status_ints, True
+        else:
+            status_ints = None
+
+        if self.status_index is not None:
+            # use the index ... the annotation only needs to be parsed if it has changed since last time
+            summary = self.status_index.lookup(annotation_filename, signature)
+            if summary is not None:
+                n_panels, chart_type, status_ints, auto_check_passed = summary
+                self.cache_summaries[chart_path] = (signature, status_ints)
+                return status_ints, True
+
+        return status_ints, False
+
+    def show_thumbnail(self, idx, preview):
+        if preview is None:
+            # not loaded yet
+            preview = self.tb_empty
+
+        self.thumbnails_images[idx].set_image(preview, self.tb_width, self.tb_height, keep_aspect=True)
+
+        # center new image
+        row = int(idx / self.tb_grid_cols)
+        col = idx % self.tb_grid_cols
+        corner_x = self.tb_outer_margin + self.tb_col_width * col
+        corner_y = self.tb_outer_margin + self.tb_row_height * row
+        self.center_image_in_box(self.thumbnails_images[idx], corner_x, corner_y, self.tb_width, self.tb_height)
+
+    def show_status(self, idx, status_ints):
+        if status_ints is None:
+            # not loaded yet
+            self.cache_raw_status[idx] = ImageInfo.GetNullStatuses()
+            self.thumbnails_status[idx].set_image(self.default_status, self.tb_width, self.tb_progress_h)
+        else:
+            self.cache_raw_status[idx] = status_ints
+            status = self.gen_status_image(status_ints, self.tb_width, self.tb_progress_h, self.tb_progress_border)
+            self.thumbnails_status[idx].set_image(status, self.tb_width, self.tb_progress_h)
+
+    def request_prefetch(self):
+        # current page first, then next and previous pages
+        pages = [self.current_page, self.current_page + 1, self.current_page - 1]
+
+        requests = []
+        for page in pages:
+            if page < 0 or page >= self.paginator.total_pages:
+                continue
+
+            for chart_path in self.get_page_elements(page):
+                load_image = not chart_path in self.cache_previews
+                status_ints, up_to_date = self.get_cached_status(chart_path)
+
+                if load_image or not up_to_date:
+                    annotation_filename = self.get_annotation_filename(chart_path)
+                    requests.append((chart_path, annotation_filename, load_image, not up_to_date))
+
+        self.prefetcher.set_requests(requests)
+
+    def process_prefetched(self):
+        results = self.prefetcher.get_results()
+        if len(results) == 0:
+            return
+
+        # previews and statuses might have changed
+        self.request_render()
+
+        current_elements = self.get_page_elements(self.current_page)
+        for chart_path, preview, signature, summary in results:
+            if preview is not None:
+                self.add_cached_preview(chart_path, preview)
+
+            if summary is not None:
+                n_panels, chart_type, status_ints, auto_check_passed = summary
+                self.cache_summaries[chart_path] = (signature, status_ints)
+
+                if self.status_index is not None:
+                    self.status_index.update(self.get_annotation_filename(chart_path), signature, summary)
+
+            if chart_path in current_elements:
+                # visible ... update
+                idx = current_elements.index(chart_path)
+                if preview is not None:
+                    self.show_thumbnail(idx, preview)
+
+                status_ints, up_to_date = self.get_cached_status(chart_path)
+                self.show_status(idx, status_ints)
+
+                if idx == self.selected_element:
+                    self.update_selected_image_info()
+
+        if self.status_index is not None:
+            self.status_index.save()
+
+    def handle_events(self, event_list):
+        # results from the background loader are applied on the UI thread
+        self.process_prefetched()
+
+        return Screen.handle_events(self, event_list)
+
     def load_page(self, paginator, new_page, refresh=False):
         if new_page == self.current_page and not refresh:
             # page not changed ...
@@ -293,45 +464,17 @@ class ChartMainAnnotator(Screen):
 
         page_size = len(self.thumbnails_images)
 
-        current_elements = self.chart_image_list[self.current_page * page_size:(self.current_page + 1) * page_size]
+        current_elements = self.get_page_elements(self.current_page)
 
         for idx in range(page_size):
-            row = int(idx / self.tb_grid_cols)
-            col = idx % self.tb_grid_cols
-
             if idx < len(current_elements):
-                # update image ...
+                # use whatever is available now, the rest will be loaded in the background ...
                 chart_path = current_elements[idx]
-                current_img = cv2.imread(self.chart_dir + chart_path)
-                current_img = cv2.cvtColor(current_img, cv2.COLOR_BGR2RGB)
-                self.thumbnails_images[idx].set_image(current_img, self.tb_width, self.tb_height, keep_aspect=True)
-
-                # center new image
-                corner_x = self.tb_outer_margin + self.tb_col_width * col
-                corner_y = self.tb_outer_margin + self.tb_row_height * row
-                self.center_image_in_box(self.thumbnails_images[idx], corner_x, corner_y, self.tb_width, self.tb_height)
-
-                # find annotation path ...
-                relative_dir, img_filename = os.path.split(chart_path)
-                img_base, ext = os.path.splitext(img_filename)
-                # output dir
-                output_dir = self.annotation_dir + relative_dir
-                annotation_filename = output_dir + "/" + img_base + ".xml"
-
-                # default : No annotations ...
-                if os.path.exists(annotation_filename):
-                    # read the annotation ...
-                    print(annotation_filename)
-                    image_info = ImageInfo.FromXML(annotation_filename, current_img)
+                self.show_thumbnail(idx, self.get_cached_preview(chart_path))
 
-                    status_ints = ImageInfo.GetAllStatuses(image_info)
-                else:
-                    status_ints = ImageInfo.GetAllStatuses(None)
+                status_ints, up_to_date = self.get_cached_status(chart_path)
+                self.show_status(idx, status_ints)
 
-                self.cache_raw_status[idx] = status_ints
-
-                status = self.gen_status_image(status_ints, self.tb_width, self.tb_progress_h, self.tb_progress_border)
-                self.thumbnails_status[idx].set_image(status, self.tb_width, self.tb_progress_h)
                 self.thumbnails_labels[idx].set_text(chart_path[1:])
 
                 self.thumbnails_images[idx].visible = True
@@ -344,6 +487,8 @@ class ChartMainAnnotator(Screen):
                 self.thumbnails_status[idx].visible = False
                 self.thumbnails_labels[idx].visible = False
 
+        self.request_prefetch()
+
         msg = "Page {0:d} of {1:d} ({2:d} elements)".format(self.current_page + 1, self.paginator.total_pages,
                                                             len(self.chart_image_list))
         self.lbl_page_descriptor.set_text(msg)
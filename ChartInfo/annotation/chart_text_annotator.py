@@ -46,17 +46,12 @@ class ChartTextAnnotator(BaseImageAnnotator):
     TightBoxMargin = 2
     TightQuadMargin = 4
 
-    def __init__(self, size, panel_image, panel_info, parent_screen, admin_mode):
+    def __init__(self, size, panel_image, panel_info, parent_screen, admin_mode, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Chart Text Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
-        otsu_t, binarized = cv2.threshold(self.base_gray_image[:, :, 0], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        self.panel_binary = 255 - binarized
+        self.panel_binary = 255 - self.panel_analysis.get_binarized_image()
 
         self.panel_info = panel_info
 
@@ -0,0 +1,38 @@
+
+import numpy as np
+import cv2
+
+class ConnectedComponentsIndex:
+    # Connected components of a panel image, used to snap new points to the marks of the chart
+    # Components of the binarized image (Otsu) and of its inverse are merged into a single label image, and their
+    # properties are stored on arrays indexed by label, so finding the component under any pixel (and its bounding
+    # box, area and centroid) only requires array lookups. Computed once per panel (see PanelImageAnalysis).
+
+    def __init__(self, binarized):
+        inv_binarized = 255 - binarized
+
+        # get the CC on the raw binary
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binarized)
+        # get the CC on the inverted binary
+        inv_num_labels, inv_labels, inv_stats, inv_centroids = cv2.connectedComponentsWithStats(inv_binarized)
+
+        self.num_labels = num_labels + inv_num_labels
+        self.labels = labels
+        self.labels[inv_labels > 0] = inv_labels[inv_labels > 0] + num_labels
+
+        all_stats = np.vstack([stats, inv_stats])
+        # (x, y, width, height) of each component
+        self.bboxes = all_stats[:, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP, cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]]
+        self.areas = all_stats[:, cv2.CC_STAT_AREA]
+        self.centroids = np.vstack([centroids, inv_centroids])
+
+    def get_label(self, x, y):
+        # label of the component at pixel (x, y), None if out of the image
+        if (y < 0 or y >= self.labels.shape[0]) or (x < 0 or x >= self.labels.shape[1]):
+            return None
+
+        return int(self.labels[y, x])
+
+    def get_small_components(self, max_area):
+        # mask of components (by label) with area smaller than the given value
+        return self.areas < max_area
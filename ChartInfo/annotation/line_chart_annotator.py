@@ -29,14 +29,10 @@ class LineChartAnnotator(BaseImageAnnotator):
 
     DoubleClickMaxPointDistance = 5
 
-    def __init__(self, size, panel_image, panel_info, parent_screen):
+    def __init__(self, size, panel_image, panel_info, parent_screen, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Line Chart Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
         self.panel_info = panel_info
 
@@ -123,6 +119,7 @@ class LineChartAnnotator(BaseImageAnnotator):
         self.container_preview_buttons = None
         self.lbl_preview_title = None
         self.img_preview = None
+        self.lbl_preview_value = None
 
         self.create_controllers()
 
@@ -455,7 +452,7 @@ class LineChartAnnotator(BaseImageAnnotator):
         # =====================
         # Preview of point to add
 
-        self.container_preview_buttons = ScreenContainer("container_preview_buttons", (container_width, 280),
+        self.container_preview_buttons = ScreenContainer("container_preview_buttons", (container_width, 330),
                                                          back_color=darker_background)
         self.container_preview_buttons.position = (self.container_confirm_buttons.get_left(),
                                                    self.container_confirm_buttons.get_bottom() + 20)
@@ -473,6 +470,12 @@ class LineChartAnnotator(BaseImageAnnotator):
         self.img_preview.position = (int(container_width / 2 - 100), self.lbl_preview_title.get_bottom() + 20)
         self.container_preview_buttons.append(self.img_preview)
 
+        self.lbl_preview_value = ScreenLabel("lbl_preview_value", "[ No Values ]", 18, 290, 1)
+        self.lbl_preview_value.position = (5, self.img_preview.get_bottom() + 10)
+        self.lbl_preview_value.set_background(darker_background)
+        self.lbl_preview_value.set_color(self.text_color)
+        self.container_preview_buttons.append(self.lbl_preview_value)
+
         self.img_main.mouse_motion_callback = self.img_main_mouse_motion
 
         self.prepare_number_controls()
@@ -1041,6 +1044,7 @@ class LineChartAnnotator(BaseImageAnnotator):
                 zoom_cut[:, int(zoom_cut.shape[1] / 2)] = (255, 0, 0)
 
             self.img_preview.set_image(zoom_cut, 200, 200)
+            self.update_preview_value(self.hover_line_point_x, self.hover_line_point_y)
 
         elif self.edition_mode in [LineChartAnnotator.ModeNavigate, LineChartAnnotator.ModeLineSelect]:
             # determine if the mouse pointer is over sme specific line ...
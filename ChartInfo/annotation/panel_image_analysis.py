@@ -0,0 +1,49 @@
+
+import numpy as np
+import cv2
+
+from ChartInfo.annotation.connected_components_index import ConnectedComponentsIndex
+
+class PanelImageAnalysis:
+    # Image analysis results of a panel, shared by all the annotators opened for that panel
+    # Everything is computed lazily (only when first requested) and kept for the next annotators (see
+    # ChartImageAnnotator.get_panel_analysis). Returned arrays are shared, they must not be modified.
+
+    def __init__(self, rgb_image):
+        self.rgb_image = rgb_image
+
+        self.gray_image = None
+        self.inverted_image = None
+        self.binarized_image = None
+        self.cc_index = None
+
+    def get_gray_image(self):
+        # gray scale version of the panel (replicated on 3 channels, for display)
+        if self.gray_image is None:
+            self.gray_image = np.zeros(self.rgb_image.shape, self.rgb_image.dtype)
+            self.gray_image[:, :, 0] = cv2.cvtColor(self.rgb_image, cv2.COLOR_RGB2GRAY)
+            self.gray_image[:, :, 1] = self.gray_image[:, :, 0].copy()
+            self.gray_image[:, :, 2] = self.gray_image[:, :, 0].copy()
+
+        return self.gray_image
+
+    def get_inverted_image(self):
+        if self.inverted_image is None:
+            self.inverted_image = 255 - self.rgb_image
+
+        return self.inverted_image
+
+    def get_binarized_image(self):
+        # binarized version of the gray scale panel (Otsu)
+        if self.binarized_image is None:
+            otsu_t, self.binarized_image = cv2.threshold(self.get_gray_image()[:, :, 0], 0, 255,
+                                                         cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        return self.binarized_image
+
+    def get_cc_index(self):
+        # connected components of the binarized panel and of its inverse
+        if self.cc_index is None:
+            self.cc_index = ConnectedComponentsIndex(self.get_binarized_image())
+
+        return self.cc_index
@@ -32,14 +32,10 @@ class ScatterChartAnnotator(BaseImageAnnotator):
     CrossHairs_30_150_270 = 2
     CrossHairs_90_210_330 = 3
 
-    def __init__(self, size, panel_image, panel_info, parent_screen):
+    def __init__(self, size, panel_image, panel_info, parent_screen, panel_analysis=None):
         BaseImageAnnotator.__init__(self, "Scatter Chart Ground Truth Annotation Interface", size)
 
-        self.base_rgb_image = panel_image
-        self.base_gray_image = np.zeros(self.base_rgb_image.shape, self.base_rgb_image.dtype)
-        self.base_gray_image[:, :, 0] = cv2.cvtColor(self.base_rgb_image, cv2.COLOR_RGB2GRAY)
-        self.base_gray_image[:, :, 1] = self.base_gray_image[:, :, 0].copy()
-        self.base_gray_image[:, :, 2] = self.base_gray_image[:, :, 0].copy()
+        self.set_panel_image(panel_image, panel_analysis)
 
         self.panel_info = panel_info
 
@@ -60,13 +56,12 @@ class ScatterChartAnnotator(BaseImageAnnotator):
         self.mark_size = 50
         self.crosshairs_type = ScatterChartAnnotator.CrossHairs_0_90_180_270
 
-        self.cc_num_labels = 0
-        self.cc_labels = None
-        self.cc_stats = None
-        self.cc_centroids = None
+        # connected components of the panel (re-used from previous sessions)
+        self.cc_index = self.panel_analysis.get_cc_index()
         self.cc_zoom_size = 10
         self.cc_hover_idx = 0
-        self.precompute_connected_components()
+        # components small enough to be previewed (by label)
+        self.cc_hover_valid = self.cc_index.get_small_components(np.power(self.cc_zoom_size * 4, 2))
         self.padded_base_rgb_image = np.zeros((self.base_rgb_image.shape[0] + self.cc_zoom_size * 2,
                                                self.base_rgb_image.shape[1] + self.cc_zoom_size * 2, 3), np.uint8)
         self.padded_base_rgb_image[self.cc_zoom_size:-self.cc_zoom_size, self.cc_zoom_size:-self.cc_zoom_size] = self.base_rgb_image.copy()
@@ -125,6 +120,7 @@ class ScatterChartAnnotator(BaseImageAnnotator):
         self.container_preview_buttons = None
         self.lbl_preview_title = None
         self.img_preview = None
+        self.lbl_preview_value = None
 
         self.create_controllers()
 
@@ -427,7 +423,7 @@ class ScatterChartAnnotator(BaseImageAnnotator):
 
         # -----------
         # ... preview of right click on add mode  ...
-        self.container_preview_buttons = ScreenContainer("container_preview_buttons", (container_width, 180),
+        self.container_preview_buttons = ScreenContainer("container_preview_buttons", (container_width, 230),
                                                          back_color=darker_background)
         self.container_preview_buttons.position = (self.container_confirm_buttons.get_left(),
                                                    self.container_confirm_buttons.get_bottom() + 20)
@@ -446,25 +442,16 @@ class ScatterChartAnnotator(BaseImageAnnotator):
         self.img_preview.position = (int(container_width / 2 - 50), self.lbl_preview_title.get_bottom() + 20)
         self.container_preview_buttons.append(self.img_preview)
 
+        self.lbl_preview_value = ScreenLabel("lbl_preview_value", "[ No Values ]", 18, 290, 1)
+        self.lbl_preview_value.position = (5, self.img_preview.get_bottom() + 10)
+        self.lbl_preview_value.set_background(darker_background)
+        self.lbl_preview_value.set_color(self.text_color)
+        self.container_preview_buttons.append(self.lbl_preview_value)
+
         self.prepare_number_controls()
 
         self.set_editor_mode(ScatterChartAnnotator.ModeNavigate)
 
-    def precompute_connected_components(self):
-        otsu_t, binarized = cv2.threshold(self.base_gray_image[:, :, 0], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        inv_binarized = 255 - binarized
-
-        # get the CC on the raw binary
-        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binarized)
-        # get the CC on the inverted binary
-        inv_num_labels, inv_labels, inv_stats, inv_centroids = cv2.connectedComponentsWithStats(inv_binarized)
-
-        self.cc_num_labels = num_labels + inv_num_labels
-        self.cc_labels = labels
-        self.cc_labels[inv_labels > 0] = inv_labels[inv_labels > 0] + num_labels
-        self.cc_stats = np.vstack([stats, inv_stats])
-        self.cc_centroids = np.vstack([centroids, inv_centroids])
-
     def get_crosshair_angles(self, crosshair_type):
         if crosshair_type == ScatterChartAnnotator.CrossHairs_0_90_180_270:
             return [0, np.pi / 2.0, np.pi, np.pi * 3 / 2.0]
@@ -628,7 +615,7 @@ class ScatterChartAnnotator(BaseImageAnnotator):
                 rel_x, rel_y = self.from_pos_to_rel_click(pos)
             elif button == 3 and self.cc_hover_idx is not None:
                 # use hover CC location instead of actual click location
-                rel_x, rel_y = self.cc_centroids[self.cc_hover_idx]
+                rel_x, rel_y = self.cc_index.centroids[self.cc_hover_idx]
                 x1, y1, x2, y2 = self.panel_info.axes.bounding_box
                 rel_x = rel_x - x1
                 rel_y = y2 - rel_y
@@ -890,14 +877,13 @@ class ScatterChartAnnotator(BaseImageAnnotator):
 
             if self.edition_mode == ScatterChartAnnotator.ModePointAdd:
                 valid_cc = True
-                if (img_y < 0 or img_y >= self.cc_labels.shape[0]) or (img_x < 0 or img_x >= self.cc_labels.shape[1]):
+                cc_idx = self.cc_index.get_label(img_x, img_y)
+                if cc_idx is None:
                     valid_cc = False
                 else:
-                    cc_idx = self.cc_labels[img_y, img_x]
-                    cc_center_x, cc_center_y = self.cc_centroids[cc_idx]
+                    cc_center_x, cc_center_y = self.cc_index.centroids[cc_idx]
 
-                    # print((self.cc_stats[cc_idx, cv2.CC_STAT_AREA], np.power(self.cc_zoom_size * 4, 2)))
-                    if self.cc_stats[cc_idx, cv2.CC_STAT_AREA] < np.power(self.cc_zoom_size * 4, 2):
+                    if self.cc_hover_valid[cc_idx]:
                         cut_min_x = int(cc_center_x)
                         cut_max_x = int(cc_center_x + self.cc_zoom_size * 2 + 1)
                         cut_min_y = int(cc_center_y)
@@ -918,13 +904,21 @@ class ScatterChartAnnotator(BaseImageAnnotator):
                 preview_size = (self.cc_zoom_size * 2 + 1) * 5
                 self.img_preview.set_image(zoom_cut, preview_size, preview_size)
 
-                # print("---")
-                # self.img_preview
-                # print(self.cc_labels[img_y, img_x])
-                # print(self.cc_centroids[self.cc_labels[img_y, img_x]])
+                if self.cc_hover_idx is None:
+                    self.update_preview_value(None, None)
+                else:
+                    self.update_preview_value(*self.cc_index.centroids[self.cc_hover_idx])
         else:
             self.canvas_select.elements["click_mark"].visible = False
 
+    def get_preview_value_description(self, img_x, img_y):
+        x1, y1, x2, y2 = self.panel_info.axes.bounding_box
+        if self.tempo_scatter_values.contains_point(img_x - x1, y2 - img_y):
+            # same check used when adding the point (it would be ignored)
+            return "[ Point Already Added ]"
+
+        return BaseImageAnnotator.get_preview_value_description(self, img_x, img_y)
+
     def img_scatter_cross_hairs_mouse_button_down(self, img_object, pos, button):
         if img_object.name == "img_scatter_cross_hairs_0_90_180_270":
             self.crosshairs_type = ScatterChartAnnotator.CrossHairs_0_90_180_270
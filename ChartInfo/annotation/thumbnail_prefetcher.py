@@ -0,0 +1,116 @@
+
+import queue
+import threading
+
+import numpy as np
+
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+from ChartInfo.util.status_index import StatusIndex
+from ChartInfo.util.thumbnail_cache import ThumbnailCache
+
+class ThumbnailPrefetcher:
+    # Loads the preview images and annotation statuses used by the main menu on a background thread.
+    # Requests are replaced every time that the page changes (current page first, then the neighbor pages), and the
+    # results are sent back through a queue that is consumed by the UI thread.
+
+    def __init__(self, chart_dir, preview_width, preview_height, thumbnail_cache=None):
+        self.chart_dir = chart_dir
+        self.preview_width = preview_width
+        self.preview_height = preview_height
+        # previews are taken from (and added to) the thumbnail cache if available
+        self.thumbnail_cache = thumbnail_cache
+
+        # pending requests: list of (chart_path, annotation_filename, load_image, load_status)
+        self.requests = []
+        self.requests_lock = threading.Lock()
+        self.requests_available = threading.Event()
+
+        # results: (chart_path, preview, signature, summary) ... None for the parts not requested (or failed)
+        self.results = queue.Queue()
+
+        self.running = True
+        self.worker = threading.Thread(target=self.__worker_loop, name="thumbnail_prefetcher", daemon=True)
+        self.worker.start()
+
+    def set_requests(self, requests):
+        # replaces all pending requests (these are processed in the given order)
+        with self.requests_lock:
+            self.requests = list(requests)
+
+        self.requests_available.set()
+
+    def get_results(self):
+        # all results available so far (never blocks)
+        all_results = []
+        while True:
+            try:
+                all_results.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+
+        return all_results
+
+    def stop(self):
+        self.running = False
+        self.requests_available.set()
+
+    def __next_request(self):
+        with self.requests_lock:
+            if len(self.requests) == 0:
+                self.requests_available.clear()
+                return None
+
+            return self.requests.pop(0)
+
+    def __worker_loop(self):
+        while self.running:
+            request = self.__next_request()
+            if request is None:
+                self.requests_available.wait()
+                continue
+
+            chart_path, annotation_filename, load_image, load_status = request
+
+            # the preview and the summary are loaded independently, a failure on one of them (e.g. an invalid
+            # annotation) does not discard the other one (the part that failed is None)
+            preview = None
+            if load_image:
+                try:
+                    preview = self.load_preview(chart_path)
+                except Exception as e:
+                    print("Error loading the preview of " + chart_path)
+                    print(e)
+
+            signature, summary = None, None
+            if load_status:
+                try:
+                    signature, summary = ThumbnailPrefetcher.LoadSummary(annotation_filename)
+                except Exception as e:
+                    print("Error loading the annotation of " + chart_path)
+                    print(e)
+
+            self.results.put((chart_path, preview, signature, summary))
+
+    def load_preview(self, chart_path):
+        image_filename = self.chart_dir + chart_path
+        if self.thumbnail_cache is not None:
+            preview = self.thumbnail_cache.load(image_filename, chart_path)
+        else:
+            # downsize (keeping the aspect ratio) to the largest size used to display it
+            preview = ThumbnailCache.CreateThumbnail(image_filename, self.preview_width, self.preview_height)
+
+        if preview is None:
+            print("Could not load image: " + chart_path)
+            return np.zeros((3, 4, 3), dtype=np.uint8)
+
+        return preview
+
+    @staticmethod
+    def LoadSummary(annotation_filename):
+        # signature of the annotation file and its status summary (None if there is no annotation)
+        signature = StatusIndex.GetSignature(annotation_filename)
+        if signature is None:
+            return None, None
+
+        image_info = FastXMLLoader.LoadImageInfo(annotation_filename, None, lazy=True)
+        return signature, StatusIndex.SummarizeImageInfo(image_info)
@@ -1,4 +1,6 @@
 
+import io
+
 from .tick_info import TickInfo
 from .axis_values import AxisValues
 
@@ -14,6 +16,8 @@ class AxesInfo:
     AxisX2 = 2
     AxisY2 = 3
 
+    AxisNames = {AxisX1: "X-1", AxisY1: "Y-1", AxisX2: "X-2", AxisY2: "Y-2"}
+
     RegionAll = 0
     RegionPlot = 1
     RegionNonPlot = 2
@@ -75,30 +79,56 @@ class AxesInfo:
         else:
             raise Exception("Unknown Axis")
 
-    def axis_get_projected_value(self, axis, pixel_value):
+    def get_axis_values(self, axis):
+        # returns the AxisValues of the given axis and True if it is a vertical axis
         if axis == AxesInfo.AxisX1:
-            if self.x1_axis is not None:
-                pass
-            else:
-                raise Exception("Cannot Project to X-1, Axis is not defined on this chart")
+            return self.x1_axis, False
         elif axis == AxesInfo.AxisX2:
-            if self.x2_axis is not None:
-                pass
-            else:
-                raise Exception("Cannot Project to X-1, Axis is not defined on this chart")
+            return self.x2_axis, False
         elif axis == AxesInfo.AxisY1:
-            if self.y1_axis is not None:
-                pass
-            else:
-                raise Exception("Cannot Project to Y-1, Axis is not defined on this chart")
+            return self.y1_axis, True
         elif axis == AxesInfo.AxisY2:
-            if self.y2_axis is not None:
-                pass
-            else:
-                raise Exception("Cannot Project to Y-2, Axis is not defined on this chart")
+            return self.y2_axis, True
         else:
             raise Exception("Unknown Axis")
 
+    def axis_get_projected_value(self, axis, pixel_value):
+        axis_values, vertical_axis = self.get_axis_values(axis)
+
+        if axis_values is None:
+            axis_name = AxesInfo.AxisNames[axis]
+            raise Exception("Cannot Project to {0:s}, Axis is not defined on this chart".format(axis_name))
+
+        if axis_values.values_type == AxisValues.ValueTypeNumerical:
+            # uses the compiled projection of the axis (shared with the data parsers)
+            return axis_values.get_projection(self, vertical_axis).project_value(pixel_value)
+        else:
+            # categorical axis ... find closest category
+            return AxisValues.FindClosestValue(self, axis_values, vertical_axis, pixel_value)
+
+    def get_projected_point_description(self, pixel_x, pixel_y):
+        # describes the values of a point (in pixel space) on all the axes that can be used to project it
+        # (used for live readouts while annotating)
+        values = []
+        for axis in [AxesInfo.AxisX1, AxesInfo.AxisY1, AxesInfo.AxisX2, AxesInfo.AxisY2]:
+            axis_values, vertical_axis = self.get_axis_values(axis)
+            if axis_values is None:
+                continue
+
+            pixel_value = pixel_y if vertical_axis else pixel_x
+            try:
+                value = self.axis_get_projected_value(axis, pixel_value)
+            except Exception:
+                # axis cannot be projected yet (incomplete annotation) ...
+                continue
+
+            if isinstance(value, float):
+                values.append("{0:s}: {1:.4g}".format(AxesInfo.AxisNames[axis], value))
+            else:
+                values.append("{0:s}: {1:s}".format(AxesInfo.AxisNames[axis], value))
+
+        return ", ".join(values)
+
     def is_complete(self):
         return not (self.bounding_box is None or
                     ((self.x1_axis is None or not self.x1_axis.is_complete()) and
@@ -175,52 +205,56 @@ class AxesInfo:
         else:
             raise Exception("Unknown Axis")
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<Axes>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<Axes>\n")
 
         # add Axis Version Stamp ...
-        xml_str += indent + "    <Version>{0:s}</Version>\n".format(str(AxesInfo.DataVersion))
+        out_stream.write(indent + "    <Version>{0:s}</Version>\n".format(str(AxesInfo.DataVersion)))
 
         # tick labels ....
-        xml_str += indent + "    <TickLabels>\n"
+        out_stream.write(indent + "    <TickLabels>\n")
         for text_id in self.tick_labels:
-            xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
-        xml_str += indent + "    </TickLabels>\n"
+            out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
+        out_stream.write(indent + "    </TickLabels>\n")
 
         # bounding box (x1, y1, x2, y2)
         if self.bounding_box is not None:
             x1, y1, x2, y2 = self.bounding_box
-            xml_str += indent + "    <BoundingBox>\n"
-            xml_str += indent + "        <X1>{0:s}</X1>\n".format(str(x1))
-            xml_str += indent + "        <Y1>{0:s}</Y1>\n".format(str(y1))
-            xml_str += indent + "        <X2>{0:s}</X2>\n".format(str(x2))
-            xml_str += indent + "        <Y2>{0:s}</Y2>\n".format(str(y2))
-            xml_str += indent + "    </BoundingBox>\n"
+            out_stream.write(indent + "    <BoundingBox>\n")
+            out_stream.write(indent + "        <X1>{0:s}</X1>\n".format(str(x1)))
+            out_stream.write(indent + "        <Y1>{0:s}</Y1>\n".format(str(y1)))
+            out_stream.write(indent + "        <X2>{0:s}</X2>\n".format(str(x2)))
+            out_stream.write(indent + "        <Y2>{0:s}</Y2>\n".format(str(y2)))
+            out_stream.write(indent + "    </BoundingBox>\n")
 
         # all axis ...
         if self.x1_axis is not None:
-            xml_str += indent + "    <AxisX1>\n"
-            xml_str += self.x1_axis.to_XML(indent + "        ")
-            xml_str += indent + "    </AxisX1>\n"
+            out_stream.write(indent + "    <AxisX1>\n")
+            self.x1_axis.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </AxisX1>\n")
 
         if self.x2_axis is not None:
-            xml_str += indent + "    <AxisX2>\n"
-            xml_str += self.x2_axis.to_XML(indent + "        ")
-            xml_str += indent + "    </AxisX2>\n"
+            out_stream.write(indent + "    <AxisX2>\n")
+            self.x2_axis.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </AxisX2>\n")
 
         if self.y1_axis is not None:
-            xml_str += indent + "    <AxisY1>\n"
-            xml_str += self.y1_axis.to_XML(indent + "        ")
-            xml_str += indent + "    </AxisY1>\n"
+            out_stream.write(indent + "    <AxisY1>\n")
+            self.y1_axis.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </AxisY1>\n")
 
         if self.y2_axis is not None:
-            xml_str += indent + "    <AxisY2>\n"
-            xml_str += self.y2_axis.to_XML(indent + "        ")
-            xml_str += indent + "    </AxisY2>\n"
+            out_stream.write(indent + "    <AxisY2>\n")
+            self.y2_axis.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </AxisY2>\n")
 
-        xml_str += indent + "</Axes>\n"
+        out_stream.write(indent + "</Axes>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root, tick_labels, title_labels):
@@ -0,0 +1,47 @@
+
+import numpy as np
+from scipy import interpolate
+
+class AxisProjection:
+    # Compiled version of a numerical axis (see AxisValues.get_projection)
+    # Keeps the sorted label positions, their parsed numeric values and a prebuilt interpolation function, so
+    # projecting pixel coordinates does not require parsing labels or building interpolators again.
+    # The signature describes the state of the axis (ticks, labels, bounding box) used to compile it; the
+    # projection must be compiled again if the signature of the axis changes.
+
+    def __init__(self, signature, vertical_axis, origin, label_positions, label_values, interp_x, interp_y,
+                 log_scale):
+        self.signature = signature
+        self.vertical_axis = vertical_axis
+        # pixel coordinate used as reference for relative positions
+        self.origin = origin
+
+        # sorted absolute positions of the labels (pixel space) and their numeric values
+        self.label_positions = np.array(label_positions, dtype=np.float64)
+        self.label_values = np.array(label_values, dtype=np.float64)
+
+        self.log_scale = log_scale
+        if self.log_scale:
+            self.f_int = interpolate.interp1d(interp_x, np.log(interp_y), 'linear', fill_value='extrapolate')
+        else:
+            self.f_int = interpolate.interp1d(interp_x, interp_y, 'linear', fill_value='extrapolate')
+
+    def is_valid(self, signature):
+        return self.signature == signature
+
+    def project(self, pixel_values):
+        # projects all given pixel coordinates (list or array) at once ... returns a numpy array of values
+        pixel_values = np.asarray(pixel_values, dtype=np.float64)
+
+        if self.vertical_axis:
+            rel_pixel_values = self.origin - pixel_values
+        else:
+            rel_pixel_values = pixel_values - self.origin
+
+        if self.log_scale:
+            return np.exp(self.f_int(rel_pixel_values))
+        else:
+            return self.f_int(rel_pixel_values)
+
+    def project_value(self, pixel_value):
+        return float(self.project([pixel_value])[0])
@@ -1,8 +1,12 @@
 
-import math
+import io
+import re
+import functools
+
+import numpy as np
 
 from .tick_info import TickInfo
-from scipy import interpolate
+from .axis_projection import AxisProjection
 
 class AxisValues:
     ValueTypeCategorical = 0
@@ -15,6 +19,14 @@ class AxisValues:
     TicksTypeMarkers = 0
     TicksTypeSeparators = 1
 
+    # known units ... sorted in decreasing order so "mm" will be handled before "m"
+    LabelKnownUnits = [unit for l, unit in sorted([(len(unit), unit) for unit in
+                                                   ["usd", "s", "ms", "m", "cm", "mm", "$", "x", "€", "£"]],
+                                                  reverse=True)]
+    # labels that are plain numbers (most of them) can be directly converted to float
+    LabelPlainNumberPattern = re.compile(r"[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)")
+    LabelCacheSize = 4096
+
     def __init__(self, value_type, ticks_type, scale_type):
         # general axis information ...
         self.values_type = value_type
@@ -34,9 +46,8 @@ class AxisValues:
         # TODO: handle points where axis is "interrupted" (scale-breaking points)
         self.interruptions = None
 
-        self.cache_interp_x = None
-        self.cache_interp_y = None
-        self.cache_raw_abs_values = None
+        # compiled projection (see get_projection)
+        self.cache_projection = None
 
     def has_label(self, text_id):
         if self.labels is not None:
@@ -168,9 +179,6 @@ class AxisValues:
             return [text_label for _, text_label in tempo_sorted]
 
     def get_tick_type_value_positions(self, is_vertical, text_labels):
-        if self.cache_raw_abs_values is not None:
-            return self.cache_raw_abs_values
-
         # this function considers the tick type and returns the sorted absolute positions (in pixel space)
         # of its labels (association of pixel coordinates with specific text labels)
         raw_values = []
@@ -190,17 +198,11 @@ class AxisValues:
                 else:
                     raw_values.append((lbl_cx, label_id))
 
-        # CACHE this operation
-        self.cache_raw_abs_values = sorted(raw_values)
-
-        return self.cache_raw_abs_values
+        return sorted(raw_values)
 
     def get_interpolation_points(self, origin_value, is_vertical, text_labels):
-        if self.cache_interp_x is not None:
-            return self.cache_interp_x, self.cache_interp_y
-
-        self.cache_interp_x = []
-        self.cache_interp_y = []
+        interp_x = []
+        interp_y = []
 
         raw_values = self.get_tick_type_value_positions(is_vertical, text_labels)
 
@@ -210,13 +212,84 @@ class AxisValues:
             else:
                 x = raw_value - origin_value
 
-            self.cache_interp_x.append(x)
+            interp_x.append(x)
 
             float_val = AxisValues.LabelNumericValue(text_labels[label_id].value)
 
-            self.cache_interp_y.append(float_val)
+            interp_y.append(float_val)
+
+        return interp_x, interp_y
+
+    def get_projection(self, axes, vertical_axis):
+        # returns the compiled projection for the current state of the axis. It is only compiled again when the
+        # ticks, the labels (or their values), the scale or the axes bounding box have changed since the last call
+        if self.values_type != AxisValues.ValueTypeNumerical:
+            raise Exception("Cannot project on Categorical Axis")
+
+        if self.scale_type not in [AxisValues.ScaleLinear, AxisValues.ScaleLogarithmic]:
+            raise Exception("Cannot project on Numerical Axis without Scale")
+
+        raw_values = self.get_tick_type_value_positions(vertical_axis, axes.tick_labels)
+        label_signature = tuple([(position, axes.tick_labels[label_id].value) for position, label_id in raw_values])
+        signature = (self.scale_type, vertical_axis, tuple(axes.bounding_box), label_signature)
 
-        return self.cache_interp_x, self.cache_interp_y
+        if self.cache_projection is not None and self.cache_projection.is_valid(signature):
+            return self.cache_projection
+
+        # GET origin value
+        # use X or Y origin based on axis being vertical or horizontal
+        bb_x1, bb_y1, bb_x2, bb_y2 = axes.bounding_box
+        origin_value = bb_y2 if vertical_axis else bb_x1
+
+        label_positions = [position for position, label_id in raw_values]
+        label_values = [AxisValues.LabelNumericValue(axes.tick_labels[label_id].value) for _, label_id in raw_values]
+
+        """
+            if is_vertical:
+                x = origin_value - tick_info.position
+            else:
+                x = tick_info.position - origin_value
+        """
+        if vertical_axis:
+            interp_x = [origin_value - position for position in label_positions]
+        else:
+            interp_x = [position - origin_value for position in label_positions]
+        interp_y = list(label_values)
+
+        if self.scale_type == AxisValues.ScaleLinear:
+            # check for tick values
+            if len(interp_x) == 0:
+                # axis is marked as linear, but has no tick labels .... assume default range [0.0, 1.0]
+                if vertical_axis:
+                    interp_x = [bb_y2 - bb_y1, 0.0]
+                    interp_y = [1.0, 0.0]
+                else:
+                    interp_x = [0.0, bb_x2 - bb_x1]
+                    interp_y = [0.0, 1.0]
+
+            log_scale = False
+        else:
+            # zero cannot be represented on logarithmic scale ... ignore it
+            interp_x = [x for x, y in zip(interp_x, interp_y) if y != 0.0]
+            interp_y = [y for y in interp_y if y != 0.0]
+            if min(interp_y, default=0.0) < 0.0:
+                raise Exception("Cannot project on Logarithmic Axis with negative values")
+
+            if len(interp_x) == 0:
+                # axis is marked as logarithmic, but has no tick labels .... assume default range [1.0, 10.0]
+                if vertical_axis:
+                    interp_x = [bb_y2 - bb_y1, 0.0]
+                    interp_y = [10.0, 1.0]
+                else:
+                    interp_x = [0.0, bb_x2 - bb_x1]
+                    interp_y = [1.0, 10.0]
+
+            log_scale = True
+
+        self.cache_projection = AxisProjection(signature, vertical_axis, origin_value, label_positions, label_values,
+                                               interp_x, interp_y, log_scale)
+
+        return self.cache_projection
 
     @staticmethod
     def IdentifyNumericPart(str_value):
@@ -298,7 +371,18 @@ class AxisValues:
         return result
 
     @staticmethod
+    @functools.lru_cache(maxsize=LabelCacheSize)
     def LabelNumericValue(str_val):
+        # the same label strings are parsed many times (ticks of each projection, value labels, exports) ...
+        # results are cached by raw string, and plain numbers skip the general parser
+        if AxisValues.LabelPlainNumberPattern.fullmatch(str_val.strip()) is not None:
+            return float(str_val.strip())
+
+        return AxisValues.ParseLabelNumericValue(str_val)
+
+    @staticmethod
+    def ParseLabelNumericValue(str_val):
+        # general (un-cached) parser for numeric labels
         multiplier = 1.0
 
         # TODO: Cases not yet handled:
@@ -317,10 +401,7 @@ class AxisValues:
         str_val = AxisValues.RemoveThousandsSeparator(str_val)
 
         # TODO: This is a good place to capture potential units ....
-        # keep this list sorted ... in decreasing order so "mm" will be handled before "m"
-        known_units = ["usd","s", "ms", "m", "cm", "mm", "$", "x", "€", "£"]
-        known_units = sorted([(len(unit), unit) for unit in known_units], reverse=True)
-        for l, unit in known_units:
+        for unit in AxisValues.LabelKnownUnits:
             if unit in "times" and "times" in str_val:
                 # some units are substrings of "times"
                 # but times is valid latex ... do not remove the unit candidate
@@ -386,64 +467,18 @@ class AxisValues:
 
     @staticmethod
     def Project(axes, axis_values, vertical_axis, pixel_value):
-        if axis_values.values_type == AxisValues.ValueTypeNumerical:
-            # GET origin value
-            # use X or Y origin based on axis being vertical or horizontal
-            bb_x1, bb_y1, bb_x2, bb_y2 = axes.bounding_box
+        return float(AxisValues.ProjectArray(axes, axis_values, vertical_axis, [pixel_value])[0])
 
-            """
-                if is_vertical:
-                    x = origin_value - tick_info.position
-                else:
-                    x = tick_info.position - origin_value
-            """
-
-            if vertical_axis:
-                interp_x, interp_y = axis_values.get_interpolation_points(bb_y2, vertical_axis, axes.tick_labels)
-                rel_pixel_value = bb_y2 - pixel_value
-            else:
-                interp_x, interp_y = axis_values.get_interpolation_points(bb_x1, vertical_axis, axes.tick_labels)
-                rel_pixel_value = pixel_value - bb_x1
-
-            # print((rel_pixel_value, interp_x, interp_y))
-
-            # identify the closest
-            if axis_values.scale_type == AxisValues.ScaleLinear:
-                # check for tick values
-                if len(interp_x) == 0:
-                    # axis is marked as linear, but has no tick labels .... assume default range [0.0, 1.0]
-                    if vertical_axis:
-                        interp_x = [bb_y2 - bb_y1, 0.0]
-                        interp_y = [1.0, 0.0]
-                    else:
-                        interp_x = [0.0, bb_x2 - bb_x1]
-                        interp_y = [0.0, 1.0]
-
-                # interpolate value ...
-                f_int = interpolate.interp1d(interp_x, interp_y, 'linear', fill_value='extrapolate')
-                return float(f_int(rel_pixel_value))
-            elif axis_values.scale_type == AxisValues.ScaleLogarithmic:
-                if 0.0 in interp_y:
-                    pos = interp_y.index(0.0)
-                    del interp_x[pos]
-                    del interp_y[pos]
-
-                if len(interp_x) == 0:
-                    # axis is marked as linear, but has no tick labels .... assume default range [0.0, 1.0]
-                    if vertical_axis:
-                        interp_x = [bb_y2 - bb_y1, 0.0]
-                        interp_y = [10.0, 1.0]
-                    else:
-                        interp_x = [0.0, bb_x2 - bb_x1]
-                        interp_y = [1.0, 10.0]
+    @staticmethod
+    def ProjectArray(axes, axis_values, vertical_axis, pixel_values):
+        # projects all given pixel coordinates (list or array) at once, using the compiled projection of the axis
+        # returns a numpy array of values
+        pixel_values = np.asarray(pixel_values, dtype=np.float64)
+        if pixel_values.shape[0] == 0:
+            # nothing to project
+            return pixel_values
 
-                f_int = interpolate.interp1d(interp_x, [math.log(val) for val in interp_y], 'linear',
-                                             fill_value='extrapolate')
-                return float(math.exp(f_int(rel_pixel_value)))
-            else:
-                raise Exception("Cannot project on Numerical Axis without Scale")
-        else:
-            raise Exception("Cannot project on Categorical Axis")
+        return axis_values.get_projection(axes, vertical_axis).project(pixel_values)
 
     @staticmethod
     def FindClosestValue(axes, axis_values, vertical_axis, pixel_value):
@@ -470,38 +505,42 @@ class AxisValues:
             # numerical ... convert ...
             return AxisValues.LabelNumericValue(closest_value)
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<AxisValues>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<AxisValues>\n")
 
         # store types in human-readable format ...
         value_type_str, ticks_type_str, scale_type_str = self.get_description()
 
-        xml_str += indent + '    <ValuesType>{0:s}</ValuesType>\n'.format(value_type_str)
-        xml_str += indent + '    <TicksType>{0:s}</TicksType>\n'.format(ticks_type_str)
-        xml_str += indent + '    <ScaleType>{0:s}</ScaleType>\n'.format(scale_type_str)
+        out_stream.write(indent + '    <ValuesType>{0:s}</ValuesType>\n'.format(value_type_str))
+        out_stream.write(indent + '    <TicksType>{0:s}</TicksType>\n'.format(ticks_type_str))
+        out_stream.write(indent + '    <ScaleType>{0:s}</ScaleType>\n'.format(scale_type_str))
 
         # absolute points ... (sorted lists)
         if self.ticks is not None:
-            xml_str += indent + "    <Ticks>\n"
+            out_stream.write(indent + "    <Ticks>\n")
             for tick_info in self.ticks:
-                xml_str += tick_info.to_XML(indent + "        ")
-            xml_str += indent + "    </Ticks>\n"
+                tick_info.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </Ticks>\n")
 
         if self.labels is not None:
-            xml_str += indent + "    <Labels>\n"
+            out_stream.write(indent + "    <Labels>\n")
             for text_id in self.labels:
-                xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
-            xml_str += indent + "    </Labels>\n"
+                out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
+            out_stream.write(indent + "    </Labels>\n")
 
         if self.title is not None:
-            xml_str += indent + "    <Title>{0:d}</Title>\n".format(self.title)
+            out_stream.write(indent + "    <Title>{0:d}</Title>\n".format(self.title))
 
         if self.interruptions is not None:
             raise Exception("Not Implemented")
 
-        xml_str += indent + "</AxisValues>\n"
+        out_stream.write(indent + "</AxisValues>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
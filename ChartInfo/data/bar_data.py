@@ -1,7 +1,8 @@
 
+import io
 import numpy as np
 from shapely.geometry import Polygon
-from munkres import Munkres
+from scipy.optimize import linear_sum_assignment
 
 from .series_sorting import SeriesSorting
 from .axes_info import AxesInfo
@@ -100,46 +101,106 @@ class BarData:
         return np.mean(self.bar_lengths)
 
     @staticmethod
-    def get_bar_lines(bar_vertical, bar_baseline, bar_start, bar_end, bar_length):
-        if bar_vertical:
-            bar_max = bar_baseline - bar_length
-
-            left_axis = (bar_start, bar_baseline)
-            left_top = (bar_start, bar_max)
-            right_top = (bar_end, bar_max)
-            right_axis = (bar_end, bar_baseline)
-
-            return (left_axis, left_top, right_top, right_axis), bar_max
+    def ComputeBarLayout(bar_vertical, bar_grouping, bar_order, n_categories, bar_lengths, bar_start, bar_baseline,
+                         bar_width, bar_inner_dist, bar_outer_dist):
+        # computes the rectangles of all bars for the given parameters (shared by the annotator and the exporter)
+        # returns:
+        #   polygons: array (n_bars x 4 x 2) with the corners of each bar in pixel space (not rounded)
+        #   polygon_index: list of (series_idx, cat_idx, stack_idx, baseline) for each bar
+        # Bars are listed as positioned: for each stack of bars (by category or by data series), from the baseline
+        n_groups = len(bar_order)
+        n_slots = n_groups * n_categories
+        group_sizes = np.array([len(group) for group in bar_order], dtype=np.int64)
+
+        # each stack of bars takes one slot ... get the category and group of each slot
+        if bar_grouping == BarData.GroupingByCategory:
+            # bar are grouped by categorical value ...
+            slot_cat = np.repeat(np.arange(n_categories), n_groups)
+            slot_group = np.tile(np.arange(n_groups), n_categories)
+            slots_per_group = n_groups
         else:
-            bar_max = bar_baseline + bar_length
-
-            top_axis = (bar_baseline, bar_start)
-            top_right = (bar_max, bar_start)
-            bottom_right = (bar_max, bar_end)
-            bottom_axis = (bar_baseline, bar_end)
+            # bar are grouped by data series
+            slot_cat = np.tile(np.arange(n_categories), n_groups)
+            slot_group = np.repeat(np.arange(n_groups), n_categories)
+            slots_per_group = n_categories
+
+        slot_sizes = group_sizes[slot_group] if n_slots > 0 else np.zeros(0, dtype=np.int64)
+        n_bars = int(slot_sizes.sum())
+        if n_bars == 0:
+            return np.zeros((0, 4, 2), dtype=np.float64), []
+
+        # position of each slot: start + (width + inner distance) between contiguous bars of the same grouping,
+        # and (width + outer distance) after the last bar of each grouping. Accumulated in the same order as
+        # the bars are placed ...
+        increments = np.zeros(n_slots * 2 + 1, dtype=np.float64)
+        increments[0] = bar_start
+        increments[1::2] = bar_width
+        increments[2::2] = bar_inner_dist
+        increments[2 * slots_per_group::2 * slots_per_group] = bar_outer_dist
+        all_slot_starts = np.cumsum(increments)[0:n_slots * 2:2]
+        all_slot_ends = all_slot_starts + bar_width
+
+        # first bar of each slot ...
+        slot_first_bar = np.zeros(n_slots, dtype=np.int64)
+        slot_first_bar[1:] = np.cumsum(slot_sizes)[:-1]
+
+        lengths = np.array(bar_lengths, dtype=np.float64).reshape(-1, n_categories)
+
+        bar_series = np.zeros(n_bars, dtype=np.int64)
+        bar_cat = np.zeros(n_bars, dtype=np.int64)
+        bar_stack = np.zeros(n_bars, dtype=np.int64)
+        bar_bases = np.zeros(n_bars, dtype=np.float64)
+        bar_maxs = np.zeros(n_bars, dtype=np.float64)
+        bar_slot = np.zeros(n_bars, dtype=np.int64)
+
+        # data series at each layer of each group
+        max_layers = int(group_sizes.max())
+        group_layer_series = np.full((n_groups, max_layers), -1, dtype=np.int64)
+        for group_idx, group in enumerate(bar_order):
+            group_layer_series[group_idx, :len(group)] = group
+
+        # stack the bars, one layer at a time (for all slots at once)
+        current_baseline = np.full(n_slots, bar_baseline, dtype=np.float64)
+        for stack_idx in range(max_layers):
+            layer_slots = np.nonzero(slot_sizes > stack_idx)[0]
+            layer_series = group_layer_series[slot_group[layer_slots], stack_idx]
+            layer_cats = slot_cat[layer_slots]
+
+            layer_bases = current_baseline[layer_slots]
+            if bar_vertical:
+                layer_maxs = layer_bases - lengths[layer_series, layer_cats]
+            else:
+                layer_maxs = layer_bases + lengths[layer_series, layer_cats]
 
-            return (top_axis, top_right, bottom_right, bottom_axis), bar_max
+            positions = slot_first_bar[layer_slots] + stack_idx
+            bar_series[positions] = layer_series
+            bar_cat[positions] = layer_cats
+            bar_stack[positions] = stack_idx
+            bar_bases[positions] = layer_bases
+            bar_maxs[positions] = layer_maxs
+            bar_slot[positions] = layer_slots
 
-    @staticmethod
-    def get_stacked_bar_lines(bar_vertical, cat_idx, group, bar_lengths, bar_baseline, bar_start, bar_end):
-        polygons = []
-        polygon_index = []
-        current_baseline = bar_baseline
-        for stack_idx, series_idx in enumerate(group):
-            # ...retrieve corresponding bar length ...
-            bar_length = bar_lengths[series_idx][cat_idx]
+            current_baseline[layer_slots] = layer_maxs
 
-            bar_lines, bar_max = BarData.get_bar_lines(bar_vertical, current_baseline, bar_start, bar_end, bar_length)
+        bar_starts = all_slot_starts[bar_slot]
+        bar_ends = all_slot_ends[bar_slot]
 
-            polygons.append(bar_lines)
-            polygon_index.append((series_idx, cat_idx, stack_idx, current_baseline))
+        polygons = np.zeros((n_bars, 4, 2), dtype=np.float64)
+        if bar_vertical:
+            # (left_axis, left_top, right_top, right_axis)
+            polygons[:, :, 0] = np.stack([bar_starts, bar_starts, bar_ends, bar_ends], axis=1)
+            polygons[:, :, 1] = np.stack([bar_bases, bar_maxs, bar_maxs, bar_bases], axis=1)
+        else:
+            # (top_axis, top_right, bottom_right, bottom_axis)
+            polygons[:, :, 0] = np.stack([bar_bases, bar_maxs, bar_maxs, bar_bases], axis=1)
+            polygons[:, :, 1] = np.stack([bar_starts, bar_starts, bar_ends, bar_ends], axis=1)
 
-            current_baseline = bar_max
+        polygon_index = list(zip(bar_series.tolist(), bar_cat.tolist(), bar_stack.tolist(), bar_bases.tolist()))
 
         return polygons, polygon_index
 
     def computer_bar_polygons(self, chart_info):
-        # note that this function overlaps on functionality the one used by the corresponding bar chart annotator
+        # note that this function uses the same layout used by the corresponding bar chart annotator
         # but this one does not consider temporary data structures or special highlighting, just the actual positions
         # of the bars
 
@@ -161,78 +222,59 @@ class BarData:
             # assume they start at the left
             bar_baseline = x1
 
-        current_lines = []
-        bar_polygon_index = []
+        polygons, bar_polygon_index = BarData.ComputeBarLayout(self.bar_vertical, self.bar_grouping,
+                                                               self.bar_sorting.order, len(self.categories),
+                                                               self.bar_lengths, bar_start, bar_baseline,
+                                                               self.bar_width, self.bar_inner_dist,
+                                                               self.bar_outer_dist)
 
-        if self.bar_grouping == BarData.GroupingByCategory:
-            # bar are grouped by categorical value ...
-            for cat_idx, category in enumerate(self.categories):
-                for group_idx, group in enumerate(self.bar_sorting.order):
-                    bar_end = bar_start + self.bar_width
-
-                    # add stacked bars ...
-                    polygons, polygon_index = BarData.get_stacked_bar_lines(self.bar_vertical, cat_idx, group,
-                                                                            self.bar_lengths, bar_baseline, bar_start,
-                                                                            bar_end)
-
-                    current_lines += polygons
-                    bar_polygon_index += polygon_index
-
-                    # move to end of the bar ... (+ width)
-                    bar_start += self.bar_width
-                    # check if move to the next stack of bars on same grouping
-                    if group_idx + 1 < len(self.bar_sorting.order):
-                        # + distance between contiguous bars
-                        bar_start += self.bar_inner_dist
-
-                # next group of bars ...
-                bar_start += self.bar_outer_dist
-        else:
-            # bar are grouped by data series
-            for group_idx, group in enumerate(self.bar_sorting.order):
-                for cat_idx, category in enumerate(self.categories):
-                    bar_end = bar_start + self.bar_width
-
-                    # draw stacked bars ...
-                    polygons, polygon_index = BarData.get_stacked_bar_lines(self.bar_vertical, cat_idx, group,
-                                                                            self.bar_lengths, bar_baseline, bar_start,
-                                                                            bar_end)
-
-                    # for click processing ...
-                    current_lines += polygons
-                    bar_polygon_index += polygon_index
-
-                    # move to the end of the bar
-                    bar_start += self.bar_width
-                    # check if move to the next stack of bars on same grouping
-                    if cat_idx + 1 < len(self.categories):
-                        bar_start += self.bar_inner_dist
-
-                # next group of bars ...
-                bar_start += self.bar_outer_dist
-
-        current_lines = np.array(current_lines).round().astype(np.int32)
-        bar_polygons = current_lines
+        bar_polygons = polygons.round().astype(np.int32)
 
         return bar_polygons, bar_polygon_index
 
+    @staticmethod
+    def BarLabelDistances(bar_polygons, value_labels):
+        # distances between all bars (rows) and all value labels (columns)
+        # bars are axis-aligned rectangles, and most labels are too ... the distance between two axis-aligned
+        # rectangles is computed for all pairs at once, only rotated labels require computing polygon distances
+        bar_polygons = np.asarray(bar_polygons, dtype=np.float64).reshape(-1, 4, 2)
+        bar_min = bar_polygons.min(axis=1)
+        bar_max = bar_polygons.max(axis=1)
+
+        label_min = np.array([np.min(label.position_polygon, axis=0) for label in value_labels]).reshape(-1, 2)
+        label_max = np.array([np.max(label.position_polygon, axis=0) for label in value_labels]).reshape(-1, 2)
+
+        # gaps along x and y (zero if the rectangles overlap on that axis)
+        gaps = np.maximum(np.maximum(bar_min[:, None, :] - label_max[None, :, :],
+                                     label_min[None, :, :] - bar_max[:, None, :]), 0.0)
+        distances = np.sqrt(gaps[:, :, 0] * gaps[:, :, 0] + gaps[:, :, 1] * gaps[:, :, 1])
+
+        for lbl_idx, val_label in enumerate(value_labels):
+            label_polygon = np.asarray(val_label.position_polygon, dtype=np.float64)
+            min_x, min_y = label_min[lbl_idx]
+            max_x, max_y = label_max[lbl_idx]
+            # (4 different corners of its own bounding box)
+            is_rectangle = (len(set(map(tuple, label_polygon.tolist()))) == 4 and
+                            np.all(np.isin(label_polygon[:, 0], [min_x, max_x])) and
+                            np.all(np.isin(label_polygon[:, 1], [min_y, max_y])))
+            if not is_rectangle:
+                # rotated (or irregular) label ...
+                lbl_as_poly = Polygon(label_polygon)
+                for bar_idx, bar_polygon in enumerate(bar_polygons):
+                    distances[bar_idx, lbl_idx] = Polygon(bar_polygon).distance(lbl_as_poly)
+
+        return distances
+
     def assign_value_labels_to_bars(self, bar_polygons, value_labels):
         # use the hungarian method ... but first compute all pairwise distances
-        cost_matrix = np.zeros((len(bar_polygons), len(bar_polygons)))
-        # ... fill the cost matrix ...
-        for bar_idx, bar_polygon in enumerate(bar_polygons):
-            bar_as_poly = Polygon(bar_polygon)
-            for lbl_idx, val_label in enumerate(value_labels):
-                lbl_as_poly = Polygon(val_label.position_polygon)
-                cost_matrix[bar_idx, lbl_idx] = bar_as_poly.distance(lbl_as_poly)
+        cost_matrix = BarData.BarLabelDistances(bar_polygons, value_labels)
 
-        m = Munkres()
-        assignments = m.compute(cost_matrix)
+        assignments = zip(*linear_sum_assignment(cost_matrix))
 
         bar_idx_to_value_label = {}
         for bar_idx, lbl_idx in assignments:
             try:
-                bar_idx_to_value_label[bar_idx] = AxisValues.LabelNumericValue(value_labels[lbl_idx].value)
+                bar_idx_to_value_label[int(bar_idx)] = AxisValues.LabelNumericValue(value_labels[lbl_idx].value)
             except:
                 # found a value label that cannot be interpreted ...
                 # this will allow to fall back to projection-based bar value inference
@@ -240,6 +282,54 @@ class BarData:
 
         return bar_idx_to_value_label
 
+    def project_bar_values(self, chart_info, bar_baselines, is_stacked):
+        # to get the value of the bar, we need to get the numerical value of the base of the bar
+        # and subtract it from the value of the top of the bar.... this is scale dependent
+        # returns a dictionary of (series_idx, cat_idx) -> {"y": value, "y2": value}
+        all_keys = []
+        all_bar_max = []
+        all_baselines = []
+        for series_idx in range(len(self.data_series)):
+            for cat_idx in range(len(self.categories)):
+                baseline, _ = bar_baselines[series_idx][cat_idx]
+                bar_length = self.bar_lengths[series_idx][cat_idx]
+
+                all_keys.append((series_idx, cat_idx))
+                all_baselines.append(baseline)
+                if self.bar_vertical:
+                    all_bar_max.append(baseline - bar_length)
+                else:
+                    all_bar_max.append(baseline + bar_length)
+
+        if len(all_keys) == 0:
+            return {}
+
+        # project min and max bar heights
+        if self.bar_vertical:
+            # most common case, project against y axis on left side ...
+            # less common case, project against y axes on right side ...
+            dependent_axes = [("y", chart_info.axes.y1_axis), ("y2", chart_info.axes.y2_axis)]
+        else:
+            dependent_axes = [("y", chart_info.axes.x1_axis), ("y2", chart_info.axes.x2_axis)]
+
+        if dependent_axes[0][1] is None and dependent_axes[1][1] is None:
+            raise Exception("No Dependent Axis found")
+
+        projected_values = {key: {} for key in all_keys}
+        for value_name, axis_values in dependent_axes:
+            if axis_values is None:
+                continue
+
+            proj_heights = AxisValues.ProjectArray(chart_info.axes, axis_values, self.bar_vertical, all_bar_max)
+            if is_stacked:
+                proj_heights -= AxisValues.ProjectArray(chart_info.axes, axis_values, self.bar_vertical,
+                                                        all_baselines)
+
+            for key, proj_height in zip(all_keys, proj_heights.tolist()):
+                projected_values[key][value_name] = proj_height
+
+        return projected_values
+
     def get_data_series_JSON(self, chart_info, bar_polygons, bar_polygon_index):
         bar_baselines = {}
         for bar_idx, (series_idx, cat_idx, stack_idx, baseline) in enumerate(bar_polygon_index):
@@ -260,7 +350,12 @@ class BarData:
             # no value label assignments
             bar_idx_to_value_label = None
 
-        # now infer data quantities based on polygons ...
+        if bar_idx_to_value_label is None:
+            # infer data quantities based on polygons ... (all bars projected at once)
+            bar_projected_values = self.project_bar_values(chart_info, bar_baselines, is_stacked)
+        else:
+            bar_projected_values = None
+
         # for each data series ...
         data_series = []
         for series_idx, series_text in enumerate(self.data_series):
@@ -279,58 +374,8 @@ class BarData:
                     # use existing value label values ...
                     data_point["y"] = bar_idx_to_value_label[bar_idx]
                 else:
-                    # to get the value of the bar, we need to get the numerical value of the base of the bar
-                    # and subtract it from the value of the top of the bar.... this is scale dependent
-                    bar_length = self.bar_lengths[series_idx][cat_idx]
-                    if self.bar_vertical:
-                        bar_max = baseline - bar_length
-
-                        # project min and max bar heights
-                        if chart_info.axes.y1_axis is not None:
-                            # most common case, project against y axis on left side ...
-                            proj_height = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, bar_max)
-                            data_point["y"] = proj_height
-                            if is_stacked:
-                                proj_base = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, baseline)
-                                data_point["y"] -= proj_base
-
-                        if chart_info.axes.y2_axis is not None:
-                            # less common case, project against y axes on right side ...
-                            proj_height = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, bar_max)
-                            data_point["y2"] = proj_height
-                            if is_stacked:
-                                proj_base = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, baseline)
-                                data_point["y2"] -= proj_base
-
-                        # print(((baseline), (bar_max, proj_height)))
-
-                        if chart_info.axes.y1_axis is None and chart_info.axes.y2_axis is None:
-                            raise Exception("No Dependent Axis found")
-
-                    else:
-                        bar_max = baseline + bar_length
-
-                        # project min and max bar heights
-                        if chart_info.axes.x1_axis is not None:
-                            # most common case, project against y axis on left side ...
-                            proj_height = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, False, bar_max)
-                            data_point["y"] = proj_height
-                            if is_stacked:
-                                proj_base = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, False,
-                                                               baseline)
-                                data_point["y"] -= proj_base
-
-                        if chart_info.axes.x2_axis is not None:
-                            # less common case, project against y axes on right side ...
-                            proj_height = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, False, bar_max)
-                            data_point["y2"] = proj_height
-                            if is_stacked:
-                                proj_base = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, False,
-                                                               baseline)
-                                data_point["y2"] -= proj_base
-
-                        if chart_info.axes.x1_axis is None and chart_info.axes.x2_axis is None:
-                            raise Exception("No Dependent Axis found")
+                    # use the projected values ...
+                    data_point.update(bar_projected_values[(series_idx, cat_idx)])
 
                 # TODO: can I project against categorical axes?
                 # TODO: what happens if there is no dependent axes? (and no labels)
@@ -409,51 +454,55 @@ class BarData:
         else:
             raise Exception("Unexpected Bar Data Grouping found")
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<Data class="BarData">\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<Data class="BarData">\n')
 
         # data series ...
-        xml_str += indent + "   <DataSeries>\n"
+        out_stream.write(indent + "   <DataSeries>\n")
         for series in self.data_series:
             if series is None:
-                xml_str += indent + "       <TextId></TextId>\n"
+                out_stream.write(indent + "       <TextId></TextId>\n")
             else:
-                xml_str += indent + "       <TextId>{0:d}</TextId>\n".format(series.id)
-        xml_str += indent + "   </DataSeries>\n"
+                out_stream.write(indent + "       <TextId>{0:d}</TextId>\n".format(series.id))
+        out_stream.write(indent + "   </DataSeries>\n")
 
         # categories ...
-        xml_str += indent + "   <Categories>\n"
+        out_stream.write(indent + "   <Categories>\n")
         for category in self.categories:
             if category is None:
-                xml_str += indent + "       <TextId></TextId>\n"
+                out_stream.write(indent + "       <TextId></TextId>\n")
             else:
-                xml_str += indent + "       <TextId>{0:d}</TextId>\n".format(category.id)
-        xml_str += indent + "   </Categories>\n"
+                out_stream.write(indent + "       <TextId>{0:d}</TextId>\n".format(category.id))
+        out_stream.write(indent + "   </Categories>\n")
 
         grouping_desc = self.get_grouping_desc()
-        xml_str += indent + "   <Grouping>{0:s}</Grouping>\n".format(grouping_desc)
+        out_stream.write(indent + "   <Grouping>{0:s}</Grouping>\n".format(grouping_desc))
 
-        xml_str += self.bar_sorting.to_XML(indent + "   ")
+        self.bar_sorting.write_XML(out_stream, indent + "   ")
 
-        xml_str += indent + "   <Vertical>{0:s}</Vertical>\n".format("1" if self.bar_vertical else "0")
+        out_stream.write(indent + "   <Vertical>{0:s}</Vertical>\n".format("1" if self.bar_vertical else "0"))
 
-        xml_str += indent + "   <BarOffset>{0:s}</BarOffset>\n".format(str(self.bar_offset))
-        xml_str += indent + "   <BarWidth>{0:s}</BarWidth>\n".format(str(self.bar_width))
-        xml_str += indent + "   <BarInnerDist>{0:s}</BarInnerDist>\n".format(str(self.bar_inner_dist))
-        xml_str += indent + "   <BarOuterDist>{0:s}</BarOuterDist>\n".format(str(self.bar_outer_dist))
+        out_stream.write(indent + "   <BarOffset>{0:s}</BarOffset>\n".format(str(self.bar_offset)))
+        out_stream.write(indent + "   <BarWidth>{0:s}</BarWidth>\n".format(str(self.bar_width)))
+        out_stream.write(indent + "   <BarInnerDist>{0:s}</BarInnerDist>\n".format(str(self.bar_inner_dist)))
+        out_stream.write(indent + "   <BarOuterDist>{0:s}</BarOuterDist>\n".format(str(self.bar_outer_dist)))
 
-        xml_str += indent + "   <BarLengths>\n"
+        out_stream.write(indent + "   <BarLengths>\n")
         xml_value = indent + '           <Length category="{0:d}">{1:s}</Length>\n'
         for s_idx in range(len(self.data_series)):
-            xml_str += indent + '       <Series index="{0:d}">\n'.format(s_idx)
+            out_stream.write(indent + '       <Series index="{0:d}">\n'.format(s_idx))
             for cat_idx in range(len(self.categories)):
-                xml_str += xml_value.format(cat_idx, str(self.bar_lengths[s_idx][cat_idx]))
-            xml_str += indent + "       </Series>\n"
-        xml_str += indent + "   </BarLengths>\n"
+                out_stream.write(xml_value.format(cat_idx, str(self.bar_lengths[s_idx][cat_idx])))
+            out_stream.write(indent + "       </Series>\n")
+        out_stream.write(indent + "   </BarLengths>\n")
 
-        xml_str += indent + '</Data>\n'
+        out_stream.write(indent + '</Data>\n')
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def GroupingFromDesc(desc_string):
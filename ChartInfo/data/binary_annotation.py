@@ -0,0 +1,450 @@
+
+import os
+import json
+import struct
+
+import numpy as np
+
+from .image_info import ImageInfo
+from .panel_tree import PanelTree, PanelNode
+from .chart_info import ChartInfo
+from .text_info import TextInfo
+from .legend_info import LegendInfo
+from .axes_info import AxesInfo
+from .axis_values import AxisValues
+from .tick_info import TickInfo
+from .bar_data import BarData
+from .box_data import BoxData
+from .box_values import BoxValues
+from .line_data import LineData
+from .scatter_data import ScatterData
+
+class BinaryAnnotation:
+    # Compact binary version of the XML annotations. The file layout is:
+    #    - magic string, format version, length of the structure block and number of point coordinates
+    #    - structure block: the annotation without its point lists, as UTF-8 encoded JSON
+    #    - point block: all point coordinates (text polygons, legend markers, lines, scatter points) as float64
+    # Every value goes through the same conversions used by the FromXML functions, so loading the binary version of
+    # an annotation produces the same objects as loading its XML version.
+    Magic = b"CHARTBIN"
+    FormatVersion = 2
+    Extension = ".chbin"
+
+    HeaderFormat = "<8sIIQ"
+
+    def __init__(self):
+        # point lists collected while encoding
+        self.point_arrays = []
+        self.total_points = 0
+
+        # point block while decoding
+        self.points = None
+
+    def add_points(self, points):
+        # returns the reference to the points on the point block (offset, count) ...
+        if points is None:
+            return None
+
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+        reference = [self.total_points, points.shape[0]]
+
+        self.point_arrays.append(points)
+        self.total_points += points.shape[0]
+
+        return reference
+
+    def get_points(self, reference):
+        if reference is None:
+            return None
+
+        offset, count = reference
+        return self.points[offset:offset + count]
+
+    def get_point_list(self, reference):
+        # same as get_points, but using the list of (x, y) tuples representation
+        points = self.get_points(reference)
+        return list(zip(points[:, 0].tolist(), points[:, 1].tolist()))
+
+    # =========================================
+    #   Encoding
+    # =========================================
+
+    @staticmethod
+    def EncodeProperties(properties):
+        # XML stores properties as text, and an empty element is read back as None
+        encoded = {}
+        for key in properties:
+            value_str = str(properties[key])
+            encoded[key] = value_str if value_str != "" else None
+
+        return encoded
+
+    @staticmethod
+    def EncodePanelNode(node):
+        if node.children is None:
+            children = None
+        else:
+            children = [BinaryAnnotation.EncodePanelNode(child) for child in node.children]
+
+        return [int(node.x1), int(node.y1), int(node.x2), int(node.y2), children]
+
+    @staticmethod
+    def EncodeTextIds(text_list):
+        return [None if text is None else int(text.id) for text in text_list]
+
+    def encode_text(self, text_info):
+        return [int(text_info.id), int(text_info.type), text_info.value.strip(),
+                self.add_points(text_info.position_polygon)]
+
+    def encode_legend(self, legend):
+        # same order used by the XML version (labels without a marker are stored as None)
+        return [[int(text_id), self.add_points(legend.marker_per_label[text_id])]
+                for text_id in sorted(list(legend.marker_per_label.keys()))]
+
+    @staticmethod
+    def EncodeAxisValues(axis_values):
+        if axis_values is None:
+            return None
+
+        encoded = {
+            "types": [axis_values.values_type, axis_values.ticks_type, axis_values.scale_type],
+            "title": None if axis_values.title is None else int(axis_values.title),
+        }
+
+        if axis_values.ticks is None:
+            encoded["ticks"] = None
+        else:
+            encoded["ticks"] = [[float(tick.position), None if tick.label_id is None else int(tick.label_id)]
+                                for tick in axis_values.ticks]
+
+        if axis_values.labels is None:
+            encoded["labels"] = None
+        else:
+            encoded["labels"] = [int(text_id) for text_id in axis_values.labels]
+
+        return encoded
+
+    @staticmethod
+    def EncodeAxes(axes):
+        if axes.bounding_box is None:
+            bounding_box = None
+        else:
+            bounding_box = [float(value) for value in axes.bounding_box]
+
+        return {
+            # (validated when loading, like the TickLabels of the XML version)
+            "tick_labels": sorted([int(text_id) for text_id in axes.tick_labels]),
+            "bounding_box": bounding_box,
+            "x1": BinaryAnnotation.EncodeAxisValues(axes.x1_axis),
+            "x2": BinaryAnnotation.EncodeAxisValues(axes.x2_axis),
+            "y1": BinaryAnnotation.EncodeAxisValues(axes.y1_axis),
+            "y2": BinaryAnnotation.EncodeAxisValues(axes.y2_axis),
+        }
+
+    @staticmethod
+    def EncodeBarData(data):
+        return {
+            "class": "BarData",
+            "data_series": BinaryAnnotation.EncodeTextIds(data.data_series),
+            "categories": BinaryAnnotation.EncodeTextIds(data.categories),
+            "vertical": bool(data.bar_vertical),
+            "grouping": data.bar_grouping,
+            "layout": [float(data.bar_offset), float(data.bar_width), float(data.bar_inner_dist),
+                       float(data.bar_outer_dist)],
+            "sorting": [[int(s_idx) for s_idx in group] for group in data.bar_sorting.order],
+            "lengths": [[float(length) for length in series_lengths] for series_lengths in data.bar_lengths],
+        }
+
+    @staticmethod
+    def EncodeBoxData(data):
+        boxes = []
+        for series_boxes in data.boxes:
+            boxes.append([[float(box.box_min), float(box.box_median), float(box.box_max), float(box.whiskers_min),
+                           float(box.whiskers_max)] for box in series_boxes])
+
+        return {
+            "class": "BoxData",
+            "data_series": BinaryAnnotation.EncodeTextIds(data.data_series),
+            "categories": BinaryAnnotation.EncodeTextIds(data.categories),
+            "vertical": bool(data.box_vertical),
+            "grouping": data.box_grouping,
+            "layout": [float(data.box_offset), float(data.box_width), float(data.box_inner_dist),
+                       float(data.box_outer_dist)],
+            "sorting": [[int(s_idx) for s_idx in group] for group in data.box_sorting.order],
+            "boxes": boxes,
+        }
+
+    def encode_data(self, data):
+        if isinstance(data, BarData):
+            return BinaryAnnotation.EncodeBarData(data)
+        elif isinstance(data, BoxData):
+            return BinaryAnnotation.EncodeBoxData(data)
+        elif isinstance(data, LineData):
+            return {
+                "class": "LineData",
+                "data_series": BinaryAnnotation.EncodeTextIds(data.data_series),
+                "points": [self.add_points(line_values.points) for line_values in data.lines],
+            }
+        elif isinstance(data, ScatterData):
+            return {
+                "class": "ScatterData",
+                "data_series": BinaryAnnotation.EncodeTextIds(data.data_series),
+                "points": [self.add_points(scatter_values.points) for scatter_values in data.scatter_values],
+            }
+        else:
+            raise Exception("Support to store data annotations from this chart type not implemented!")
+
+    def encode_chart(self, chart):
+        return {
+            "type": chart.type,
+            "orientation": chart.orientation,
+            "text": [self.encode_text(text_info) for text_info in chart.text],
+            "legend": None if chart.legend is None else self.encode_legend(chart.legend),
+            "axes": None if chart.axes is None else BinaryAnnotation.EncodeAxes(chart.axes),
+            "data": None if chart.data is None else self.encode_data(chart.data),
+            "properties": BinaryAnnotation.EncodeProperties(chart.properties),
+        }
+
+    def encode_image_info(self, image_info):
+        return {
+            "panel_tree": BinaryAnnotation.EncodePanelNode(image_info.panel_tree.root),
+            "panels": [self.encode_chart(chart) for chart in image_info.panels],
+            "properties": BinaryAnnotation.EncodeProperties(image_info.properties),
+        }
+
+    # =========================================
+    #   Decoding
+    # =========================================
+
+    @staticmethod
+    def DecodePanelNode(encoded, parent):
+        x1, y1, x2, y2, encoded_children = encoded
+        node = PanelNode(parent, x1, y1, x2, y2)
+
+        if encoded_children is not None:
+            node.children = [BinaryAnnotation.DecodePanelNode(child, node) for child in encoded_children]
+
+        return node
+
+    @staticmethod
+    def DecodeTextList(text_ids, text_index):
+        return [None if text_id is None else text_index[text_id] for text_id in text_ids]
+
+    def decode_text(self, encoded):
+        text_id, text_type, text_value, polygon_ref = encoded
+        return TextInfo(text_id, self.get_points(polygon_ref), text_type, text_value)
+
+    def decode_legend(self, encoded, legend_labels):
+        legend = LegendInfo(legend_labels)
+
+        for text_id, polygon_ref in encoded:
+            if not text_id in legend.marker_per_label:
+                raise Exception("Reference to invalid text Id found in legend!")
+
+            legend.marker_per_label[text_id] = self.get_points(polygon_ref)
+
+        return legend
+
+    @staticmethod
+    def DecodeAxisValues(encoded):
+        if encoded is None:
+            return None
+
+        values_type, ticks_type, scale_type = encoded["types"]
+        axis_values = AxisValues(values_type, ticks_type, scale_type)
+
+        if encoded["ticks"] is not None:
+            axis_values.ticks = [TickInfo(position, label_id) for position, label_id in encoded["ticks"]]
+
+        if encoded["labels"] is not None:
+            axis_values.labels = encoded["labels"]
+
+        axis_values.title = encoded["title"]
+
+        return axis_values
+
+    @staticmethod
+    def DecodeAxes(encoded, tick_labels, title_labels):
+        axes = AxesInfo(tick_labels, title_labels)
+
+        # validate input tick labels
+        if not set(encoded["tick_labels"]) == set(axes.tick_labels.keys()):
+            raise Exception("Invalid Axes Info on XML file")
+
+        if encoded["bounding_box"] is not None:
+            axes.bounding_box = tuple(encoded["bounding_box"])
+
+        axes.x1_axis = BinaryAnnotation.DecodeAxisValues(encoded["x1"])
+        axes.x2_axis = BinaryAnnotation.DecodeAxisValues(encoded["x2"])
+        axes.y1_axis = BinaryAnnotation.DecodeAxisValues(encoded["y1"])
+        axes.y2_axis = BinaryAnnotation.DecodeAxisValues(encoded["y2"])
+
+        return axes
+
+    @staticmethod
+    def DecodeBarData(encoded, text_index):
+        data_series = BinaryAnnotation.DecodeTextList(encoded["data_series"], text_index)
+        categories = BinaryAnnotation.DecodeTextList(encoded["categories"], text_index)
+        offset, width, inner_dist, outer_dist = encoded["layout"]
+
+        data = BarData(data_series, categories, encoded["vertical"], encoded["grouping"], offset, width, inner_dist,
+                       outer_dist)
+        data.bar_sorting.order = encoded["sorting"]
+        data.bar_lengths = encoded["lengths"]
+
+        return data
+
+    @staticmethod
+    def DecodeBoxData(encoded, text_index):
+        data_series = BinaryAnnotation.DecodeTextList(encoded["data_series"], text_index)
+        categories = BinaryAnnotation.DecodeTextList(encoded["categories"], text_index)
+        offset, width, inner_dist, outer_dist = encoded["layout"]
+
+        data = BoxData(data_series, categories, encoded["vertical"], encoded["grouping"], offset, width, inner_dist,
+                       outer_dist)
+        data.box_sorting.order = encoded["sorting"]
+
+        for s_idx, series_boxes in enumerate(encoded["boxes"]):
+            for cat_idx, (box_min, box_median, box_max, whisker_min, whisker_max) in enumerate(series_boxes):
+                data.boxes[s_idx][cat_idx] = BoxValues(box_min, box_median, box_max, whisker_min, whisker_max)
+
+        return data
+
+    def decode_data(self, encoded, text_index):
+        data_class = encoded["class"]
+
+        if data_class == "BarData":
+            return BinaryAnnotation.DecodeBarData(encoded, text_index)
+        elif data_class == "BoxData":
+            return BinaryAnnotation.DecodeBoxData(encoded, text_index)
+        elif data_class == "LineData":
+            data = LineData(BinaryAnnotation.DecodeTextList(encoded["data_series"], text_index))
+            for idx, points_ref in enumerate(encoded["points"]):
+                data.lines[idx].points = self.get_point_list(points_ref)
+
+            return data
+        elif data_class == "ScatterData":
+            data = ScatterData(BinaryAnnotation.DecodeTextList(encoded["data_series"], text_index))
+            for idx, points_ref in enumerate(encoded["points"]):
+                data.scatter_values[idx].points = self.get_point_list(points_ref)
+
+            return data
+        else:
+            raise Exception("Support to read data annotations from this chart type not implemented!")
+
+    def decode_chart(self, encoded):
+        chart = ChartInfo(encoded["type"], encoded["orientation"])
+
+        chart.text = [self.decode_text(encoded_text) for encoded_text in encoded["text"]]
+
+        if encoded["legend"] is not None:
+            legend_labels = chart.get_all_text(TextInfo.TypeLegendLabel)
+            chart.legend = self.decode_legend(encoded["legend"], legend_labels)
+
+        if encoded["axes"] is not None:
+            axes_labels = chart.get_all_text(TextInfo.TypeTickLabel)
+            title_labels = chart.get_all_text(TextInfo.TypeAxisTitle)
+            chart.axes = BinaryAnnotation.DecodeAxes(encoded["axes"], axes_labels, title_labels)
+
+        if encoded["data"] is not None:
+            chart.data = self.decode_data(encoded["data"], chart.get_text_index())
+
+        chart.properties = encoded["properties"]
+
+        return chart
+
+    def decode_image_info(self, encoded, image):
+        info = ImageInfo(image)
+
+        info.panel_tree = PanelTree(BinaryAnnotation.DecodePanelNode(encoded["panel_tree"], None))
+        info.panels = [self.decode_chart(encoded_chart) for encoded_chart in encoded["panels"]]
+        info.properties = encoded["properties"]
+
+        return info
+
+    # =========================================
+    #   Files
+    # =========================================
+
+    @staticmethod
+    def ToBytes(image_info):
+        serializer = BinaryAnnotation()
+        structure = json.dumps(serializer.encode_image_info(image_info), separators=(",", ":")).encode("utf-8")
+
+        if serializer.total_points > 0:
+            points = np.concatenate(serializer.point_arrays).astype("<f8")
+        else:
+            points = np.zeros((0, 2), dtype="<f8")
+
+        header = struct.pack(BinaryAnnotation.HeaderFormat, BinaryAnnotation.Magic, BinaryAnnotation.FormatVersion,
+                             len(structure), serializer.total_points)
+
+        return header + structure + points.tobytes()
+
+    @staticmethod
+    def ReadHeader(raw_data):
+        # (version, structure size, total points) ...
+        header_size = struct.calcsize(BinaryAnnotation.HeaderFormat)
+        if len(raw_data) < header_size:
+            raise Exception("Invalid binary annotation")
+
+        magic, version, structure_size, total_points = struct.unpack_from(BinaryAnnotation.HeaderFormat, raw_data)
+        if magic != BinaryAnnotation.Magic:
+            raise Exception("Invalid binary annotation")
+
+        return version, structure_size, total_points
+
+    @staticmethod
+    def FromBytes(raw_data, image):
+        header_size = struct.calcsize(BinaryAnnotation.HeaderFormat)
+        version, structure_size, total_points = BinaryAnnotation.ReadHeader(raw_data)
+        if version != BinaryAnnotation.FormatVersion:
+            raise Exception("Unsupported binary annotation version: " + str(version))
+
+        structure_end = header_size + structure_size
+        structure = json.loads(raw_data[header_size:structure_end].decode("utf-8"))
+
+        serializer = BinaryAnnotation()
+        # copy, the annotation tools might modify these points in place
+        serializer.points = np.frombuffer(raw_data, dtype="<f8", count=total_points * 2,
+                                          offset=structure_end).astype(np.float64).reshape((total_points, 2))
+
+        return serializer.decode_image_info(structure, image)
+
+    @staticmethod
+    def Save(image_info, filename):
+        raw_data = BinaryAnnotation.ToBytes(image_info)
+
+        # write to a temporary file first, an interrupted save should never leave a partial file
+        tempo_filename = filename + ".tmp"
+        try:
+            with open(tempo_filename, "wb") as out_file:
+                out_file.write(raw_data)
+        except:
+            if os.path.exists(tempo_filename):
+                os.remove(tempo_filename)
+            raise
+
+        os.replace(tempo_filename, filename)
+
+    @staticmethod
+    def GetFileVersion(filename):
+        # format version of an existing binary annotation (None if it cannot be read)
+        try:
+            with open(filename, "rb") as in_file:
+                version, structure_size, total_points = BinaryAnnotation.ReadHeader(
+                    in_file.read(struct.calcsize(BinaryAnnotation.HeaderFormat)))
+        except Exception:
+            return None
+
+        return version
+
+    @staticmethod
+    def Load(filename, image):
+        try:
+            with open(filename, "rb") as in_file:
+                raw_data = in_file.read()
+        except OSError:
+            raise Exception("Could not read the file: " + filename)
+
+        return BinaryAnnotation.FromBytes(raw_data, image)
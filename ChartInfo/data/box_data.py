@@ -1,4 +1,5 @@
 
+import io
 import numpy as np
 
 from .series_sorting import SeriesSorting
@@ -313,11 +314,9 @@ class BoxData:
 
                     if chart_info.axes.y1_axis is not None:
                         # most common case, project against y axis on left side ...
-                        proj_w_min = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, w_min)
-                        proj_b_min = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, b_min)
-                        proj_b_med = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, b_med)
-                        proj_b_max = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, b_max)
-                        proj_w_max = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, w_max)
+                        all_proj = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y1_axis, True,
+                                                           [w_min, b_min, b_med, b_max, w_max])
+                        proj_w_min, proj_b_min, proj_b_med, proj_b_max, proj_w_max = all_proj.tolist()
 
                         data_point["min"] = proj_w_min
                         data_point["first_quartile"] = proj_b_min
@@ -327,11 +326,9 @@ class BoxData:
 
                     if chart_info.axes.y2_axis is not None:
                         # less common case, project against y axis on right side ...
-                        proj_w_min = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, w_min)
-                        proj_b_min = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, b_min)
-                        proj_b_med = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, b_med)
-                        proj_b_max = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, b_max)
-                        proj_w_max = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, w_max)
+                        all_proj = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y2_axis, True,
+                                                           [w_min, b_min, b_med, b_max, w_max])
+                        proj_w_min, proj_b_min, proj_b_med, proj_b_max, proj_w_max = all_proj.tolist()
 
                         data_point["y2-min"] = proj_w_min
                         data_point["y2-first_quartile"] = proj_b_min
@@ -350,11 +347,9 @@ class BoxData:
 
                     if chart_info.axes.x1_axis is not None:
                         # most common case, project against x axis on bottom  ...
-                        proj_w_min = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, True, w_min)
-                        proj_b_min = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, True, b_min)
-                        proj_b_med = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, True, b_med)
-                        proj_b_max = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, True, b_max)
-                        proj_w_max = AxisValues.Project(chart_info.axes, chart_info.axes.x1_axis, True, w_max)
+                        all_proj = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.x1_axis, True,
+                                                           [w_min, b_min, b_med, b_max, w_max])
+                        proj_w_min, proj_b_min, proj_b_med, proj_b_max, proj_w_max = all_proj.tolist()
 
                         data_point["min"] = proj_w_min
                         data_point["first_quartile"] = proj_b_min
@@ -364,11 +359,9 @@ class BoxData:
 
                     if chart_info.axes.x2_axis is not None:
                         # less common case, project against x axis on top  ...
-                        proj_w_min = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, True, w_min)
-                        proj_b_min = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, True, b_min)
-                        proj_b_med = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, True, b_med)
-                        proj_b_max = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, True, b_max)
-                        proj_w_max = AxisValues.Project(chart_info.axes, chart_info.axes.x2_axis, True, w_max)
+                        all_proj = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.x2_axis, True,
+                                                           [w_min, b_min, b_med, b_max, w_max])
+                        proj_w_min, proj_b_min, proj_b_med, proj_b_max, proj_w_max = all_proj.tolist()
 
                         data_point["y2-min"] = proj_w_min
                         data_point["y2-first_quartile"] = proj_b_min
@@ -407,50 +400,54 @@ class BoxData:
         # print(data_series)
         return boxes, data_series
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<Data class="BoxData">\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<Data class="BoxData">\n')
 
         # data series ...
-        xml_str += indent + "   <DataSeries>\n"
+        out_stream.write(indent + "   <DataSeries>\n")
         for series in self.data_series:
             if series is None:
-                xml_str += indent + "       <TextId></TextId>\n"
+                out_stream.write(indent + "       <TextId></TextId>\n")
             else:
-                xml_str += indent + "       <TextId>{0:d}</TextId>\n".format(series.id)
-        xml_str += indent + "   </DataSeries>\n"
+                out_stream.write(indent + "       <TextId>{0:d}</TextId>\n".format(series.id))
+        out_stream.write(indent + "   </DataSeries>\n")
 
         # categories ...
-        xml_str += indent + "   <Categories>\n"
+        out_stream.write(indent + "   <Categories>\n")
         for category in self.categories:
             if category is None:
-                xml_str += indent + "       <TextId></TextId>\n"
+                out_stream.write(indent + "       <TextId></TextId>\n")
             else:
-                xml_str += indent + "       <TextId>{0:d}</TextId>\n".format(category.id)
-        xml_str += indent + "   </Categories>\n"
+                out_stream.write(indent + "       <TextId>{0:d}</TextId>\n".format(category.id))
+        out_stream.write(indent + "   </Categories>\n")
 
         grouping_desc = self.get_grouping_desc()
-        xml_str += indent + "   <Grouping>{0:s}</Grouping>\n".format(grouping_desc)
+        out_stream.write(indent + "   <Grouping>{0:s}</Grouping>\n".format(grouping_desc))
 
-        xml_str += self.box_sorting.to_XML(indent + "   ")
+        self.box_sorting.write_XML(out_stream, indent + "   ")
 
-        xml_str += indent + "   <Vertical>{0:s}</Vertical>\n".format("1" if self.box_vertical else "0")
+        out_stream.write(indent + "   <Vertical>{0:s}</Vertical>\n".format("1" if self.box_vertical else "0"))
 
-        xml_str += indent + "   <BoxOffset>{0:s}</BoxOffset>\n".format(str(self.box_offset))
-        xml_str += indent + "   <BoxWidth>{0:s}</BoxWidth>\n".format(str(self.box_width))
-        xml_str += indent + "   <BoxInnerDist>{0:s}</BoxInnerDist>\n".format(str(self.box_inner_dist))
-        xml_str += indent + "   <BoxOuterDist>{0:s}</BoxOuterDist>\n".format(str(self.box_outer_dist))
+        out_stream.write(indent + "   <BoxOffset>{0:s}</BoxOffset>\n".format(str(self.box_offset)))
+        out_stream.write(indent + "   <BoxWidth>{0:s}</BoxWidth>\n".format(str(self.box_width)))
+        out_stream.write(indent + "   <BoxInnerDist>{0:s}</BoxInnerDist>\n".format(str(self.box_inner_dist)))
+        out_stream.write(indent + "   <BoxOuterDist>{0:s}</BoxOuterDist>\n".format(str(self.box_outer_dist)))
 
-        xml_str += indent + "   <BoxValues>\n"
+        out_stream.write(indent + "   <BoxValues>\n")
         for s_idx in range(len(self.data_series)):
-            xml_str += indent + '       <Series index="{0:d}">\n'.format(s_idx)
+            out_stream.write(indent + '       <Series index="{0:d}">\n'.format(s_idx))
             for cat_idx in range(len(self.categories)):
-                xml_str += self.boxes[s_idx][cat_idx].to_XML(indent + "           ")
-            xml_str += indent + "       </Series>\n"
-        xml_str += indent + "   </BoxValues>\n"
+                self.boxes[s_idx][cat_idx].write_XML(out_stream, indent + "           ")
+            out_stream.write(indent + "       </Series>\n")
+        out_stream.write(indent + "   </BoxValues>\n")
+
+        out_stream.write(indent + '</Data>\n')
 
-        xml_str += indent + '</Data>\n'
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def GroupingFromDesc(desc_string):
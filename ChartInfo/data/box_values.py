@@ -1,4 +1,6 @@
 
+import io
+
 class BoxValues:
     def __init__(self, box_min, box_median, box_max, whisker_min, whisker_max):
         self.box_min = box_min
@@ -126,16 +128,20 @@ class BoxValues:
 
         return BoxValues(other.box_min, other.box_median, other.box_max, other.whiskers_min, other.whiskers_max)
 
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<BoxValues>\n')
+        out_stream.write(indent + "    <WhiskerMinimum>{0:s}</WhiskerMinimum>\n".format(str(self.whiskers_min)))
+        out_stream.write(indent + "    <BoxMinimum>{0:s}</BoxMinimum>\n".format(str(self.box_min)))
+        out_stream.write(indent + "    <BoxMedian>{0:s}</BoxMedian>\n".format(str(self.box_median)))
+        out_stream.write(indent + "    <BoxMaximum>{0:s}</BoxMaximum>\n".format(str(self.box_max)))
+        out_stream.write(indent + "    <WhiskerMaximum>{0:s}</WhiskerMaximum>\n".format(str(self.whiskers_max)))
+        out_stream.write(indent + '</BoxValues>\n')
+
     def to_XML(self, indent=""):
-        xml_str = indent + '<BoxValues>\n'
-        xml_str += indent + "    <WhiskerMinimum>{0:s}</WhiskerMinimum>\n".format(str(self.whiskers_min))
-        xml_str += indent + "    <BoxMinimum>{0:s}</BoxMinimum>\n".format(str(self.box_min))
-        xml_str += indent + "    <BoxMedian>{0:s}</BoxMedian>\n".format(str(self.box_median))
-        xml_str += indent + "    <BoxMaximum>{0:s}</BoxMaximum>\n".format(str(self.box_max))
-        xml_str += indent + "    <WhiskerMaximum>{0:s}</WhiskerMaximum>\n".format(str(self.whiskers_max))
-        xml_str += indent + '</BoxValues>\n'
-
-        return xml_str
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
+
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
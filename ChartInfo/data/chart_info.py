@@ -1,4 +1,5 @@
 
+import io
 import time
 
 from .text_info import TextInfo
@@ -259,31 +260,35 @@ class ChartInfo:
 
         return chart_type, orientation_type
 
-    def to_XML(self, indent=""):
+    def write_XML(self, out_stream, indent=""):
         type_str, orientation_str = self.get_description()
 
-        xml_str = indent + "<ChartInfo>\n"
-        xml_str += indent + '    <Type orientation="{0:s}">{1:s}</Type>\n'.format(orientation_str, type_str)
-        xml_str += indent + '    <Text>\n'
+        out_stream.write(indent + "<ChartInfo>\n")
+        out_stream.write(indent + '    <Type orientation="{0:s}">{1:s}</Type>\n'.format(orientation_str, type_str))
+        out_stream.write(indent + '    <Text>\n')
         for text_info in self.text:
-            xml_str += text_info.to_XML(indent + "        ")
-        xml_str += indent + '    </Text>\n'
+            text_info.write_XML(out_stream, indent + "        ")
+        out_stream.write(indent + '    </Text>\n')
         if self.legend is not None:
-            xml_str += self.legend.to_XML(indent + "    ")
+            self.legend.write_XML(out_stream, indent + "    ")
         if self.axes is not None:
-            xml_str += self.axes.to_XML(indent + "    ")
+            self.axes.write_XML(out_stream, indent + "    ")
         if self.data is not None:
-            xml_str += self.data.to_XML(indent + "    ")
+            self.data.write_XML(out_stream, indent + "    ")
 
         if len(self.properties) > 0:
-            xml_str += indent + '    <Properties>\n'
+            out_stream.write(indent + '    <Properties>\n')
             for key in self.properties:
-                xml_str += indent + '        <{0:s}>{1:s}</{0:s}>\n'.format(key, str(self.properties[key]))
-            xml_str += indent + '    </Properties>\n'
+                out_stream.write(indent + '        <{0:s}>{1:s}</{0:s}>\n'.format(key, str(self.properties[key])))
+            out_stream.write(indent + '    </Properties>\n')
+
+        out_stream.write(indent + "</ChartInfo>\n")
 
-        xml_str += indent + "</ChartInfo>\n"
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
@@ -0,0 +1,485 @@
+
+import numpy as np
+
+from xml.sax.saxutils import unescape
+
+# use lxml if available, otherwise fall back to the standard library
+try:
+    from lxml import etree as ET
+    LXMLBackend = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXMLBackend = False
+
+from .image_info import ImageInfo
+from .panel_tree import PanelTree
+from .chart_info import ChartInfo
+from .text_info import TextInfo
+from .legend_info import LegendInfo
+from .axes_info import AxesInfo
+from .bar_data import BarData
+from .box_data import BoxData
+from .box_values import BoxValues
+from .series_sorting import SeriesSorting
+from .line_data import LineData
+from .line_values import LineValues
+from .scatter_data import ScatterData
+from .scatter_values import ScatterValues
+
+class FastXMLLoader:
+    # Produces exactly the same objects as ImageInfo.FromXML, but it relies on the fixed structure of the files
+    # written by the to_XML functions: each node is visited once and point lists are decoded straight into arrays
+
+    # order of the values of each box (as written by BoxValues.write_XML)
+    BoxValuesTags = ["WhiskerMinimum", "BoxMinimum", "BoxMedian", "BoxMaximum", "WhiskerMaximum"]
+
+    @staticmethod
+    def ChildrenByTag(xml_root):
+        # single pass equivalent of repeated find() calls (keeps the first child of each tag)
+        children = {}
+        for xml_child in xml_root:
+            if not xml_child.tag in children:
+                children[xml_child.tag] = xml_child
+
+        return children
+
+    @staticmethod
+    def Parse(filename):
+        try:
+            if LXMLBackend:
+                # white space between tags is never meaningful on these files
+                return ET.parse(filename, ET.XMLParser(remove_blank_text=True)).getroot()
+            else:
+                # parsing from memory is faster than parsing from the file handle
+                with open(filename, "rb") as in_file:
+                    return ET.fromstring(in_file.read())
+        except:
+            raise Exception("Could not parse the file: " + filename)
+
+    @staticmethod
+    def DecodePoints(xml_root):
+        # <Point><X>..</X><Y>..</Y></Point> sequence to a (n x 2) array
+        # (the raw strings are converted by numpy in a single call)
+        raw_values = [xml_value.text for xml_point in xml_root for xml_value in xml_point]
+        values = np.array(raw_values, dtype=np.float64)
+
+        return values.reshape((len(xml_root), 2))
+
+    @staticmethod
+    def DecodePointList(xml_root):
+        # same as DecodePoints, but using the list of (x, y) tuples representation
+        points = FastXMLLoader.DecodePoints(xml_root)
+
+        return list(zip(points[:, 0].tolist(), points[:, 1].tolist()))
+
+    @staticmethod
+    def LoadTextInfo(xml_root):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        text_id = int(children["Id"].text)
+        polygon_points = FastXMLLoader.DecodePoints(children["Polygon"])
+        text_type = TextInfo.TypeFromDescription(children["Type"].text)
+        text_value = unescape(children["Value"].text.strip())
+
+        return TextInfo(text_id, polygon_points, text_type, text_value)
+
+    @staticmethod
+    def LoadTextIds(xml_root):
+        # list of optional text ids (empty <TextId></TextId> = None)
+        text_ids = []
+        for xml_text_id in xml_root:
+            text_id = xml_text_id.text
+            if text_id is None or text_id.strip() == "":
+                text_ids.append(None)
+            else:
+                text_ids.append(int(text_id))
+
+        return text_ids
+
+    @staticmethod
+    def LoadTextList(xml_root, text_index):
+        # list of optional text regions (data series or categories)
+        text_ids = FastXMLLoader.LoadTextIds(xml_root)
+
+        return [None if text_id is None else text_index[text_id] for text_id in text_ids]
+
+    @staticmethod
+    def DecodeValues(xml_root):
+        # <Series><Value>..</Value>...</Series> sequence to a list of lists of floats
+        # (the result is a list, converting each value directly is faster than converting through numpy)
+        return [[float(xml_value.text) for xml_value in xml_series] for xml_series in xml_root]
+
+    @staticmethod
+    def LoadBarData(xml_root, text_index):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        data_series = FastXMLLoader.LoadTextList(children["DataSeries"], text_index)
+        categories = FastXMLLoader.LoadTextList(children["Categories"], text_index)
+
+        vertical = children["Vertical"].text == "1"
+        grouping = BarData.GroupingFromDesc(children["Grouping"].text)
+
+        offset = float(children["BarOffset"].text)
+        width = float(children["BarWidth"].text)
+        inner_dist = float(children["BarInnerDist"].text)
+        outer_dist = float(children["BarOuterDist"].text)
+
+        data = BarData(data_series, categories, vertical, grouping, offset, width, inner_dist, outer_dist)
+        data.bar_sorting = SeriesSorting.FromXML(children["SeriesSorting"])
+
+        for s_idx, lengths in enumerate(FastXMLLoader.DecodeValues(children["BarLengths"])):
+            data.bar_lengths[s_idx][:len(lengths)] = lengths
+
+        return data
+
+    @staticmethod
+    def LoadBoxData(xml_root, text_index):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        data_series = FastXMLLoader.LoadTextList(children["DataSeries"], text_index)
+        categories = FastXMLLoader.LoadTextList(children["Categories"], text_index)
+
+        vertical = children["Vertical"].text == "1"
+        grouping = BoxData.GroupingFromDesc(children["Grouping"].text)
+
+        offset = float(children["BoxOffset"].text)
+        width = float(children["BoxWidth"].text)
+        inner_dist = float(children["BoxInnerDist"].text)
+        outer_dist = float(children["BoxOuterDist"].text)
+
+        data = BoxData(data_series, categories, vertical, grouping, offset, width, inner_dist, outer_dist)
+        data.box_sorting = SeriesSorting.FromXML(children["SeriesSorting"])
+
+        # the values of all boxes are read in a single pass (without a find() call per value)
+        xml_all_box_values = children["BoxValues"]
+        raw_tags = []
+        values = []
+        for xml_series in xml_all_box_values:
+            for xml_box_values in xml_series:
+                for xml_value in xml_box_values:
+                    raw_tags.append(xml_value.tag)
+                    values.append(float(xml_value.text))
+
+        tags = FastXMLLoader.BoxValuesTags
+        if raw_tags != tags * (len(values) // len(tags)):
+            # not written by BoxValues.write_XML ... use the general loader
+            return BoxData.FromXML(xml_root, text_index)
+
+        value_idx = 0
+        for s_idx, xml_series in enumerate(xml_all_box_values):
+            for cat_idx in range(len(xml_series)):
+                whisker_min, box_min, box_median, box_max, whisker_max = values[value_idx:value_idx + len(tags)]
+                data.boxes[s_idx][cat_idx] = BoxValues(box_min, box_median, box_max, whisker_min, whisker_max)
+                value_idx += len(tags)
+
+        return data
+
+    @staticmethod
+    def LoadLineData(xml_root, text_index):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        data = LineData(FastXMLLoader.LoadTextList(children["DataSeries"], text_index))
+
+        for idx, xml_line_values in enumerate(children["LinesValues"]):
+            values = LineValues()
+            values.points = FastXMLLoader.DecodePointList(xml_line_values)
+            data.lines[idx] = values
+
+        return data
+
+    @staticmethod
+    def LoadScatterData(xml_root, text_index):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        data = ScatterData(FastXMLLoader.LoadTextList(children["DataSeries"], text_index))
+
+        for idx, xml_scatter_values in enumerate(children["ChartValues"]):
+            values = ScatterValues()
+            values.points = FastXMLLoader.DecodePointList(xml_scatter_values)
+            data.scatter_values[idx] = values
+
+        return data
+
+    @staticmethod
+    def LoadData(xml_root, text_index):
+        # assumes that xml_root is Data node
+        data_class = xml_root.attrib["class"]
+        if data_class == "BarData":
+            return FastXMLLoader.LoadBarData(xml_root, text_index)
+        elif data_class == "BoxData":
+            return FastXMLLoader.LoadBoxData(xml_root, text_index)
+        elif data_class == "LineData":
+            return FastXMLLoader.LoadLineData(xml_root, text_index)
+        elif data_class == "ScatterData":
+            return FastXMLLoader.LoadScatterData(xml_root, text_index)
+        else:
+            raise Exception("Support to read data annotations from this chart type not implemented!")
+
+    @staticmethod
+    def IsOutdatedAxes(xml_root):
+        # same version check done by AxesInfo.FromXML (without loading the axes)
+        xml_version = xml_root.find("Version")
+        return xml_version is None or float(xml_version.text) < AxesInfo.DataVersion
+
+    @staticmethod
+    def LoadChartInfo(xml_root):
+        # assumes that xml_root is ChartInfo node
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        xml_type = children["Type"]
+        chart_type, orientation_type = ChartInfo.TypesFromDescription(xml_type.text, xml_type.attrib["orientation"])
+
+        # create basic panel ...
+        chart = ChartInfo(chart_type, orientation_type)
+
+        # load text annotations (if any)
+        chart.text = [FastXMLLoader.LoadTextInfo(xml_text) for xml_text in children["Text"]]
+
+        # load legend (if any)
+        if "Legend" in children:
+            legend_labels = chart.get_all_text(TextInfo.TypeLegendLabel)
+            chart.legend = LegendInfo.FromXML(children["Legend"], legend_labels)
+
+        # load axes (if any)
+        if "Axes" in children:
+            axes_labels = chart.get_all_text(TextInfo.TypeTickLabel)
+            title_labels = chart.get_all_text(TextInfo.TypeAxisTitle)
+            chart.axes, outdated_axes = AxesInfo.FromXML(children["Axes"], axes_labels, title_labels)
+        else:
+            outdated_axes = False
+
+        # load data (if any)
+        if "Data" in children:
+            chart.data = FastXMLLoader.LoadData(children["Data"], chart.get_text_index())
+
+        # load properties (if any)
+        if "Properties" in children:
+            for xml_property in children["Properties"]:
+                chart.properties[xml_property.tag] = xml_property.text
+
+        # remove out-dated verifications ...
+        if outdated_axes and "VERIFIED_04_AXIS" in chart.properties:
+            print("-> WARNING: File contains Axis information in old format!")
+            del chart.properties["VERIFIED_04_AXIS"]
+
+        return chart
+
+    @staticmethod
+    def LoadImageInfo(filename, image, lazy=False):
+        # in lazy mode, the sections of each panel (text, legend, axes, data) are loaded on first access
+        children = FastXMLLoader.ChildrenByTag(FastXMLLoader.Parse(filename))
+
+        info = ImageInfo(image)
+
+        # load panel tree ....
+        info.panel_tree = PanelTree.FromXML(children["PanelTree"])
+
+        # load panels ....
+        if lazy:
+            info.panels = [LazyChartInfo(xml_panel) for xml_panel in children["Panels"]]
+        else:
+            info.panels = [FastXMLLoader.LoadChartInfo(xml_panel) for xml_panel in children["Panels"]]
+
+        # load properties (if any)
+        if "Properties" in children:
+            for xml_property in children["Properties"]:
+                info.properties[xml_property.tag] = xml_property.text
+
+        return info
+
+
+class LazyChartInfo(ChartInfo):
+    # A ChartInfo which keeps the XML of its sections (text, legend, axes and data) and only loads each of them on
+    # first access. Type, orientation and properties are always loaded. The status checks are computed directly from
+    # the XML of the sections that have not been loaded yet, so status reports never load any section.
+    Sections = ["text", "legend", "axes", "data"]
+
+    def __init__(self, xml_root):
+        children = FastXMLLoader.ChildrenByTag(xml_root)
+
+        xml_type = children["Type"]
+        chart_type, orientation_type = ChartInfo.TypesFromDescription(xml_type.text, xml_type.attrib["orientation"])
+
+        # sections loaded so far, and XML of the sections which have not been loaded yet
+        self.__sections = {}
+        self.__pending = {}
+
+        ChartInfo.__init__(self, chart_type, orientation_type)
+
+        self.__pending["text"] = children["Text"]
+        for section, tag in [("legend", "Legend"), ("axes", "Axes"), ("data", "Data")]:
+            if tag in children:
+                self.__pending[section] = children[tag]
+
+        # load properties (if any)
+        if "Properties" in children:
+            for xml_property in children["Properties"]:
+                self.properties[xml_property.tag] = xml_property.text
+
+        # remove out-dated verifications ...
+        if ("Axes" in children and FastXMLLoader.IsOutdatedAxes(children["Axes"]) and
+            "VERIFIED_04_AXIS" in self.properties):
+            print("-> WARNING: File contains Axis information in old format!")
+            del self.properties["VERIFIED_04_AXIS"]
+
+    def is_loaded(self, section):
+        return not section in self.__pending
+
+    def load_all(self):
+        for section in LazyChartInfo.Sections:
+            if section in self.__pending:
+                self.__load_section(section)
+
+    def __load_section(self, section):
+        xml_root = self.__pending[section]
+
+        if section == "text":
+            del self.__pending[section]
+            self.__sections["text"] = [FastXMLLoader.LoadTextInfo(xml_text) for xml_text in xml_root]
+            return
+
+        # all other sections refer to the text regions ...
+        if section == "legend":
+            legend_labels = self.get_all_text(TextInfo.TypeLegendLabel)
+            value = LegendInfo.FromXML(xml_root, legend_labels)
+        elif section == "axes":
+            axes_labels = self.get_all_text(TextInfo.TypeTickLabel)
+            title_labels = self.get_all_text(TextInfo.TypeAxisTitle)
+            value, outdated_axes = AxesInfo.FromXML(xml_root, axes_labels, title_labels)
+        else:
+            value = FastXMLLoader.LoadData(xml_root, self.get_text_index())
+
+        del self.__pending[section]
+        self.__sections[section] = value
+
+    def __get_section(self, section):
+        if section in self.__pending:
+            self.__load_section(section)
+
+        return self.__sections[section]
+
+    def __set_section(self, section, value):
+        if section == "text":
+            # load everything else first, all sections must refer to the original text regions
+            self.load_all()
+        elif section in self.__pending:
+            del self.__pending[section]
+
+        self.__sections[section] = value
+
+    @property
+    def text(self):
+        return self.__get_section("text")
+
+    @text.setter
+    def text(self, value):
+        self.__set_section("text", value)
+
+    @property
+    def legend(self):
+        return self.__get_section("legend")
+
+    @legend.setter
+    def legend(self, value):
+        self.__set_section("legend", value)
+
+    @property
+    def axes(self):
+        return self.__get_section("axes")
+
+    @axes.setter
+    def axes(self, value):
+        self.__set_section("axes", value)
+
+    @property
+    def data(self):
+        return self.__get_section("data")
+
+    @data.setter
+    def data(self, value):
+        self.__set_section("data", value)
+
+    def __get_text_types(self):
+        # text id -> text type, taken from the XML of the text regions
+        text_types = {}
+        for xml_text in self.__pending["text"]:
+            children = FastXMLLoader.ChildrenByTag(xml_text)
+            text_types[int(children["Id"].text)] = TextInfo.TypeFromDescription(children["Type"].text)
+
+        return text_types
+
+    def __get_text_ids(self, text_type):
+        # ids of the text regions of the given type (from the XML if the text has not been loaded yet)
+        if "text" in self.__pending:
+            text_types = self.__get_text_types()
+            return set([text_id for text_id in text_types if text_types[text_id] == text_type])
+        else:
+            return set([text.id for text in self.get_all_text(text_type)])
+
+    def check_text(self):
+        if not "text" in self.__pending:
+            return ChartInfo.check_text(self)
+
+        if len(self.__pending["text"]) > 0:
+            return 2 if "VERIFIED_02_TEXT" in self.properties else 1
+        else:
+            return 0
+
+    def check_legend(self):
+        if not "legend" in self.__pending or not "text" in self.__pending:
+            return ChartInfo.check_legend(self)
+
+        # the legend is complete if every legend label has a marker
+        legend_labels = self.__get_text_ids(TextInfo.TypeLegendLabel)
+        labels_with_marker = set()
+        for xml_marker_label in self.__pending["legend"]:
+            text_id = int(xml_marker_label.find("TextId").text)
+
+            # same validation done by LegendInfo.FromXML
+            if not text_id in legend_labels:
+                raise Exception("Reference to invalid text Id found in legend!")
+
+            if xml_marker_label.find("Polygon") is not None:
+                labels_with_marker.add(text_id)
+
+        for text_id in legend_labels:
+            if not text_id in labels_with_marker:
+                return 0
+
+        return 2 if "VERIFIED_03_LEGEND" in self.properties else 1
+
+    def check_axes(self):
+        xml_axes = self.__pending.get("axes")
+        if xml_axes is None or xml_axes.find("Version") is None:
+            # already loaded (or legacy format which requires conversion)
+            return ChartInfo.check_axes(self)
+
+        # same validation done by AxesInfo.FromXML
+        validation_ids = [int(xml_text_id.text) for xml_text_id in xml_axes.find("TickLabels").findall("TextId")]
+        if not set(validation_ids) == self.__get_text_ids(TextInfo.TypeTickLabel):
+            raise Exception("Invalid Axes Info on XML file")
+
+        # complete if it has a bounding box and at least one axis with ticks (labels are never None after loading)
+        complete = False
+        if xml_axes.find("BoundingBox") is not None:
+            for tag in ["AxisX1", "AxisX2", "AxisY1", "AxisY2"]:
+                xml_axis = xml_axes.find(tag)
+                if xml_axis is not None and xml_axis.find("AxisValues").find("Ticks") is not None:
+                    complete = True
+                    break
+
+        if not complete:
+            return 0
+        else:
+            return 2 if "VERIFIED_04_AXIS" in self.properties else 1
+
+    def check_data(self):
+        if not "data" in self.__pending:
+            return ChartInfo.check_data(self)
+
+        return 2 if "VERIFIED_05_DATA" in self.properties else 1
+
+    def __getstate__(self):
+        # XML elements cannot be pickled ... load everything first
+        self.load_all()
+        return self.__dict__
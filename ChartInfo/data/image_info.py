@@ -1,4 +1,5 @@
 
+import io
 import os
 
 import xml.etree.ElementTree as ET
@@ -67,23 +68,28 @@ class ImageInfo:
 
         return min(all_scores)
 
-    def to_XML(self):
-        xml_str = "<ImageInfo>\n"
+    def write_XML(self, out_stream):
+        out_stream.write("<ImageInfo>\n")
 
-        xml_str += self.panel_tree.to_XML()
-        xml_str += "    <Panels>\n"
+        self.panel_tree.write_XML(out_stream)
+        out_stream.write("    <Panels>\n")
         for panel in self.panels:
-            xml_str += panel.to_XML("        ")
-        xml_str += "    </Panels>\n"
+            panel.write_XML(out_stream, "        ")
+        out_stream.write("    </Panels>\n")
 
         if len(self.properties) > 0:
-            xml_str += '    <Properties>\n'
+            out_stream.write('    <Properties>\n')
             for key in self.properties:
-                xml_str += '        <{0:s}>{1:s}</{0:s}>\n'.format(key, str(self.properties[key]))
-            xml_str += '    </Properties>\n'
+                out_stream.write('        <{0:s}>{1:s}</{0:s}>\n'.format(key, str(self.properties[key])))
+            out_stream.write('    </Properties>\n')
+
+        out_stream.write("</ImageInfo>\n")
+
+    def to_XML(self):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream)
 
-        xml_str += "</ImageInfo>\n"
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(filename, image):
@@ -1,5 +1,7 @@
 
 
+import io
+
 from .tick_info import TickInfo
 
 class LegacyAxesInfo:
@@ -62,59 +64,63 @@ class LegacyAxesInfo:
 
         return [text_label for cy, text_label in tempo_sorted]
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<Axes>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<Axes>\n")
 
         # tick labels ....
-        xml_str += indent + "    <TickLabels>\n"
+        out_stream.write(indent + "    <TickLabels>\n")
         for text_id in self.tick_labels:
-            xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
-        xml_str += indent + "    </TickLabels>\n"
+            out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
+        out_stream.write(indent + "    </TickLabels>\n")
 
         # bounding box (x1, y1, x2, y2)
         if self.bounding_box is not None:
             x1, y1, x2, y2 = self.bounding_box
-            xml_str += indent + "    <BoundingBox>\n"
-            xml_str += indent + "        <X1>{0:s}</X1>\n".format(str(x1))
-            xml_str += indent + "        <Y1>{0:s}</Y1>\n".format(str(y1))
-            xml_str += indent + "        <X2>{0:s}</X2>\n".format(str(x2))
-            xml_str += indent + "        <Y2>{0:s}</Y2>\n".format(str(y2))
-            xml_str += indent + "    </BoundingBox>\n"
+            out_stream.write(indent + "    <BoundingBox>\n")
+            out_stream.write(indent + "        <X1>{0:s}</X1>\n".format(str(x1)))
+            out_stream.write(indent + "        <Y1>{0:s}</Y1>\n".format(str(y1)))
+            out_stream.write(indent + "        <X2>{0:s}</X2>\n".format(str(x2)))
+            out_stream.write(indent + "        <Y2>{0:s}</Y2>\n".format(str(y2)))
+            out_stream.write(indent + "    </BoundingBox>\n")
 
         # absolute points ... (sorted lists)
         if self.x_ticks is not None:
-            xml_str += indent + "    <TicksX>\n"
+            out_stream.write(indent + "    <TicksX>\n")
             for tick_info in self.x_ticks:
-                xml_str += tick_info.to_XML(indent + "        ")
-            xml_str += indent + "    </TicksX>\n"
+                tick_info.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </TicksX>\n")
 
         if self.y_ticks is not None:
-            xml_str += indent + "    <TicksY>\n"
+            out_stream.write(indent + "    <TicksY>\n")
             for tick_info in self.y_ticks:
-                xml_str += tick_info.to_XML(indent + "        ")
-            xml_str += indent + "    </TicksY>\n"
+                tick_info.write_XML(out_stream, indent + "        ")
+            out_stream.write(indent + "    </TicksY>\n")
 
         if self.x_title is not None:
-            xml_str += indent + "    <TitleX>{0:d}</TitleX>\n".format(self.x_title)
+            out_stream.write(indent + "    <TitleX>{0:d}</TitleX>\n".format(self.x_title))
         if self.y_title is not None:
-            xml_str += indent + "    <TitleY>{0:d}</TitleY>\n".format(self.y_title)
+            out_stream.write(indent + "    <TitleY>{0:d}</TitleY>\n".format(self.y_title))
 
         # divided tick labels ... (un-sorted lists of text ids)
         if self.x_labels is not None:
-            xml_str += indent + "    <LabelsX>\n"
+            out_stream.write(indent + "    <LabelsX>\n")
             for text_id in self.x_labels:
-                xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
-            xml_str += indent + "    </LabelsX>\n"
+                out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
+            out_stream.write(indent + "    </LabelsX>\n")
 
         if self.y_labels is not None:
-            xml_str += indent + "    <LabelsY>\n"
+            out_stream.write(indent + "    <LabelsY>\n")
             for text_id in self.y_labels:
-                xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
-            xml_str += indent + "    </LabelsY>\n"
+                out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
+            out_stream.write(indent + "    </LabelsY>\n")
 
-        xml_str += indent + "</Axes>\n"
+        out_stream.write(indent + "</Axes>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root, tick_labels, title_labels):
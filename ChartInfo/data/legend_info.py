@@ -1,4 +1,5 @@
 
+import io
 import numpy as np
 
 # from shapely.geometry import Point
@@ -114,23 +115,27 @@ class LegendInfo:
 
         return [text for val, text in all_sorted]
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<Legend>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<Legend>\n")
         for text_id in sorted(list(self.marker_per_label.keys())):
-            xml_str += indent + "    <MarkPerLabel>\n"
-            xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(text_id)
+            out_stream.write(indent + "    <MarkPerLabel>\n")
+            out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(text_id))
             if self.marker_per_label[text_id] is not None:
-                xml_str += indent + "        <Polygon>\n"
+                out_stream.write(indent + "        <Polygon>\n")
                 for x, y in self.marker_per_label[text_id]:
-                    xml_str += indent + "            <Point>\n"
-                    xml_str += indent + "                <X>{0:s}</X>\n".format(str(x))
-                    xml_str += indent + "                <Y>{0:s}</Y>\n".format(str(y))
-                    xml_str += indent + "            </Point>\n"
-                xml_str += indent + "        </Polygon>\n"
-            xml_str += indent + "    </MarkPerLabel>\n"
-        xml_str += indent + "</Legend>\n"
-
-        return xml_str
+                    out_stream.write(indent + "            <Point>\n")
+                    out_stream.write(indent + "                <X>{0:s}</X>\n".format(str(x)))
+                    out_stream.write(indent + "                <Y>{0:s}</Y>\n".format(str(y)))
+                    out_stream.write(indent + "            </Point>\n")
+                out_stream.write(indent + "        </Polygon>\n")
+            out_stream.write(indent + "    </MarkPerLabel>\n")
+        out_stream.write(indent + "</Legend>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
+
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root, text_labels):
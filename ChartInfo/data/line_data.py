@@ -1,4 +1,8 @@
 
+import io
+
+import numpy as np
+
 from .line_values import LineValues
 from .axis_values import AxisValues
 
@@ -98,9 +102,6 @@ class LineData:
             # for now, we assume that X-1 (or X-2) represent the independent variables
             # TODO: future versions should include a label for dependent/independent variable (similar to orientation)
 
-            current_data_series = []
-            current_line_points = []
-
             if var_x_chart_values is None:
                 # Line-based sampling of x coordinates is required
                 # A numerical X axis with a valid scale is expected
@@ -108,10 +109,9 @@ class LineData:
                 all_rel_x_values = line_values.get_all_x_values()
                 line_x_pixel_points = [x_val + x1 for x_val in all_rel_x_values]
 
-                line_x_chart_values = []
-                for x_val in line_x_pixel_points:
-                    proj_x_val = AxisValues.Project(chart_info.axes, x_axis, False, x_val)
-                    line_x_chart_values.append(proj_x_val)
+                # project all x coordinates at once ...
+                line_x_chart_values = AxisValues.ProjectArray(chart_info.axes, x_axis, False,
+                                                              line_x_pixel_points).tolist()
             else:
                 # use the common x values sampled for all lines ...
                 line_x_pixel_points = var_x_pixel_points
@@ -120,48 +120,39 @@ class LineData:
             # get line container box in coordinates relative to the data region
             lr_min_x, lr_min_y, lr_max_x, lr_max_y = line_values.get_line_relative_bbox()
 
-            for x_val_idx in range(len(line_x_chart_values)):
-                # print((series_idx, series_text, x_val_idx))
-                if var_x_chart_values is not None:
-                    # we need to differentiate and avoid sampling lines at unknown points needing extrapolation
-                    # if they are too far away from the range of known points
-                    # print((line_x_pixel_points[x_val_idx], x1, lr_min_x, LineData.Parsing_TickInRangeThreshold, lr_max_x))
-                    if ((line_x_pixel_points[x_val_idx] < x1 + lr_min_x - LineData.Parsing_TickInRangeThreshold) or
-                        (x1 + lr_max_x + LineData.Parsing_TickInRangeThreshold < line_x_pixel_points[x_val_idx])):
-                        # point is out of range for interpolation, and too far to extrapolate with confidence ...
-                        # skip!!!
-                        continue
-
-                # print("-not skipped!")
-
-                # get point in relative coordinate space (with respect to the data region)
-                rel_x_value = line_x_pixel_points[x_val_idx] - x1
-                rel_y_value = line_values.get_y_value(rel_x_value)
-
-                line_y_pixel = y2 - rel_y_value
-
-                line_data_point = {
-                    "x": line_x_pixel_points[x_val_idx],
-                    "y": line_y_pixel,
-                }
-                current_line_points.append(line_data_point)
-
-                data_series_point = {
-                    "x": line_x_chart_values[x_val_idx],
-                }
-
-                # get Y value on chart space ...
-                # Y-1 axis (Common)
-                if chart_info.axes.y1_axis is not None:
-                    proj_y_val = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, line_y_pixel)
+            line_x_pixel_array = np.array(line_x_pixel_points, dtype=np.float64)
+            if var_x_chart_values is not None:
+                # we need to differentiate and avoid sampling lines at unknown points needing extrapolation
+                # if they are too far away from the range of known points
+                too_far = np.logical_or(line_x_pixel_array < x1 + lr_min_x - LineData.Parsing_TickInRangeThreshold,
+                                        x1 + lr_max_x + LineData.Parsing_TickInRangeThreshold < line_x_pixel_array)
+                # point is out of range for interpolation, and too far to extrapolate with confidence ... skip!!!
+                sample_idxs = np.nonzero(np.logical_not(too_far))[0].tolist()
+            else:
+                sample_idxs = list(range(len(line_x_pixel_points)))
+
+            # get all sampled points in relative coordinate space (with respect to the data region)
+            # and evaluate the line on all of them at once
+            rel_x_values = line_x_pixel_array[sample_idxs] - x1
+            rel_y_values = line_values.get_y_value(rel_x_values)
+            line_y_pixels = (y2 - rel_y_values).tolist()
+
+            current_line_points = [{"x": line_x_pixel_points[x_val_idx], "y": line_y_pixel}
+                                   for x_val_idx, line_y_pixel in zip(sample_idxs, line_y_pixels)]
+            current_data_series = [{"x": line_x_chart_values[x_val_idx]} for x_val_idx in sample_idxs]
+
+            # get Y values on chart space (all points of the line at once) ...
+            # Y-1 axis (Common)
+            if chart_info.axes.y1_axis is not None:
+                all_proj_y = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y1_axis, True, line_y_pixels)
+                for data_series_point, proj_y_val in zip(current_data_series, all_proj_y.tolist()):
                     data_series_point["y"] = proj_y_val
-                # Y-2 axis (Rare)
-                if chart_info.axes.y2_axis is not None:
-                    proj_y_val = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, line_y_pixel)
+            # Y-2 axis (Rare)
+            if chart_info.axes.y2_axis is not None:
+                all_proj_y = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y2_axis, True, line_y_pixels)
+                for data_series_point, proj_y_val in zip(current_data_series, all_proj_y.tolist()):
                     data_series_point["y2"] = proj_y_val
 
-                current_data_series.append(data_series_point)
-
             if series_text is None:
                 series_name = "[unnamed data series #{0:d}]".format(series_idx)
             else:
@@ -217,25 +208,29 @@ class LineData:
 
         return data
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<Data class="LineData">\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<Data class="LineData">\n')
         # data series ...
-        xml_str += indent + "    <DataSeries>\n"
+        out_stream.write(indent + "    <DataSeries>\n")
         for series in self.data_series:
             if series is None:
-                xml_str += indent + "        <TextId></TextId>\n"
+                out_stream.write(indent + "        <TextId></TextId>\n")
             else:
-                xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(series.id)
-        xml_str += indent + "    </DataSeries>\n"
+                out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(series.id))
+        out_stream.write(indent + "    </DataSeries>\n")
 
         # data values ...
-        xml_str += indent + "    <LinesValues>\n"
+        out_stream.write(indent + "    <LinesValues>\n")
         for line_values in self.lines:
-            xml_str += line_values.to_XML(indent + "        ")
-        xml_str += indent + "    </LinesValues>\n"
-        xml_str += indent + '</Data>\n'
+            line_values.write_XML(out_stream, indent + "        ")
+        out_stream.write(indent + "    </LinesValues>\n")
+        out_stream.write(indent + '</Data>\n')
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root, text_index):
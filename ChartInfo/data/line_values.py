@@ -1,8 +1,9 @@
 
+import io
 import numpy as np
 from scipy import interpolate
 
-from shapely.geometry import LineString, Point
+from .point_store import PointStore
 
 class LineValues:
     # Insert Modes
@@ -18,37 +19,44 @@ class LineValues:
     CubicInterpolation = 2
 
     def __init__(self):
-        self.points = []
+        self.point_store = PointStore()
 
+        # interpolation function, and version of the points used to build it
+        self.cache_line_interp = None
+        self.cache_line_interp_version = None
+
+    @property
+    def points(self):
+        return self.point_store
+
+    @points.setter
+    def points(self, points):
+        # any list of (x, y) points (or array) is copied into a new store
+        self.point_store = PointStore(points)
         self.cache_line_interp = None
 
     def get_all_x_values(self):
         # get all unique x values (sorted)
-        # note that set is required for older annotations produced before adding constrains forcing points to be unique
-        tempo_array = np.array(self.points)
-        raw_x_values = list(set(tempo_array[:, 0].tolist()))
-        return sorted(raw_x_values)
+        # note that uniqueness is required for older annotations produced before adding constrains forcing points to be
+        # unique
+        return np.unique(self.point_store.as_array()[:, 0]).tolist()
 
     def get_y_value(self, x_Value):
-        if self.cache_line_interp is None:
-            tempo_sorted = sorted(self.points)
-
-            last_val_x = None
-            valid_unique_x = []
-            valid_unique_y = []
-            for x, y in tempo_sorted:
-                if x != last_val_x:
-                    last_val_x = x
-                    valid_unique_x.append(x)
-                    valid_unique_y.append(y)
-
-            self.cache_line_interp = interpolate.interp1d(valid_unique_x, valid_unique_y, 'linear',
+        if self.cache_line_interp is None or self.cache_line_interp_version != self.point_store.version:
+            # sort by x (then by y), and keep the first point for each unique x value
+            point_array = self.point_store.as_array()
+            sorted_array = point_array[np.lexsort((point_array[:, 1], point_array[:, 0]))]
+            first_x = np.ones(sorted_array.shape[0], dtype=bool)
+            first_x[1:] = sorted_array[1:, 0] != sorted_array[:-1, 0]
+
+            self.cache_line_interp = interpolate.interp1d(sorted_array[first_x, 0], sorted_array[first_x, 1], 'linear',
                                                           fill_value='extrapolate')
+            self.cache_line_interp_version = self.point_store.version
 
         return self.cache_line_interp(x_Value)
 
     def get_line_relative_bbox(self):
-        point_array = np.array(self.points)
+        point_array = self.point_store.as_array()
         min_x = point_array[:, 0].min()
         max_x = point_array[:, 0].max()
         min_y = point_array[:, 1].min()
@@ -57,17 +65,7 @@ class LineValues:
         return min_x, min_y, max_x, max_y
 
     def closest_point(self, in_x, in_y):
-        if len(self.points) == 0:
-            return None, None
-
-        distances = []
-        point_in = Point(in_x, in_y)
-        for idx, (x, y) in enumerate(self.points):
-            distances.append((point_in.distance(Point(x, y)), idx))
-
-        distances = sorted(distances)
-
-        return distances[0]
+        return self.point_store.closest_point(in_x, in_y)
 
     def set_point(self, idx, x, y):
         if 0 <= idx <= len(self.points):
@@ -79,45 +77,25 @@ class LineValues:
             self.points.append((x, y))
         else:
             # find the pair of points with the smaller distance ...
-            point = Point(x, y)
-            all_distances = []
-            for idx in range(len(self.points) - 1):
-                segment = LineString([self.points[idx], self.points[idx + 1]])
-                distance = segment.distance(point)
-                all_distances.append((distance, idx))
-
-            all_distances = sorted(all_distances)
-
-            closest_dist, closest_idx = all_distances[0]
+            closest_dist, closest_idx = self.point_store.closest_segment(x, y)
             self.points.insert(closest_idx + 1, (x, y))
 
     def shift_all_points(self, delta_x, delta_y):
-        for idx, (x, y) in enumerate(self.points):
-            self.points[idx] = (x + delta_x, y + delta_y)
+        self.point_store.shift(delta_x, delta_y)
 
     def add_point_by_axis_value(self, x, y, axis):
         if len(self.points) == 0:
             # simply add ....
             self.points.append((x, y))
         else:
-            insert_at = len(self.points)
+            # insert before the first point with a larger value on the given axis
             new_point = (x, y)
-            for idx, line_point in enumerate(self.points):
-                if new_point[axis] < line_point[axis]:
-                    # point for insertion found ... stop ...
-                    insert_at = idx
-                    break
+            insert_at = self.point_store.first_greater(new_point[axis], axis)
 
             self.points.insert(insert_at, new_point)
 
     def contains_point(self, x, y):
-        if len(self.points) == 0:
-            return False
-
-        raw_diff = np.array(self.points) - np.array([[x, y]])
-        all_distances = np.linalg.norm(raw_diff, axis=1)
-
-        return all_distances.min() <= LineValues.PointDistanceSame
+        return self.point_store.contains_point(x, y, LineValues.PointDistanceSame)
 
     def add_point(self, x, y, mode):
         if self.contains_point(x, y):
@@ -142,16 +120,20 @@ class LineValues:
         else:
             return False
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<LineValues>\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<LineValues>\n')
+        # one write per point (these lists can be very long)
+        xml_point = (indent + '    <Point>\n' + indent + '        <X>{0:s}</X>\n' +
+                     indent + '        <Y>{1:s}</Y>\n' + indent + '    </Point>\n')
         for x, y in self.points:
-            xml_str += indent + '    <Point>\n'
-            xml_str += indent + '        <X>{0:s}</X>\n'.format(str(x))
-            xml_str += indent + '        <Y>{0:s}</Y>\n'.format(str(y))
-            xml_str += indent + '    </Point>\n'
-        xml_str += indent + '</LineValues>\n'
+            out_stream.write(xml_point.format(str(x), str(y)))
+        out_stream.write(indent + '</LineValues>\n')
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
@@ -170,6 +152,6 @@ class LineValues:
         assert isinstance(other, LineValues)
 
         values = LineValues()
-        values.points = [point for point in other.points]
+        values.points = other.points
 
         return values
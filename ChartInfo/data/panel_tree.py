@@ -1,5 +1,7 @@
 
 
+import io
+
 class PanelNode:
     def __init__(self, parent, x1, y1, x2, y2):
         self.x1 = x1
@@ -93,20 +95,25 @@ class PanelNode:
             # current node and children do not contain this point
             return []
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<PanelTreeNode>\n"
-        xml_str += indent + "    <X1>" + str(self.x1) + "</X1>\n"
-        xml_str += indent + "    <Y1>" + str(self.y1) + "</Y1>\n"
-        xml_str += indent + "    <X2>" + str(self.x2) + "</X2>\n"
-        xml_str += indent + "    <Y2>" + str(self.y2) + "</Y2>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<PanelTreeNode>\n")
+        out_stream.write(indent + "    <X1>" + str(self.x1) + "</X1>\n")
+        out_stream.write(indent + "    <Y1>" + str(self.y1) + "</Y1>\n")
+        out_stream.write(indent + "    <X2>" + str(self.x2) + "</X2>\n")
+        out_stream.write(indent + "    <Y2>" + str(self.y2) + "</Y2>\n")
         if self.children is not None:
-            xml_str += indent + "    <Children>\n"
+            out_stream.write(indent + "    <Children>\n")
             for child in self.children:
-                xml_str += child.to_XML(indent + "       ")
-            xml_str += indent + "    </Children>\n"
+                child.write_XML(out_stream, indent + "       ")
+            out_stream.write(indent + "    </Children>\n")
 
-        xml_str += indent + "</PanelTreeNode>\n"
-        return xml_str
+        out_stream.write(indent + "</PanelTreeNode>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
+
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
@@ -153,11 +160,16 @@ class PanelTree:
     def __init__(self, root):
         self.root = root
 
+    def write_XML(self, out_stream):
+        out_stream.write("    <PanelTree>\n")
+        self.root.write_XML(out_stream, "        ")
+        out_stream.write("    </PanelTree>\n")
+
     def to_XML(self):
-        xml_str = "    <PanelTree>\n"
-        xml_str += self.root.to_XML("        ")
-        xml_str += "    </PanelTree>\n"
-        return xml_str
+        out_stream = io.StringIO()
+        self.write_XML(out_stream)
+
+        return out_stream.getvalue()
 
     def __eq__(self, other):
         if isinstance(other, PanelTree):
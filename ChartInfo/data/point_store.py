@@ -0,0 +1,190 @@
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+class PointStore:
+    # Compact storage for the (x, y) points of lines and scatter plots
+    # Points are kept on a growable NumPy buffer (capacity doubles when full), while still behaving like the list of
+    # (x, y) tuples used before (len, indexing, iteration, insert, del), so existing code can keep using it.
+    # The version counter changes on every modification, it can be used to invalidate anything computed from the points
+    # Nearest point queries on large sets use a KD-tree, built lazily. Appending points keeps the tree (new points are
+    # checked linearly until there are enough of them to justify a rebuild), any other modification discards it.
+    InitialCapacity = 16
+    SpatialIndexMinPoints = 64
+
+    def __init__(self, points=None):
+        if points is None:
+            points = np.zeros((0, 2), dtype=np.float64)
+        elif isinstance(points, PointStore):
+            points = points.as_array()
+
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+
+        self.size = points.shape[0]
+        self.data = np.zeros((max(PointStore.InitialCapacity, self.size), 2), dtype=np.float64)
+        self.data[:self.size] = points
+        self.version = 0
+
+        # KD-tree, built using the first kd_tree_size points
+        self.kd_tree = None
+        self.kd_tree_size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __check_index(self, idx):
+        if idx < 0:
+            idx += self.size
+
+        if not 0 <= idx < self.size:
+            raise IndexError("Point index out of range")
+
+        return idx
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [tuple(point) for point in self.data[:self.size][idx].tolist()]
+
+        idx = self.__check_index(idx)
+        return float(self.data[idx, 0]), float(self.data[idx, 1])
+
+    def __setitem__(self, idx, point):
+        idx = self.__check_index(idx)
+        self.data[idx] = point
+        self.__modified(False)
+
+    def __delitem__(self, idx):
+        idx = self.__check_index(idx)
+        self.data[idx:self.size - 1] = self.data[idx + 1:self.size]
+        self.size -= 1
+        self.__modified(False)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        # always a copy, the internal buffer should only be modified through the store
+        return np.array(self.as_array(), dtype=dtype)
+
+    def __modified(self, only_appended):
+        self.version += 1
+        if not only_appended:
+            # the indexed points changed ...
+            self.kd_tree = None
+            self.kd_tree_size = 0
+
+    def __grow(self, min_capacity):
+        if min_capacity > self.data.shape[0]:
+            new_data = np.zeros((max(min_capacity, self.data.shape[0] * 2), 2), dtype=np.float64)
+            new_data[:self.size] = self.data[:self.size]
+            self.data = new_data
+
+    def append(self, point):
+        self.__grow(self.size + 1)
+        self.data[self.size] = point
+        self.size += 1
+        self.__modified(True)
+
+    def insert(self, idx, point):
+        # same semantics of list.insert (indices out of range are clipped)
+        if idx < 0:
+            idx = max(0, idx + self.size)
+        idx = min(idx, self.size)
+
+        self.__grow(self.size + 1)
+        self.data[idx + 1:self.size + 1] = self.data[idx:self.size]
+        self.data[idx] = point
+        self.size += 1
+        self.__modified(idx == self.size - 1)
+
+    def as_array(self):
+        # read-only view of the valid points (no copy)
+        view = self.data[:self.size]
+        view.flags.writeable = False
+        return view
+
+    def tolist(self):
+        return [tuple(point) for point in self.data[:self.size].tolist()]
+
+    def shift(self, delta_x, delta_y):
+        self.data[:self.size] += np.array([delta_x, delta_y])
+        self.__modified(False)
+
+    def update_spatial_index(self):
+        # (re)builds the KD-tree if there is none, or if too many points have been appended since it was built
+        if self.size < PointStore.SpatialIndexMinPoints:
+            self.kd_tree = None
+            self.kd_tree_size = 0
+        elif self.kd_tree is None or self.size - self.kd_tree_size > max(PointStore.SpatialIndexMinPoints,
+                                                                         self.kd_tree_size // 4):
+            self.kd_tree = cKDTree(self.data[:self.size].copy())
+            self.kd_tree_size = self.size
+
+    def distances(self, x, y):
+        # euclidean distance from (x, y) to all points
+        return np.hypot(self.data[:self.size, 0] - x, self.data[:self.size, 1] - y)
+
+    def closest_point(self, x, y):
+        # (distance, index) of the closest point (first one in case of ties on small sets)
+        if self.size == 0:
+            return None, None
+
+        self.update_spatial_index()
+        if self.kd_tree is None:
+            all_distances = self.distances(x, y)
+            closest_idx = int(np.argmin(all_distances))
+
+            return float(all_distances[closest_idx]), closest_idx
+
+        closest_dist, closest_idx = self.kd_tree.query((x, y))
+        closest_dist, closest_idx = float(closest_dist), int(closest_idx)
+
+        if self.kd_tree_size < self.size:
+            # points added after building the tree ...
+            new_distances = np.hypot(self.data[self.kd_tree_size:self.size, 0] - x,
+                                     self.data[self.kd_tree_size:self.size, 1] - y)
+            new_idx = int(np.argmin(new_distances))
+            if new_distances[new_idx] < closest_dist:
+                closest_dist, closest_idx = float(new_distances[new_idx]), self.kd_tree_size + new_idx
+
+        return closest_dist, closest_idx
+
+    def closest_segment(self, x, y):
+        # (distance, index) of the closest segment between consecutive points, where segment i goes from point i to
+        # point i + 1 (first one in case of ties)
+        if self.size < 2:
+            return None, None
+
+        seg_start = self.data[:self.size - 1]
+        seg_delta = self.data[1:self.size] - seg_start
+        seg_sq_length = (seg_delta ** 2).sum(axis=1)
+
+        # position of the projection of (x, y) on each segment (clipped to the segment, 0 for segments of length 0)
+        rel_point = np.array([x, y]) - seg_start
+        proj_t = (rel_point * seg_delta).sum(axis=1)
+        valid_length = seg_sq_length > 0.0
+        proj_t[valid_length] /= seg_sq_length[valid_length]
+        proj_t[~valid_length] = 0.0
+        proj_t = np.clip(proj_t, 0.0, 1.0)
+
+        # (projections clipped to the segment ends use the exact end points, to keep ties between segments)
+        closest_points = seg_start + seg_delta * proj_t[:, None]
+        closest_points[proj_t == 1.0] = self.data[1:self.size][proj_t == 1.0]
+        all_distances = np.hypot(closest_points[:, 0] - x, closest_points[:, 1] - y)
+        closest_idx = int(np.argmin(all_distances))
+
+        return float(all_distances[closest_idx]), closest_idx
+
+    def contains_point(self, x, y, max_distance):
+        # True if there is at least one point within the given distance from (x, y)
+        closest_dist, closest_idx = self.closest_point(x, y)
+
+        return closest_idx is not None and closest_dist <= max_distance
+
+    def first_greater(self, value, axis):
+        # index of the first point where point[axis] > value (total points if there is none)
+        larger = self.data[:self.size, axis] > value
+        if larger.any():
+            return int(np.argmax(larger))
+        else:
+            return self.size
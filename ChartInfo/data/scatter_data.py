@@ -1,4 +1,6 @@
 
+import io
+
 from .scatter_values import ScatterValues
 from .axis_values import AxisValues
 
@@ -100,8 +102,9 @@ class ScatterData:
             current_scatter_points = []
 
             # For each point in the scatter
+            line_x_pixels = []
+            line_y_pixels = []
             for p_idx, (p_x, p_y) in enumerate(scatter.points):
-                # first convert the X coordinate to a value ...
                 # assume (p_x, p_y) are coordinates relative to the data series)
                 # convert to pixel space
                 line_x_pixel = p_x + x1
@@ -113,27 +116,31 @@ class ScatterData:
                 }
                 current_scatter_points.append(line_data_point)
 
-                if x_axis.values_type == AxisValues.ValueTypeNumerical:
-                    proj_x_val = AxisValues.Project(chart_info.axes, x_axis, False, line_x_pixel)
-                else:
-                    # categorical x axis ... find closest category
-                    proj_x_val = AxisValues.FindClosestValue(chart_info.axes, x_axis, False, line_x_pixel)
+                line_x_pixels.append(line_x_pixel)
+                line_y_pixels.append(line_y_pixel)
 
-                data_series_point = {
-                    "x": proj_x_val,
-                }
-                # get Y value on chart space ...
-                # Y-1 axis (Common)
-                if chart_info.axes.y1_axis is not None:
-                    proj_y_val = AxisValues.Project(chart_info.axes, chart_info.axes.y1_axis, True, line_y_pixel)
+            # then convert the X coordinates to values (all points at once) ...
+            if x_axis.values_type == AxisValues.ValueTypeNumerical:
+                all_proj_x = AxisValues.ProjectArray(chart_info.axes, x_axis, False, line_x_pixels).tolist()
+            else:
+                # categorical x axis ... find closest category
+                all_proj_x = [AxisValues.FindClosestValue(chart_info.axes, x_axis, False, line_x_pixel)
+                              for line_x_pixel in line_x_pixels]
+
+            current_data_series = [{"x": proj_x_val} for proj_x_val in all_proj_x]
+
+            # get Y values on chart space ...
+            # Y-1 axis (Common)
+            if chart_info.axes.y1_axis is not None:
+                all_proj_y = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y1_axis, True, line_y_pixels)
+                for data_series_point, proj_y_val in zip(current_data_series, all_proj_y.tolist()):
                     data_series_point["y"] = proj_y_val
-                # Y-2 axis (Rare)
-                if chart_info.axes.y2_axis is not None:
-                    proj_y_val = AxisValues.Project(chart_info.axes, chart_info.axes.y2_axis, True, line_y_pixel)
+            # Y-2 axis (Rare)
+            if chart_info.axes.y2_axis is not None:
+                all_proj_y = AxisValues.ProjectArray(chart_info.axes, chart_info.axes.y2_axis, True, line_y_pixels)
+                for data_series_point, proj_y_val in zip(current_data_series, all_proj_y.tolist()):
                     data_series_point["y2"] = proj_y_val
 
-                current_data_series.append(data_series_point)
-
             if series_text is None:
                 series_name = "[unnamed data series #{0:d}]".format(series_idx)
             else:
@@ -174,25 +181,29 @@ class ScatterData:
 
         return data
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<Data class="ScatterData">\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<Data class="ScatterData">\n')
         # data series ...
-        xml_str += indent + "    <DataSeries>\n"
+        out_stream.write(indent + "    <DataSeries>\n")
         for series in self.data_series:
             if series is None:
-                xml_str += indent + "        <TextId></TextId>\n"
+                out_stream.write(indent + "        <TextId></TextId>\n")
             else:
-                xml_str += indent + "        <TextId>{0:d}</TextId>\n".format(series.id)
-        xml_str += indent + "    </DataSeries>\n"
+                out_stream.write(indent + "        <TextId>{0:d}</TextId>\n".format(series.id))
+        out_stream.write(indent + "    </DataSeries>\n")
 
         # data values ...
-        xml_str += indent + "    <ChartValues>\n"
+        out_stream.write(indent + "    <ChartValues>\n")
         for scatter_values in self.scatter_values:
-            xml_str += scatter_values.to_XML(indent + "        ")
-        xml_str += indent + "    </ChartValues>\n"
-        xml_str += indent + '</Data>\n'
+            scatter_values.write_XML(out_stream, indent + "        ")
+        out_stream.write(indent + "    </ChartValues>\n")
+        out_stream.write(indent + '</Data>\n')
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root, text_index):
@@ -1,39 +1,32 @@
 
-import numpy as np
+import io
 
-from shapely.geometry import LineString, Point
+from .point_store import PointStore
 
 class ScatterValues:
     PointDistanceSame = 0.95
 
     def __init__(self):
-        self.points = []
+        self.point_store = PointStore()
 
-    def closest_point(self, in_x, in_y):
-        if len(self.points) == 0:
-            return None, None
-
-        distances = []
-        point_in = Point(in_x, in_y)
-        for idx, (x, y) in enumerate(self.points):
-            distances.append((point_in.distance(Point(x, y)), idx))
+    @property
+    def points(self):
+        return self.point_store
 
-        distances = sorted(distances)
+    @points.setter
+    def points(self, points):
+        # any list of (x, y) points (or array) is copied into a new store
+        self.point_store = PointStore(points)
 
-        return distances[0]
+    def closest_point(self, in_x, in_y):
+        return self.point_store.closest_point(in_x, in_y)
 
     def set_point(self, idx, x, y):
         if 0 <= idx <= len(self.points):
             self.points[idx] = x, y
 
     def contains_point(self, x, y):
-        if len(self.points) == 0:
-            return False
-
-        raw_diff = np.array(self.points) - np.array([[x, y]])
-        all_distances = np.linalg.norm(raw_diff, axis=1)
-
-        return all_distances.min() <= ScatterValues.PointDistanceSame
+        return self.point_store.contains_point(x, y, ScatterValues.PointDistanceSame)
 
     def add_point(self, x, y):
         # check that there is not point in this position already ...
@@ -48,16 +41,20 @@ class ScatterValues:
         else:
             return False
 
-    def to_XML(self, indent=""):
-        xml_str = indent + '<ScatterValues>\n'
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + '<ScatterValues>\n')
+        # one write per point (these lists can be very long)
+        xml_point = (indent + '    <Point>\n' + indent + '        <X>{0:s}</X>\n' +
+                     indent + '        <Y>{1:s}</Y>\n' + indent + '    </Point>\n')
         for x, y in self.points:
-            xml_str += indent + '    <Point>\n'
-            xml_str += indent + '        <X>{0:s}</X>\n'.format(str(x))
-            xml_str += indent + '        <Y>{0:s}</Y>\n'.format(str(y))
-            xml_str += indent + '    </Point>\n'
-        xml_str += indent + '</ScatterValues>\n'
+            out_stream.write(xml_point.format(str(x), str(y)))
+        out_stream.write(indent + '</ScatterValues>\n')
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
@@ -76,6 +73,6 @@ class ScatterValues:
         assert isinstance(other, ScatterValues)
 
         values = ScatterValues()
-        values.points = [point for point in other.points]
+        values.points = other.points
 
         return values
@@ -1,4 +1,6 @@
 
+import io
+
 class SeriesSorting:
     def __init__(self, n_series):
         self.order = [[s_idx] for s_idx in range(n_series)]
@@ -155,16 +157,20 @@ class SeriesSorting:
 
         raise Exception("Series specified not found!")
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<SeriesSorting>\n"
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<SeriesSorting>\n")
         for group in self.order:
-            xml_str += indent + "    <Group>\n"
+            out_stream.write(indent + "    <Group>\n")
             for series_idx in group:
-                xml_str += indent + "        <Index>{0:d}</Index>\n".format(series_idx)
-            xml_str += indent + "    </Group>\n"
-        xml_str += indent + "</SeriesSorting>\n"
+                out_stream.write(indent + "        <Index>{0:d}</Index>\n".format(series_idx))
+            out_stream.write(indent + "    </Group>\n")
+        out_stream.write(indent + "</SeriesSorting>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def Copy(other):
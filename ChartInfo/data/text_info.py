@@ -1,4 +1,5 @@
 
+import io
 import numpy as np
 
 from xml.sax.saxutils import escape, unescape
@@ -108,24 +109,28 @@ class TextInfo:
 
         return TextInfo(other.id, other.position_polygon.copy(), other.type, other.value)
 
-    def to_XML(self, indent=""):
+    def write_XML(self, out_stream, indent=""):
         type_desc = self.get_type_description()
 
-        xml_str = indent + "<TextInfo>\n"
-        xml_str += indent + "    <Id>{0:s}</Id>\n".format(str(self.id))
-        xml_str += indent + "    <Polygon>\n"
+        out_stream.write(indent + "<TextInfo>\n")
+        out_stream.write(indent + "    <Id>{0:s}</Id>\n".format(str(self.id)))
+        out_stream.write(indent + "    <Polygon>\n")
         for x, y in self.position_polygon:
-            xml_str += indent + "        <Point>\n"
-            xml_str += indent + "            <X>{0:s}</X>\n".format(str(x))
-            xml_str += indent + "            <Y>{0:s}</Y>\n".format(str(y))
-            xml_str += indent + "        </Point>\n"
+            out_stream.write(indent + "        <Point>\n")
+            out_stream.write(indent + "            <X>{0:s}</X>\n".format(str(x)))
+            out_stream.write(indent + "            <Y>{0:s}</Y>\n".format(str(y)))
+            out_stream.write(indent + "        </Point>\n")
+
+        out_stream.write(indent + "    </Polygon>\n")
+        out_stream.write(indent + "    <Type>{0:s}</Type>\n".format(type_desc))
+        out_stream.write(indent + "    <Value>{0:s}</Value>\n".format(escape(self.value)))
+        out_stream.write(indent + "</TextInfo>\n")
 
-        xml_str += indent + "    </Polygon>\n"
-        xml_str += indent + "    <Type>{0:s}</Type>\n".format(type_desc)
-        xml_str += indent + "    <Value>{0:s}</Value>\n".format(escape(self.value))
-        xml_str += indent + "</TextInfo>\n"
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
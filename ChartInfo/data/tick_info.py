@@ -1,17 +1,23 @@
 
+import io
+
 class TickInfo:
     def __init__(self, position, label_id=None):
         self.position = position
         self.label_id = label_id
 
-    def to_XML(self, indent=""):
-        xml_str = indent + "<TickInfo>\n"
-        xml_str += indent + "    <Position>{0:s}</Position>\n".format(str(self.position))
+    def write_XML(self, out_stream, indent=""):
+        out_stream.write(indent + "<TickInfo>\n")
+        out_stream.write(indent + "    <Position>{0:s}</Position>\n".format(str(self.position)))
         if self.label_id is not None:
-            xml_str += indent + "    <LabelId>{0:d}</LabelId>\n".format(self.label_id)
-        xml_str += indent + "</TickInfo>\n"
+            out_stream.write(indent + "    <LabelId>{0:d}</LabelId>\n".format(self.label_id))
+        out_stream.write(indent + "</TickInfo>\n")
+
+    def to_XML(self, indent=""):
+        out_stream = io.StringIO()
+        self.write_XML(out_stream, indent)
 
-        return xml_str
+        return out_stream.getvalue()
 
     @staticmethod
     def FromXML(xml_root):
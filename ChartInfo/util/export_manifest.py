@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+
+class ExportManifest:
+    DefaultFilename = "export_manifest.json"
+
+    def __init__(self, json_folder, task_num, test_mode, exporter_version):
+        self.filename = json_folder + "/" + ExportManifest.DefaultFilename
+
+        # settings used to produce the current outputs
+        self.settings = {
+            "task_num": task_num,
+            "test_mode": bool(test_mode),
+            "exporter_version": exporter_version,
+        }
+
+        # key = image file (relative path), value = dict with source signature, hash, export error (if any) and if
+        # an output file was saved (e.g. images with multiple panels are skipped without any output)
+        self.entries = {}
+
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, "r") as in_file:
+                    self.entries = json.load(in_file)["entries"]
+            except (ValueError, KeyError):
+                print("Warning: Invalid export manifest found, all annotations will be exported")
+                self.entries = {}
+
+    def get_files(self):
+        return list(self.entries.keys())
+
+    def check_up_to_date(self, img_file, annotation_filename, signature, output_filename):
+        # returns (up_to_date, file_hash), the hash of the annotation is only computed (otherwise None) when the file
+        # was touched since the last export
+        if not img_file in self.entries:
+            return False, None
+
+        entry = self.entries[img_file]
+        for key in self.settings:
+            if entry[key] != self.settings[key]:
+                # exported with different settings
+                return False, None
+
+        if not "output" in entry or (entry["output"] and not os.path.exists(output_filename)):
+            # the output was removed after the export (or the entry is from an older manifest)
+            return False, None
+
+        mtime, size = signature
+        if entry["mtime"] == mtime and entry["size"] == size:
+            return True, None
+
+        if entry["size"] != size:
+            return False, None
+
+        # file was touched ... check if the content is still the same
+        file_hash = ExportManifest.FileHash(annotation_filename)
+        if entry["sha1"] == file_hash:
+            entry["mtime"] = mtime
+            return True, file_hash
+
+        return False, file_hash
+
+    def get_error(self, img_file):
+        if img_file in self.entries:
+            return self.entries[img_file]["error"]
+        else:
+            return None
+
+    def update(self, img_file, signature, file_hash, error_line, output_saved):
+        mtime, size = signature
+
+        entry = {
+            "mtime": mtime,
+            "size": size,
+            "sha1": file_hash,
+            "error": error_line,
+            "output": output_saved,
+        }
+        entry.update(self.settings)
+
+        self.entries[img_file] = entry
+
+    def remove(self, img_file):
+        if img_file in self.entries:
+            del self.entries[img_file]
+
+    def save(self):
+        # write to a temporary file first, an interrupted export should never leave a corrupted manifest
+        tempo_filename = self.filename + ".tmp"
+        with open(tempo_filename, "w") as out_file:
+            json.dump({"entries": self.entries}, out_file, indent=1, sort_keys=True)
+
+        os.replace(tempo_filename, self.filename)
+
+    @staticmethod
+    def FileHash(filename):
+        with open(filename, "rb") as in_file:
+            return hashlib.sha1(in_file.read()).hexdigest()
@@ -1,14 +1,23 @@
 
 import os
+import multiprocessing
 
 from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+from ChartInfo.util.status_index import StatusIndex
 
 class FileStats:
-    def __init__(self, img_dir, annotation_dir, cache_all_annotations=False, load_stats=True):
+    def __init__(self, img_dir, annotation_dir, cache_all_annotations=False, load_stats=True, workers=1,
+                 use_index=False):
 
         self.img_dir = img_dir
         self.annotation_dir = annotation_dir
 
+        # number of processes used to parse the annotations (1 = sequential)
+        self.workers = max(1, workers)
+        # use (and refresh) the persistent status index of the annotation directory
+        self.use_index = use_index
+
         # Load image list from dir ...
         self.img_list = []
 
@@ -37,68 +46,134 @@ class FileStats:
             "total_failed": 0,
         }
 
-        for idx, chart_path in enumerate(self.img_list):
-            current_img = None
+        # find annotation paths ...
+        all_annotation_filenames = [self.get_annotation_filename(chart_path) for chart_path in self.img_list]
+        all_summaries = [None] * len(all_annotation_filenames)
 
-            # find annotation path ...
-            relative_dir, img_filename = os.path.split(chart_path)
+        if self.use_index:
+            status_index = StatusIndex.Open(self.annotation_dir)
+        else:
+            status_index = None
+
+        # check which files need to be parsed ...
+        pending_idxs = []
+        pending_signatures = []
+        for idx, annotation_filename in enumerate(all_annotation_filenames):
+            if status_index is not None:
+                signature = status_index.get_signature(annotation_filename)
+                if signature is None:
+                    # no annotation file
+                    status_index.update(annotation_filename, None, None)
+                    continue
+
+                if not cache_all_annotations:
+                    summary = status_index.lookup(annotation_filename, signature)
+                    if summary is not None:
+                        # up-to-date summary found on the index, no need to parse the XML file
+                        all_summaries[idx] = summary + (None,)
+                        continue
+            else:
+                signature = None
 
-            img_base, ext = os.path.splitext(img_filename)
-            # output dir
-            output_dir = self.annotation_dir + relative_dir
-            annotation_filename = output_dir + "/" + img_base + ".xml"
-
-            if os.path.exists(annotation_filename):
-                self.img_annotations.append(annotation_filename)
-                self.total_annotation_files += 1
-
-                image_info = ImageInfo.FromXML(annotation_filename, current_img)
-                if len(image_info.panels) == 1:
-                    # add to single panel index
-                    self.all_single_panel.append(idx)
-
-                    type_desc, orientation = image_info.panels[0].get_description()
-                    if orientation == "":
-                        current_type = type_desc
-                    else:
-                        current_type = "{0:s} ({1:s})".format(type_desc, orientation)
-                    # if type_desc in ["non-chart"]:
-                    #     print(annotation_filename)
-
-                    status_ints = ImageInfo.GetAllStatuses(image_info)
-                    self.img_statuses.append(status_ints)
-
-                    if current_type in self.single_per_type:
-                        self.single_per_type[current_type].append((idx, status_ints))
-                    else:
-                        self.single_per_type[current_type] = [(idx, status_ints)]
-
-                    if not "auto_check_passed" in image_info.panels[0].properties:
-                        print(annotation_filename)
-                        self.auto_check_stats["total_no_test"] += 1
-                    else:
-                        if int(image_info.panels[0].properties["auto_check_passed"]) > 0:
-                            self.auto_check_stats["total_passed"] += 1
-                        else:
-                            self.auto_check_stats["total_failed"] += 1
-                else:
-                    # add to multi-panel index
-                    self.all_multi_panel.append(idx)
-                    # TODO: multi-panel case is not handled yet ...
+            pending_idxs.append(idx)
+            pending_signatures.append(signature)
 
-                    self.img_statuses.append(None)
-                    self.auto_check_stats["total_multi_panel"] += 1
+        all_tasks = [(all_annotation_filenames[idx], cache_all_annotations) for idx in pending_idxs]
 
-                # keep or discard the current annotation ...
-                if cache_all_annotations:
-                    self.cache_annotations.append(image_info)
-                else:
-                    self.cache_annotations.append(None)
+        if self.workers > 1 and len(all_tasks) > 1:
+            # parse the XML files in parallel ... imap keeps results in the same order as the tasks
+            chunk_size = max(1, min(64, len(all_tasks) // (self.workers * 4)))
+            with multiprocessing.Pool(self.workers) as pool:
+                all_results = list(pool.imap(FileStats.LoadAnnotationSummary, all_tasks, chunk_size))
+        else:
+            # sequential version ...
+            all_results = [FileStats.LoadAnnotationSummary(task) for task in all_tasks]
+
+        for idx, signature, summary in zip(pending_idxs, pending_signatures, all_results):
+            all_summaries[idx] = summary
+
+            if status_index is not None:
+                status_index.update(all_annotation_filenames[idx], signature, summary)
+
+        if status_index is not None:
+            status_index.close()
+
+        # finally, merge all summaries in the same order as the image list
+        for idx, summary in enumerate(all_summaries):
+            self.__add_summary(idx, all_annotation_filenames[idx], summary)
+
+    def __add_summary(self, idx, annotation_filename, summary):
+        if summary is None:
+            # no annotation file
+            self.img_annotations.append(None)
+            self.cache_annotations.append(None)
+            self.img_statuses.append(ImageInfo.GetNullStatuses())
+            self.auto_check_stats["total_no_annotation"] += 1
+            return
+
+        n_panels, current_type, status_ints, auto_check_passed, image_info = summary
+
+        self.img_annotations.append(annotation_filename)
+        self.total_annotation_files += 1
+
+        if n_panels == 1:
+            # add to single panel index
+            self.all_single_panel.append(idx)
+            self.img_statuses.append(status_ints)
+
+            if current_type in self.single_per_type:
+                self.single_per_type[current_type].append((idx, status_ints))
+            else:
+                self.single_per_type[current_type] = [(idx, status_ints)]
+
+            if auto_check_passed is None:
+                print(annotation_filename)
+                self.auto_check_stats["total_no_test"] += 1
             else:
-                self.img_annotations.append(None)
-                self.cache_annotations.append(None)
-                self.img_statuses.append(ImageInfo.GetNullStatuses())
-                self.auto_check_stats["total_no_annotation"] += 1
+                if auto_check_passed > 0:
+                    self.auto_check_stats["total_passed"] += 1
+                else:
+                    self.auto_check_stats["total_failed"] += 1
+        else:
+            # add to multi-panel index
+            self.all_multi_panel.append(idx)
+            # TODO: multi-panel case is not handled yet ...
+
+            self.img_statuses.append(None)
+            self.auto_check_stats["total_multi_panel"] += 1
+
+        # keep or discard the current annotation ...
+        self.cache_annotations.append(image_info)
+
+    def get_annotation_filename(self, chart_path):
+        return FileStats.GetAnnotationFilename(self.annotation_dir, chart_path)
+
+    @staticmethod
+    def GetAnnotationFilename(annotation_dir, chart_path):
+        # find annotation path ...
+        relative_dir, img_filename = os.path.split(chart_path)
+
+        img_base, ext = os.path.splitext(img_filename)
+        # output dir
+        output_dir = annotation_dir + relative_dir
+        return output_dir + "/" + img_base + ".xml"
+
+    @staticmethod
+    def LoadAnnotationSummary(task):
+        # Note: this is executed by the worker processes, it only takes picklable inputs and returns picklable outputs
+        annotation_filename, keep_annotation = task
+
+        if not os.path.exists(annotation_filename):
+            return None
+
+        # the sections of each panel are only loaded if the annotation will be kept
+        image_info = FastXMLLoader.LoadImageInfo(annotation_filename, None, lazy=not keep_annotation)
+        summary = StatusIndex.SummarizeImageInfo(image_info)
+
+        if not keep_annotation:
+            image_info = None
+
+        return summary + (image_info,)
 
     def total_images(self):
         return len(self.img_list)
@@ -0,0 +1,62 @@
+
+import time
+
+class FrameStats:
+    # Timing of the main loop of the annotation tool (handling events, rendering and updating the display)
+    # Stats are accumulated per interval and printed as a summary at the end of each interval
+    DefaultReportInterval = 5.0
+
+    def __init__(self, report_interval=None):
+        self.report_interval = FrameStats.DefaultReportInterval if report_interval is None else report_interval
+
+        self.interval_start = None
+        self.total_loops = 0
+        self.total_frames = 0
+        self.time_events = 0.0
+        self.time_render = 0.0
+        self.time_display = 0.0
+        self.max_frame_time = 0.0
+
+        self.reset()
+
+    def reset(self):
+        self.interval_start = time.time()
+        self.total_loops = 0
+        self.total_frames = 0
+        self.time_events = 0.0
+        self.time_render = 0.0
+        self.time_display = 0.0
+        self.max_frame_time = 0.0
+
+    def add_loop(self, t_events, t_render=None, t_display=None):
+        # time spent on one iteration of the loop (render and display are None if nothing was rendered)
+        self.total_loops += 1
+        self.time_events += t_events
+
+        if t_render is not None:
+            self.total_frames += 1
+            self.time_render += t_render
+            self.time_display += t_display
+            self.max_frame_time = max(self.max_frame_time, t_events + t_render + t_display)
+
+    def check_report(self):
+        # prints (and resets) the stats once the current interval is over
+        if time.time() - self.interval_start >= self.report_interval:
+            print(self)
+            self.reset()
+
+    def __repr__(self):
+        elapsed = max(time.time() - self.interval_start, 1e-6)
+        busy_time = self.time_events + self.time_render + self.time_display
+
+        result = "<Frame Stats ({0:.1f} s): ".format(elapsed)
+        result += "{0:d} loops, {1:d} frames ({2:.1f} fps)".format(self.total_loops, self.total_frames,
+                                                                   self.total_frames / elapsed)
+        if self.total_frames > 0:
+            result += ", per frame: render {0:.2f} ms, display {1:.2f} ms, max total {2:.2f} ms".format(
+                1000.0 * self.time_render / self.total_frames, 1000.0 * self.time_display / self.total_frames,
+                1000.0 * self.max_frame_time)
+        result += ", events {0:.2f} ms".format(1000.0 * self.time_events)
+        result += ", idle {0:.1f}%>".format(100.0 * max(0.0, 1.0 - busy_time / elapsed))
+
+        return result
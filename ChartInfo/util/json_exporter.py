@@ -6,6 +6,9 @@ from ChartInfo.data.axis_values import AxisValues
 from ChartInfo.data.chart_info import ChartInfo
 
 class ChartJSON_Exporter:
+    # must be increased every time that the output of the exporter changes (used by incremental exports)
+    ExporterVersion = 1.0
+
     @staticmethod
     def get_axis_info(axes, axis_values, axis_pos, is_horizontal):
         if axis_values is None:
@@ -378,9 +381,13 @@ class ChartJSON_Exporter:
         return json_output
 
     @staticmethod
-    def SaveChartImageJSON(json_output, img_file, json_folder):
+    def GetChartImageJSONFilename(img_file, json_folder):
         img_id = '.'.join(img_file.split('.')[:-1])
-        json_output_file = json_folder + img_id + '.json'
+        return json_folder + img_id + '.json'
+
+    @staticmethod
+    def SaveChartImageJSON(json_output, img_file, json_folder):
+        json_output_file = ChartJSON_Exporter.GetChartImageJSONFilename(img_file, json_folder)
         local_json_output_dir, final_filename = os.path.split(json_output_file)
 
         os.makedirs(local_json_output_dir, exist_ok=True)
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+
+class StatusIndex:
+    IndexVersion = 1
+    DefaultFilename = "chart_status_index.db"
+
+    def __init__(self, annotation_dir, index_filename=None):
+        if index_filename is None:
+            index_filename = annotation_dir + "/" + StatusIndex.DefaultFilename
+
+        self.annotation_dir = annotation_dir
+        self.index_filename = index_filename
+
+        self.connection = sqlite3.connect(index_filename, timeout=30.0)
+        self.__prepare_tables()
+
+        # all entries are kept in memory, key = relative path, value = (mtime, size, summary)
+        self.entries = self.__load_entries()
+        self.modified = False
+
+    def __prepare_tables(self):
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+
+        cursor.execute("SELECT value FROM info WHERE key = 'version'")
+        row = cursor.fetchone()
+        if row is None or float(row[0]) != StatusIndex.IndexVersion:
+            # new or out-dated index ... start from scratch
+            cursor.execute("DROP TABLE IF EXISTS entries")
+            cursor.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('version', ?)",
+                           (str(StatusIndex.IndexVersion),))
+
+        cursor.execute("CREATE TABLE IF NOT EXISTS entries (path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, "
+                       "n_panels INTEGER, chart_type TEXT, status_panels INTEGER, status_classes INTEGER, "
+                       "status_text INTEGER, status_legend INTEGER, status_axes INTEGER, status_data INTEGER, "
+                       "auto_check_passed INTEGER)")
+        self.connection.commit()
+
+    def __load_entries(self):
+        entries = {}
+        cursor = self.connection.cursor()
+        for row in cursor.execute("SELECT * FROM entries"):
+            path, mtime, size, n_panels, chart_type = row[:5]
+            status_ints = list(row[5:11])
+            auto_check_passed = row[11]
+
+            entries[path] = (mtime, size, (n_panels, chart_type, status_ints, auto_check_passed))
+
+        return entries
+
+    def get_key(self, annotation_filename):
+        return os.path.relpath(annotation_filename, self.annotation_dir).replace(os.sep, "/")
+
+    def get_signature(self, annotation_filename):
+        return StatusIndex.GetSignature(annotation_filename)
+
+    def lookup(self, annotation_filename, signature):
+        # returns the cached summary only if the file has not changed since it was indexed
+        if signature is None:
+            return None
+
+        key = self.get_key(annotation_filename)
+        if not key in self.entries:
+            return None
+
+        mtime, size, summary = self.entries[key]
+        if (mtime, size) != signature:
+            # out-dated entry
+            return None
+
+        n_panels, chart_type, status_ints, auto_check_passed = summary
+        # always return a copy of the statuses ...
+        return n_panels, chart_type, list(status_ints), auto_check_passed
+
+    def update(self, annotation_filename, signature, summary):
+        key = self.get_key(annotation_filename)
+
+        if signature is None or summary is None:
+            # file does not exist (anymore)
+            if key in self.entries:
+                del self.entries[key]
+                self.connection.execute("DELETE FROM entries WHERE path = ?", (key,))
+                self.modified = True
+            return
+
+        n_panels, chart_type, status_ints, auto_check_passed = summary[:4]
+        mtime, size = signature
+
+        self.entries[key] = (mtime, size, (n_panels, chart_type, list(status_ints), auto_check_passed))
+        self.connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                [key, mtime, size, n_panels, chart_type] + list(status_ints) + [auto_check_passed])
+        self.modified = True
+
+    def get_summary(self, annotation_filename):
+        # use the index if possible, otherwise parse the file and refresh the index
+        signature = self.get_signature(annotation_filename)
+        summary = self.lookup(annotation_filename, signature)
+
+        if summary is None and signature is not None:
+            image_info = FastXMLLoader.LoadImageInfo(annotation_filename, None, lazy=True)
+            summary = StatusIndex.SummarizeImageInfo(image_info)
+            self.update(annotation_filename, signature, summary)
+
+        return summary
+
+    def save(self):
+        if self.modified:
+            try:
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print("Warning: Could not update the status index " + self.index_filename)
+                print(e)
+
+            self.modified = False
+
+    def close(self):
+        self.save()
+        self.connection.close()
+
+    @staticmethod
+    def SummarizeImageInfo(image_info):
+        # information required to produce status reports without loading the annotations
+        n_panels = len(image_info.panels)
+        status_ints = ImageInfo.GetAllStatuses(image_info)
+
+        if n_panels == 1:
+            type_desc, orientation = image_info.panels[0].get_description()
+            if orientation == "":
+                chart_type = type_desc
+            else:
+                chart_type = "{0:s} ({1:s})".format(type_desc, orientation)
+
+            if not "auto_check_passed" in image_info.panels[0].properties:
+                auto_check_passed = None
+            else:
+                auto_check_passed = int(image_info.panels[0].properties["auto_check_passed"])
+        else:
+            chart_type = None
+            auto_check_passed = None
+
+        return n_panels, chart_type, status_ints, auto_check_passed
+
+    @staticmethod
+    def GetSignature(annotation_filename):
+        # (mtime, size) of the file or None if the file does not exist
+        try:
+            file_stat = os.stat(annotation_filename)
+        except OSError:
+            return None
+
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    @staticmethod
+    def Open(annotation_dir, index_filename=None):
+        # the index is optional, failing to open it should never stop the tools
+        try:
+            return StatusIndex(annotation_dir, index_filename)
+        except (sqlite3.Error, OSError) as e:
+            print("Warning: Could not open the status index for " + annotation_dir)
+            print(e)
+            return None
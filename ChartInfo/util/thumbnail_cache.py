@@ -0,0 +1,175 @@
+import os
+import hashlib
+import threading
+
+import cv2
+
+class ThumbnailCache:
+    # Persistent cache of downsized chart images (for the annotation browser)
+    # Each thumbnail is stored as a JPEG file named after the hash of (image path, mtime, size, thumbnail size), so
+    # modified images simply produce a new entry. When the total size goes over the limit, the least recently used
+    # thumbnails are removed.
+    DefaultDirname = ".thumbnail_cache"
+    DefaultMaxDimension = 720
+    DefaultMaxSizeMB = 512
+    Extension = ".jpg"
+    JPEGQuality = 90
+
+    def __init__(self, cache_dir, max_dimension=None, max_size_mb=None):
+        self.cache_dir = cache_dir
+        self.max_dimension = ThumbnailCache.DefaultMaxDimension if max_dimension is None else max_dimension
+        max_size_mb = ThumbnailCache.DefaultMaxSizeMB if max_size_mb is None else max_size_mb
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # accessed from the UI thread and the background loaders ...
+        self.lock = threading.Lock()
+
+        # key = cache filename, value = file size
+        self.entries = {}
+        self.total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            # (ignores temporary files left by interrupted writes)
+            if entry.is_file() and entry.name.endswith(ThumbnailCache.Extension) and not ".tmp" in entry.name:
+                file_size = entry.stat().st_size
+                self.entries[entry.name] = file_size
+                self.total_size += file_size
+
+    def get_cache_filename(self, image_filename, chart_path):
+        # None if the image does not exist
+        try:
+            file_stat = os.stat(image_filename)
+        except OSError:
+            return None
+
+        key = "{0:s}|{1:d}|{2:d}|{3:d}".format(chart_path, file_stat.st_mtime_ns, file_stat.st_size,
+                                               self.max_dimension)
+
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ThumbnailCache.Extension
+
+    def get(self, image_filename, chart_path):
+        # returns the cached thumbnail (RGB) or None if it has not been cached yet
+        cache_filename = self.get_cache_filename(image_filename, chart_path)
+        if cache_filename is None or not cache_filename in self.entries:
+            return None
+
+        cache_path = self.cache_dir + "/" + cache_filename
+        thumbnail = cv2.imread(cache_path)
+        if thumbnail is None:
+            # removed (or corrupted) ...
+            self.__remove(cache_filename)
+            return None
+
+        try:
+            # mark as recently used
+            os.utime(cache_path)
+        except OSError:
+            pass
+
+        return cv2.cvtColor(thumbnail, cv2.COLOR_BGR2RGB)
+
+    def load(self, image_filename, chart_path):
+        # the cached thumbnail, or a new thumbnail created (and cached) from the original image
+        thumbnail = self.get(image_filename, chart_path)
+        if thumbnail is None:
+            thumbnail = ThumbnailCache.CreateThumbnail(image_filename, self.max_dimension, self.max_dimension)
+            if thumbnail is not None:
+                self.put(image_filename, chart_path, thumbnail)
+
+        return thumbnail
+
+    def contains(self, image_filename, chart_path):
+        return self.get_cache_filename(image_filename, chart_path) in self.entries
+
+    def put(self, image_filename, chart_path, thumbnail):
+        cache_filename = self.get_cache_filename(image_filename, chart_path)
+        if cache_filename is None:
+            return
+
+        cache_path = self.cache_dir + "/" + cache_filename
+        # write to a temporary file first, other readers should never find an incomplete thumbnail
+        tempo_path = cache_path + ".{0:d}.tmp".format(threading.get_ident()) + ThumbnailCache.Extension
+        bgr_thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_RGB2BGR)
+        if not cv2.imwrite(tempo_path, bgr_thumbnail, [cv2.IMWRITE_JPEG_QUALITY, ThumbnailCache.JPEGQuality]):
+            print("Warning: Could not write to the thumbnail cache " + self.cache_dir)
+            return
+
+        os.replace(tempo_path, cache_path)
+
+        with self.lock:
+            self.total_size -= self.entries.get(cache_filename, 0)
+            self.entries[cache_filename] = os.path.getsize(cache_path)
+            self.total_size += self.entries[cache_filename]
+            over_limit = self.total_size > self.max_size
+
+        if over_limit:
+            self.evict()
+
+    def __remove(self, cache_filename):
+        with self.lock:
+            if cache_filename in self.entries:
+                self.total_size -= self.entries[cache_filename]
+                del self.entries[cache_filename]
+
+        try:
+            os.remove(self.cache_dir + "/" + cache_filename)
+        except OSError:
+            pass
+
+    def evict(self):
+        # removes the least recently used thumbnails until the cache is under 90% of its limit
+        target_size = int(self.max_size * 0.9)
+
+        with self.lock:
+            by_last_use = []
+            for cache_filename in self.entries:
+                try:
+                    last_use = os.path.getmtime(self.cache_dir + "/" + cache_filename)
+                except OSError:
+                    last_use = 0.0
+                by_last_use.append((last_use, cache_filename))
+
+        by_last_use = sorted(by_last_use)
+
+        for last_use, cache_filename in by_last_use:
+            with self.lock:
+                under_target = self.total_size <= target_size
+
+            if under_target:
+                break
+
+            self.__remove(cache_filename)
+
+    @staticmethod
+    def CreateThumbnail(image_filename, max_width, max_height):
+        # reads the image (RGB) and downsizes it (keeping the aspect ratio) to fit in the given size
+        image = cv2.imread(image_filename)
+        if image is None:
+            return None
+
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        scale = min(max_width / image.shape[1], max_height / image.shape[0])
+        if scale < 1.0:
+            new_size = (max(1, int(image.shape[1] * scale)), max(1, int(image.shape[0] * scale)))
+            image = cv2.resize(image, new_size, interpolation=cv2.INTER_AREA)
+
+        return image
+
+    @staticmethod
+    def FromConfig(config, annotation_dir):
+        # the cache is optional (None if disabled or if it cannot be created)
+        if not config.get_bool("CHART_THUMBNAIL_CACHE", True):
+            return None
+
+        cache_dir = config.get_str("CHART_THUMBNAIL_CACHE_DIR", annotation_dir + "/" + ThumbnailCache.DefaultDirname)
+        max_dimension = config.get_int("CHART_THUMBNAIL_SIZE", ThumbnailCache.DefaultMaxDimension)
+        max_size_mb = config.get_int("CHART_THUMBNAIL_CACHE_MB", ThumbnailCache.DefaultMaxSizeMB)
+
+        try:
+            return ThumbnailCache(cache_dir, max_dimension, max_size_mb)
+        except OSError as e:
+            print("Warning: Could not open the thumbnail cache " + cache_dir)
+            print(e)
+            return None
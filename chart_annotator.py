@@ -1,12 +1,15 @@
 
 import os
 import sys
+import time
 import pygame
 import traceback
 
 from AM_CommonTools.configuration.configuration import Configuration
 
 from ChartInfo.annotation.chart_main_annotator import ChartMainAnnotator
+from ChartInfo.util.thumbnail_cache import ThumbnailCache
+from ChartInfo.util.frame_stats import FrameStats
 
 def main():
     if len(sys.argv) < 2:
@@ -43,6 +46,14 @@ def main():
 
     charts_dir = config.get_str("CHART_DIRECTORY")
     annotations_dir = config.get_str("CHART_ANNOTATIONS")
+    use_status_index = config.get_bool("CHART_STATUS_INDEX", True)
+    thumbnail_cache = ThumbnailCache.FromConfig(config, annotations_dir)
+
+    # frames are only rendered when the screen changed (up to max_fps per second), otherwise the loop waits for
+    # new events (checking for background updates every idle_timeout ms)
+    max_fps = config.get_int("ANNOTATOR_MAX_FPS", 60)
+    idle_timeout = config.get_int("ANNOTATOR_IDLE_TIMEOUT_MS", 100)
+    frame_stats = FrameStats() if config.get_bool("ANNOTATOR_FRAME_STATS", False) else None
 
     pygame.init()
     pygame.display.set_caption('Chart Annotation Tool')
@@ -62,7 +73,8 @@ def main():
     background = background.convert()
 
     # try:
-    main_menu = ChartMainAnnotator(window.get_size(), charts_dir, annotations_dir, admin_mode)
+    main_menu = ChartMainAnnotator(window.get_size(), charts_dir, annotations_dir, admin_mode, use_status_index,
+                                   thumbnail_cache)
     # except Exception as e:
     #    print(e)
     #    return
@@ -76,6 +88,7 @@ def main():
     # current_screen.btn_annotate_click(None)
 
     prev_screen = None
+    clock = pygame.time.Clock()
 
     while not current_screen is None:
         #detect when the screen changes...
@@ -83,8 +96,17 @@ def main():
             #remember last screen...
             prev_screen = current_screen
 
-        #capture events...
-        current_events = pygame.event.get()
+        #capture events (wait for them if there is nothing to render)...
+        if current_screen.needs_render():
+            current_events = pygame.event.get()
+        else:
+            first_event = pygame.event.wait(idle_timeout)
+            if first_event.type == pygame.NOEVENT:
+                current_events = []
+            else:
+                current_events = [first_event] + pygame.event.get()
+
+        events_start = time.time()
         try:
             current_screen = current_screen.handle_events(current_events)
         except Exception as e:
@@ -96,16 +118,33 @@ def main():
             if current_screen != None:
                 #prepare the screen for new display ...
                 current_screen.prepare_screen()
+                current_screen.request_render()
+
+        t_events = time.time() - events_start
+
+        if current_screen is None or not current_screen.needs_render():
+            #nothing changed...
+            if frame_stats is not None:
+                frame_stats.add_loop(t_events)
+                frame_stats.check_report()
+            continue
 
         #draw....
+        render_start = time.time()
         background.fill((0, 0, 0))
+        current_screen.render(background)
 
-        if not current_screen is None:
-            current_screen.render(background)
-
+        display_start = time.time()
         window.blit(background, (0, 0))
         pygame.display.flip()
 
+        if frame_stats is not None:
+            frame_stats.add_loop(t_events, display_start - render_start, time.time() - display_start)
+            frame_stats.check_report()
+
+        #limit the frame rate while active...
+        clock.tick(max_fps)
+
 
 if __name__ == '__main__':
     main()
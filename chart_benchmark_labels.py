@@ -0,0 +1,147 @@
+import sys
+import time
+import random
+
+from AM_CommonTools.configuration.configuration import Configuration
+
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.text_info import TextInfo
+from ChartInfo.data.axis_values import AxisValues
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+from ChartInfo.util.file_stats import FileStats
+
+from tests.baseline_label_parser import BaselineLabelParser
+
+def collect_corpus_labels(charts_dir, annotations_dir, max_files):
+    # all tick and value label strings in the annotations (with repetitions, as parsed by the exporter)
+    img_list = ImageInfo.ListChartDirectory(charts_dir, "")
+
+    all_labels = []
+    total_files = 0
+    for img_file in img_list:
+        if max_files is not None and total_files >= max_files:
+            break
+
+        annotation_filename = FileStats.GetAnnotationFilename(annotations_dir, img_file)
+        try:
+            image_info = FastXMLLoader.LoadImageInfo(annotation_filename, None)
+        except Exception:
+            # no annotation (or invalid annotation) for this image
+            continue
+
+        total_files += 1
+        for panel in image_info.panels:
+            for text_type in [TextInfo.TypeTickLabel, TextInfo.TypeValueLabel]:
+                all_labels += [text.value for text in panel.get_all_text(text_type)]
+
+    return total_files, all_labels
+
+def generate_synthetic_labels(total_labels, seed=0):
+    # random labels combining the formats handled by the parser (separators, units, multipliers, notations)
+    rnd = random.Random(seed)
+    prefixes = ["", "", "", "-", "+", "$", "~", "<", " ", "usd "]
+    suffixes = ["", "", "", "%", "k", "K", "x", " ms", "mm", "m", "cm", "s", "€", "£", " times", "x10^3",
+                " x 10^{-2}", "*10^5", "\\times10^{4}", "\\times 10^{2}", "^2", " ", "a"]
+
+    labels = []
+    for idx in range(total_labels):
+        integer_part = str(rnd.choice([0, 1, 5, 10, 12, 100, 250, 1000, 12345, 1234567, rnd.randint(0, 10 ** 7)]))
+        number_format = rnd.randint(0, 6)
+        if number_format == 0:
+            number = integer_part
+        elif number_format == 1:
+            number = integer_part + "." + str(rnd.randint(0, 999))
+        elif number_format == 2:
+            number = "{0:,d}".format(int(integer_part))
+        elif number_format == 3:
+            number = "{0:,d}".format(int(integer_part)).replace(",", ".")
+        elif number_format == 4:
+            number = "{0:,d}".format(int(integer_part)).replace(",", ".") + "," + str(rnd.randint(0, 99))
+        elif number_format == 5:
+            number = "{0:,.2f}".format(int(integer_part) / 100.0)
+        else:
+            number = "." + str(rnd.randint(0, 99))
+
+        if rnd.random() < 0.05:
+            label = "10^" + str(rnd.randint(-3, 6))
+        else:
+            label = rnd.choice(prefixes) + number + rnd.choice(suffixes)
+
+        if rnd.random() < 0.2:
+            label = label.upper()
+
+        labels.append(label)
+
+    return labels
+
+def safe_parse(parse_function, str_val):
+    # (value, None) or (None, error type)
+    try:
+        return parse_function(str_val), None
+    except Exception as e:
+        return None, type(e).__name__
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python chart_benchmark_labels.py config [max_files]")
+        print("Where")
+        print("\tconfig\t\t= Configuration File")
+        print("\tmax_files\t= Maximum number of annotation files to use (all by default)")
+        print("")
+        return
+
+    config = Configuration.from_file(sys.argv[1])
+
+    charts_dir = config.get_str("CHART_DIRECTORY")
+    annotations_dir = config.get_str("CHART_ANNOTATIONS")
+
+    if len(sys.argv) >= 3:
+        max_files = int(sys.argv[2])
+    else:
+        max_files = None
+
+    total_files, corpus_labels = collect_corpus_labels(charts_dir, annotations_dir, max_files)
+    synthetic_labels = generate_synthetic_labels(10000)
+
+    print("Total Annotation Files: {0:d}".format(total_files))
+    print("Total Labels (Corpus): {0:d} ({1:d} unique)".format(len(corpus_labels), len(set(corpus_labels))))
+    print("Total Labels (Synthetic): {0:d} ({1:d} unique)".format(len(synthetic_labels), len(set(synthetic_labels))))
+
+    # the current parser (with and without the cache) must produce exactly the same values as the original
+    # parser (and fail on the same labels) ...
+    total_mismatches = 0
+    AxisValues.LabelNumericValue.cache_clear()
+    for str_val in sorted(set(corpus_labels + synthetic_labels)):
+        original_value = safe_parse(BaselineLabelParser.LabelNumericValue, str_val)
+        compiled_value = safe_parse(AxisValues.LabelNumericValue.__wrapped__, str_val)
+        cached_value = safe_parse(AxisValues.LabelNumericValue, str_val)
+
+        if original_value != compiled_value or original_value != cached_value:
+            print("Mismatch found: {0:s} -> {1:s} vs {2:s} (cached: {3:s})".format(
+                repr(str_val), str(original_value), str(compiled_value), str(cached_value)))
+            total_mismatches += 1
+
+    print("Total Mismatches: {0:d}".format(total_mismatches))
+
+    for title, all_labels in [("Corpus", corpus_labels), ("Synthetic", synthetic_labels)]:
+        if len(all_labels) == 0:
+            continue
+
+        start_time = time.time()
+        for str_val in all_labels:
+            safe_parse(BaselineLabelParser.LabelNumericValue, str_val)
+        time_original = time.time() - start_time
+
+        AxisValues.LabelNumericValue.cache_clear()
+        start_time = time.time()
+        for str_val in all_labels:
+            safe_parse(AxisValues.LabelNumericValue, str_val)
+        time_compiled = time.time() - start_time
+
+        print("{0:s} - Time Original Parser: {1:.4f} s".format(title, time_original))
+        print("{0:s} - Time Compiled Parser: {1:.4f} s".format(title, time_compiled))
+        if time_compiled > 0.0:
+            print("{0:s} - Speed-up: {1:.2f}x".format(title, time_original / time_compiled))
+
+if __name__ == "__main__":
+    main()
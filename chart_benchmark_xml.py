@@ -0,0 +1,155 @@
+
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from AM_CommonTools.configuration.configuration import Configuration
+
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.chart_info import ChartInfo
+from ChartInfo.data.bar_data import BarData
+from ChartInfo.data.box_data import BoxData
+from ChartInfo.data.line_data import LineData
+from ChartInfo.data.scatter_data import ScatterData
+from ChartInfo.data.fast_xml_loader import FastXMLLoader, LXMLBackend
+from ChartInfo.util.file_stats import FileStats
+
+# each data annotation is decoded several times by both loaders (the fastest time is kept)
+DataRepetitions = 5
+
+# original loader of each data class
+DataLoaders = {
+    "BarData": BarData.FromXML,
+    "BoxData": BoxData.FromXML,
+    "LineData": LineData.FromXML,
+    "ScatterData": ScatterData.FromXML,
+}
+
+def time_data_loading(annotation_filename, data_times):
+    # time required to decode the data of each panel by both loaders (each one using its own XML tree)
+    # data_times: key = data class, value = [total panels, time original, time fast]
+    original_root = ET.parse(annotation_filename).getroot()
+    fast_root = FastXMLLoader.Parse(annotation_filename)
+
+    for xml_original_panel, xml_fast_panel in zip(original_root.find("Panels"), fast_root.find("Panels")):
+        xml_original_data = xml_original_panel.find("Data")
+        if xml_original_data is None or not xml_original_data.attrib["class"] in DataLoaders:
+            continue
+
+        data_class = xml_original_data.attrib["class"]
+        xml_fast_data = xml_fast_panel.find("Data")
+        text_index = ChartInfo.FromXML(xml_original_panel).get_text_index()
+
+        time_original = None
+        time_fast = None
+        for repetition in range(DataRepetitions):
+            start_time = time.time()
+            DataLoaders[data_class](xml_original_data, text_index)
+            elapsed = time.time() - start_time
+            time_original = elapsed if time_original is None else min(time_original, elapsed)
+
+            start_time = time.time()
+            FastXMLLoader.LoadData(xml_fast_data, text_index)
+            elapsed = time.time() - start_time
+            time_fast = elapsed if time_fast is None else min(time_fast, elapsed)
+
+        if not data_class in data_times:
+            data_times[data_class] = [0, 0.0, 0.0]
+
+        data_times[data_class][0] += 1
+        data_times[data_class][1] += time_original
+        data_times[data_class][2] += time_fast
+
+def print_speed_up(title, units, total, time_original, time_fast):
+    speed_up = "{0:.2f}x".format(time_original / time_fast) if time_fast > 0.0 else "N/A"
+    print("- {0:s}: {1:d} {2:s}, Original {3:.4f} s, Fast {4:.4f} s, Speed-up: {5:s}".format(
+        title, total, units, time_original, time_fast, speed_up))
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python chart_benchmark_xml.py config [max_files]")
+        print("Where")
+        print("\tconfig\t\t= Configuration File")
+        print("\tmax_files\t= Maximum number of annotation files to test (all by default)")
+        print("")
+        return
+
+    config = Configuration.from_file(sys.argv[1])
+
+    charts_dir = config.get_str("CHART_DIRECTORY")
+    annotations_dir = config.get_str("CHART_ANNOTATIONS")
+
+    if len(sys.argv) >= 3:
+        max_files = int(sys.argv[2])
+    else:
+        max_files = None
+
+    img_list = ImageInfo.ListChartDirectory(charts_dir, "")
+
+    print("XML Backend: " + ("lxml" if LXMLBackend else "xml.etree"))
+
+    total_files = 0
+    total_mismatches = 0
+    total_time_original = 0.0
+    total_time_fast = 0.0
+    file_times = {}
+    data_times = {}
+    for img_file in img_list:
+        if max_files is not None and total_files >= max_files:
+            break
+
+        annotation_filename = FileStats.GetAnnotationFilename(annotations_dir, img_file)
+        try:
+            start_time = time.time()
+            original_info = ImageInfo.FromXML(annotation_filename, None)
+        except Exception:
+            # no annotation (or invalid annotation) for this image
+            continue
+
+        time_original = time.time() - start_time
+
+        start_time = time.time()
+        fast_info = FastXMLLoader.LoadImageInfo(annotation_filename, None)
+        time_fast = time.time() - start_time
+
+        total_time_original += time_original
+        total_time_fast += time_fast
+        total_files += 1
+
+        # times per type of file (data classes of its panels)
+        data_classes = sorted(set([type(panel.data).__name__ for panel in original_info.panels
+                                   if panel.data is not None]))
+        file_type = "+".join(data_classes) if len(data_classes) > 0 else "No Data"
+        if not file_type in file_times:
+            file_times[file_type] = [0, 0.0, 0.0]
+
+        file_times[file_type][0] += 1
+        file_times[file_type][1] += time_original
+        file_times[file_type][2] += time_fast
+
+        time_data_loading(annotation_filename, data_times)
+
+        # both versions must produce exactly the same annotation ...
+        if original_info.to_XML() != fast_info.to_XML():
+            print("Mismatch found: " + annotation_filename)
+            total_mismatches += 1
+
+    print("Total Annotation Files: {0:d}".format(total_files))
+    print("Total Mismatches: {0:d}".format(total_mismatches))
+    print("Time ImageInfo.FromXML: {0:.4f} s".format(total_time_original))
+    print("Time FastXMLLoader: {0:.4f} s".format(total_time_fast))
+    if total_time_fast > 0.0:
+        print("Speed-up: {0:.2f}x".format(total_time_original / total_time_fast))
+
+    # complete files, per data class
+    print("\nPer data class (complete files):")
+    for file_type in sorted(file_times.keys()):
+        print_speed_up(file_type, "files", *file_times[file_type])
+
+    # decoding of the data annotations only, per data class
+    print("\nPer data class (data annotations only):")
+    for data_class in sorted(data_times.keys()):
+        print_speed_up(data_class, "panels", *data_times[data_class])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import sys
+import multiprocessing
+
+from AM_CommonTools.configuration.configuration import Configuration
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+from ChartInfo.data.binary_annotation import BinaryAnnotation
+
+def list_xml_annotations(xml_folder):
+    # relative paths of all XML annotations (sorted, using "/" as separator)
+    all_files = []
+    for current_dir, dirs, files in os.walk(xml_folder):
+        dirs.sort()
+        rel_dir = os.path.relpath(current_dir, xml_folder)
+        for filename in sorted(files):
+            if filename.lower().endswith(".xml"):
+                if rel_dir == ".":
+                    all_files.append(filename)
+                else:
+                    all_files.append((rel_dir + "/" + filename).replace(os.sep, "/"))
+
+    return all_files
+
+def get_binary_filename(rel_path, binary_folder):
+    base, ext = os.path.splitext(rel_path)
+    return binary_folder + "/" + base + BinaryAnnotation.Extension
+
+def remove_binary_file(binary_filename):
+    # an invalid (or outdated) binary file would be considered up-to-date on the next run
+    if os.path.exists(binary_filename):
+        os.remove(binary_filename)
+
+def convert_annotation_file(task):
+    # converts a single annotation, returns the line to add to the errors list (None if successful)
+    xml_filename, binary_filename, verify = task
+
+    try:
+        image_info = FastXMLLoader.LoadImageInfo(xml_filename, None)
+
+        os.makedirs(os.path.dirname(binary_filename), exist_ok=True)
+        BinaryAnnotation.Save(image_info, binary_filename)
+
+        if verify:
+            # both versions must produce exactly the same annotation ...
+            binary_info = BinaryAnnotation.Load(binary_filename, None)
+            if binary_info.to_XML() != image_info.to_XML():
+                remove_binary_file(binary_filename)
+                return xml_filename + ",Binary version does not match the XML annotation"
+    except Exception as e:
+        remove_binary_file(binary_filename)
+        return xml_filename + "," + str(e)
+
+    return None
+
+def convert_annotations(xml_folder, binary_folder, workers=1, force=False, verify=False):
+    all_files = list_xml_annotations(xml_folder)
+
+    all_tasks = []
+    total_skipped = 0
+    for rel_path in all_files:
+        xml_filename = xml_folder + "/" + rel_path
+        binary_filename = get_binary_filename(rel_path, binary_folder)
+
+        # skip annotations that have not changed since their last conversion (to the current format)
+        if (not force and os.path.exists(binary_filename) and
+            os.path.getmtime(binary_filename) >= os.path.getmtime(xml_filename) and
+            BinaryAnnotation.GetFileVersion(binary_filename) == BinaryAnnotation.FormatVersion):
+            total_skipped += 1
+            continue
+
+        all_tasks.append((xml_filename, binary_filename, verify))
+
+    print("Total XML annotations: {0:d}".format(len(all_files)))
+    print("Up-to-date (skipped): {0:d}".format(total_skipped))
+    print("To convert: {0:d}".format(len(all_tasks)))
+
+    collected_errors = []
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for error_line in pool.imap(convert_annotation_file, all_tasks, 16):
+                if error_line is not None:
+                    collected_errors.append(error_line)
+    else:
+        for task in all_tasks:
+            error_line = convert_annotation_file(task)
+            if error_line is not None:
+                collected_errors.append(error_line)
+
+    print("Total errors: {0:d}".format(len(collected_errors)))
+    for error_line in collected_errors:
+        print("\t" + error_line)
+
+def main():
+    # check for optional number of workers ...
+    args = list(sys.argv)
+    workers = 1
+    if "--workers" in args:
+        pos = args.index("--workers")
+        try:
+            workers = int(args[pos + 1])
+        except:
+            print("Invalid number of workers")
+            return
+
+        del args[pos:pos + 2]
+
+    # check for optional flags ...
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+
+    verify = "--verify" in args
+    if verify:
+        args.remove("--verify")
+
+    if len(args) < 2:
+        print('Usage: ')
+        print("\tpython chart_binary_export.py config [binary_folder] [--workers n] [--force] [--verify]")
+        print("Where: ")
+        print("\tconfig\t\tChart Annotator Configuration for Input Annotations")
+        print("\tbinary_folder\tOutput directory for binary annotations")
+        print("\tn\t\tNumber of processes used to convert the annotations (default = 1)")
+        print("\t--force\t\tConvert all annotations, even if their binary version is up-to-date")
+        print("\t--verify\tCheck that each binary annotation loads back to the same annotation")
+        return
+
+    config_filename = args[1]
+    config = Configuration.from_file(config_filename)
+
+    annotations_dir = config.get_str("CHART_ANNOTATIONS")
+
+    if len(args) >= 3:
+        # override binary_folder
+        binary_dir = args[2]
+    else:
+        # use config with default output dir.
+        binary_dir = config.get_str("CHART_BINARY_EXPORT_DIR", "export_binary")
+
+    print("Input XML Annotations Directory: " + annotations_dir)
+    print("Output Binary Annotation Directory: " + binary_dir)
+
+    convert_annotations(annotations_dir, binary_dir, workers, force, verify)
+
+
+if __name__ == "__main__":
+    main()
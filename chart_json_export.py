@@ -1,14 +1,86 @@
 import os
 import sys
-import json
+import multiprocessing
 
 from AM_CommonTools.configuration.configuration import Configuration
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
 from ChartInfo.util.file_stats import FileStats
 from ChartInfo.util.json_exporter import ChartJSON_Exporter
+from ChartInfo.util.export_manifest import ExportManifest
+from ChartInfo.util.status_index import StatusIndex
 
-def prepare_json(img_folder, xml_folder, json_folder, error_output_filename, task_num=1, mask_output=True):
+def export_chart_json(img_file, img_info, img_status, json_folder, task_num, mask_output):
+    # exports a single annotation, returns the line to add to the errors file (None if successful) and
+    # if a JSON file was saved (skipped images and failed exports do not produce any output)
+    if img_info is None:
+        print("\tWarning: no annotation found for this image! Skipping!")
+        return None, False
+
+    if len(img_info.panels) > 1:
+        print("\tWarning: the image has multiple panels! Skipping!")
+        return None, False
+
+    chart_info = img_info.panels[0]
+
+    # prepare_chart_image_json(img_file, chart_info, img_status, task_num, mask_output, json_folder)
+    # x = 0 / 0
+    try:
+        json_output = ChartJSON_Exporter.prepare_chart_image_json(chart_info, img_status, task_num, mask_output)
+        ChartJSON_Exporter.SaveChartImageJSON(json_output, img_file, json_folder)
+    except Exception as e:
+        print("- Exception found! ")
+        print(e)
+
+        # try falling back to produce GT for lower tasks only ...
+        success = False
+        if not mask_output:
+            tempo_task_num = task_num - 1
+            while tempo_task_num > 1 and not success:
+                try:
+                    json_output = ChartJSON_Exporter.prepare_chart_image_json(chart_info, img_status,
+                                                                              tempo_task_num, mask_output)
+                    ChartJSON_Exporter.SaveChartImageJSON(json_output, img_file, json_folder)
+                    success = True
+                except:
+                    # try previous task ...
+                    tempo_task_num -= 1
+
+        else:
+            # cannot fall back to previous task if using the testing set mode
+            tempo_task_num = 0
+
+        return "{0:s}\t{1:s}\tExported Task {2:d}\n".format(img_file, str(e), tempo_task_num), success
+
+    return None, True
+
+def export_chart_json_file(task):
+    # Note: this is executed by the worker processes in streaming mode, only the error line (and if a JSON file
+    #       was saved) is sent back
+    img_file, annotation_filename, json_folder, task_num, mask_output = task
+
+    print("Preparing JSON for " + img_file)
+
+    if os.path.exists(annotation_filename):
+        img_info = FastXMLLoader.LoadImageInfo(annotation_filename, None)
+        img_status = ImageInfo.GetAllStatuses(img_info)
+    else:
+        img_info = None
+        img_status = None
+
+    return export_chart_json(img_file, img_info, img_status, json_folder, task_num, mask_output)
+
+def save_errors(collected_errors, error_output_filename):
+    if len(collected_errors) > 0:
+        with open(error_output_filename, "a") as out_file:
+            out_file.writelines(collected_errors)
+
+        print("Saved all errors found to " + error_output_filename)
+
+def prepare_json(img_folder, xml_folder, json_folder, error_output_filename, task_num=1, mask_output=True,
+                 workers=1):
     print("\n\nLoading annotations from " + xml_folder)
-    stats = FileStats(img_folder, xml_folder, True)
+    stats = FileStats(img_folder, xml_folder, True, workers=workers)
 
     os.makedirs(json_folder, exist_ok=True)
 
@@ -17,56 +89,143 @@ def prepare_json(img_folder, xml_folder, json_folder, error_output_filename, tas
         print("Preparing JSON for " + img_file)
 
         img_info = stats.cache_annotations[img_idx]
-        if img_info is None:
-            print("\tWarning: no annotation found for this image! Skipping!")
+        img_status = stats.img_statuses[img_idx]
+
+        error_line, output_saved = export_chart_json(img_file, img_info, img_status, json_folder, task_num,
+                                                     mask_output)
+        if error_line is not None:
+            collected_errors.append(error_line)
+
+    save_errors(collected_errors, error_output_filename)
+
+def prepare_json_streaming(img_folder, xml_folder, json_folder, error_output_filename, task_num=1, mask_output=True,
+                           workers=1):
+    # annotations are loaded, exported and discarded one at a time (by each worker) and never cached
+    print("\n\nStreaming annotations from " + xml_folder)
+    img_list = ImageInfo.ListChartDirectory(img_folder, "")
+
+    os.makedirs(json_folder, exist_ok=True)
+
+    all_tasks = ((img_file, FileStats.GetAnnotationFilename(xml_folder, img_file), json_folder, task_num, mask_output)
+                 for img_file in img_list)
+
+    # imap returns the results in the same order as the image list, errors are reported in a deterministic order
+    collected_errors = []
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for error_line, output_saved in pool.imap(export_chart_json_file, all_tasks, 16):
+                if error_line is not None:
+                    collected_errors.append(error_line)
+    else:
+        for task in all_tasks:
+            error_line, output_saved = export_chart_json_file(task)
+            if error_line is not None:
+                collected_errors.append(error_line)
+
+    save_errors(collected_errors, error_output_filename)
+
+def remove_json_output(img_file, json_folder):
+    json_output_file = ChartJSON_Exporter.GetChartImageJSONFilename(img_file, json_folder)
+    if os.path.exists(json_output_file):
+        print("- Removing " + json_output_file)
+        os.remove(json_output_file)
+
+def prepare_json_incremental(img_folder, xml_folder, json_folder, error_output_filename, task_num=1,
+                             mask_output=True, workers=1):
+    # only annotations which changed since the last export (or exported with different settings) are exported
+    print("\n\nChecking for modified annotations in " + xml_folder)
+    img_list = ImageInfo.ListChartDirectory(img_folder, "")
+
+    os.makedirs(json_folder, exist_ok=True)
+
+    manifest = ExportManifest(json_folder, task_num, mask_output, ChartJSON_Exporter.ExporterVersion)
+
+    current_files = {}
+    pending_tasks = []
+    pending_files = []
+    for img_file in img_list:
+        annotation_filename = FileStats.GetAnnotationFilename(xml_folder, img_file)
+        signature = StatusIndex.GetSignature(annotation_filename)
+        if signature is None:
+            # no annotation for this image (anymore)
             continue
 
-        img_status = stats.img_statuses[img_idx]
-        if len(img_info.panels) > 1:
-            print("\tWarning: the image has multiple panels! Skipping!")
+        current_files[img_file] = True
+
+        json_output_file = ChartJSON_Exporter.GetChartImageJSONFilename(img_file, json_folder)
+        up_to_date, file_hash = manifest.check_up_to_date(img_file, annotation_filename, signature, json_output_file)
+        if up_to_date:
             continue
 
-        chart_info = img_info.panels[0]
+        # the previous output (if any) is no longer valid ...
+        remove_json_output(img_file, json_folder)
+        manifest.remove(img_file)
 
-        # prepare_chart_image_json(img_file, chart_info, img_status, task_num, mask_output, json_folder)
-        # x = 0 / 0
-        try:
-            json_output = ChartJSON_Exporter.prepare_chart_image_json(chart_info, img_status, task_num, mask_output)
-            ChartJSON_Exporter.SaveChartImageJSON(json_output, img_file, json_folder)
-        except Exception as e:
-            print("- Exception found! ")
-            print(e)
-
-            # try falling back to produce GT for lower tasks only ...
-            if not mask_output:
-                tempo_task_num = task_num - 1
-                success = False
-                while tempo_task_num > 1 and not success:
-                    try:
-                        json_output = ChartJSON_Exporter.prepare_chart_image_json(chart_info, img_status,
-                                                                                  tempo_task_num, mask_output)
-                        ChartJSON_Exporter.SaveChartImageJSON(json_output, img_file, json_folder)
-                        success = True
-                    except:
-                        # try previous task ...
-                        tempo_task_num -= 1
-
-            else:
-                # cannot fall back to previous task if using the testing set mode
-                tempo_task_num = 0
-
-            collected_errors.append("{0:s}\t{1:s}\tExported Task {2:d}\n".format(img_file, str(e), tempo_task_num))
+        pending_tasks.append((img_file, annotation_filename, json_folder, task_num, mask_output))
+        if file_hash is None:
+            file_hash = ExportManifest.FileHash(annotation_filename)
+        pending_files.append((img_file, signature, file_hash))
 
-    if len(collected_errors) > 0:
-        with open(error_output_filename, "a") as out_file:
-            out_file.writelines(collected_errors)
+    # remove the outputs of annotations which no longer exist ...
+    total_removed = 0
+    for img_file in manifest.get_files():
+        if not img_file in current_files:
+            remove_json_output(img_file, json_folder)
+            manifest.remove(img_file)
+            total_removed += 1
 
-        print("Saved all errors found to " + error_output_filename)
+    print("A total of {0:d} annotations must be exported ({1:d} unchanged, {2:d} removed)".format(
+        len(pending_tasks), len(current_files) - len(pending_tasks), total_removed))
+
+    if workers > 1 and len(pending_tasks) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            all_results = list(pool.imap(export_chart_json_file, pending_tasks, 16))
+    else:
+        all_results = [export_chart_json_file(task) for task in pending_tasks]
+
+    for (img_file, signature, file_hash), (error_line, output_saved) in zip(pending_files, all_results):
+        manifest.update(img_file, signature, file_hash, error_line, output_saved)
+
+    manifest.save()
+
+    # the errors of the annotations which were not exported again are also reported
+    collected_errors = []
+    for img_file in img_list:
+        error_line = manifest.get_error(img_file)
+        if error_line is not None:
+            collected_errors.append(error_line)
+
+    save_errors(collected_errors, error_output_filename)
+
+    return len(pending_tasks)
 
 def main():
-    if len(sys.argv) < 2:
+    # check for optional number of workers ...
+    args = list(sys.argv)
+    workers = 1
+    if "--workers" in args:
+        pos = args.index("--workers")
+        try:
+            workers = int(args[pos + 1])
+        except:
+            print("Invalid number of workers")
+            return
+
+        del args[pos:pos + 2]
+
+    # check for optional streaming mode ...
+    streaming = "--stream" in args
+    if streaming:
+        args.remove("--stream")
+
+    # check for optional incremental mode ...
+    incremental = "--incremental" in args
+    if incremental:
+        args.remove("--incremental")
+
+    if len(args) < 2:
         print('Usage: ')
-        print("\tpython chart_json_export.py config [json_folder] [task_num] [test_mode] [errors]")
+        print("\tpython chart_json_export.py config [json_folder] [task_num] [test_mode] [errors] [--workers n] [--stream] [--incremental]")
         print("Where: ")
         print("\tconfig\t\tChart Annotator Configuration for Input Images")
         print("\tjson_folder\tOutput directory for JSON files")
@@ -75,38 +234,41 @@ def main():
         print("\t\t0 - Training Dataset Mode")
         print("\t\t1 - Testing Dataset Mode")
         print("\terrors\t\tName for file with export errors")
+        print("\tn\t\tNumber of processes used to load the annotations (default = 1)")
+        print("\t--stream\tLoad and export one annotation at a time using the n processes (bounded memory)")
+        print("\t--incremental\tOnly export annotations which changed since the last export (implies streaming)")
         return
 
-    config_filename = sys.argv[1]
+    config_filename = args[1]
     config = Configuration.from_file(config_filename)
 
     charts_dir = config.get_str("CHART_DIRECTORY")
     annotations_dir = config.get_str("CHART_ANNOTATIONS")
 
-    if len(sys.argv) >= 3:
+    if len(args) >= 3:
         # override json_folder
-        json_dir = sys.argv[2]
+        json_dir = args[2]
     else:
         # use config with default output dir.
         json_dir = config.get_str("CHART_JSON_EXPORT_DIR", "export_JSON")
 
-    if len(sys.argv) >= 4:
+    if len(args) >= 4:
         # override task number ..
-        task_num = int(sys.argv[3])
+        task_num = int(args[3])
     else:
         # use config with default task number
         task_num = config.get_int("CHART_JSON_EXPORT_TASK", 7)
 
-    if len(sys.argv) >= 5:
+    if len(args) >= 5:
         # override test mode
-        test_mode = int(sys.argv[4]) >= 1
+        test_mode = int(args[4]) >= 1
     else:
         # use config with default mode: not testing
         test_mode = config.get_bool("CHART_JSON_EXPORT_TEST_MODE", False)
 
-    if len(sys.argv) >= 6:
+    if len(args) >= 6:
         # override errors filename
-        error_filename = sys.argv[5]
+        error_filename = args[5]
     else:
         error_filename = "EXPORT_ERRORS.CSV"
 
@@ -115,8 +277,16 @@ def main():
     print("Output JSON Annotation Directory: " + json_dir)
     print("Task to export in JSON Format: " + str(task_num))
     print("Export Mode: " + ("Testing" if test_mode else "Training"))
+    print("Worker Processes: " + str(workers))
+    print("Streaming Mode: " + ("Yes" if streaming else "No"))
+    print("Incremental Mode: " + ("Yes" if incremental else "No"))
 
-    prepare_json(charts_dir, annotations_dir, json_dir, error_filename, task_num, test_mode)
+    if incremental:
+        prepare_json_incremental(charts_dir, annotations_dir, json_dir, error_filename, task_num, test_mode, workers)
+    elif streaming:
+        prepare_json_streaming(charts_dir, annotations_dir, json_dir, error_filename, task_num, test_mode, workers)
+    else:
+        prepare_json(charts_dir, annotations_dir, json_dir, error_filename, task_num, test_mode, workers)
 
 if __name__ == '__main__':
     main()
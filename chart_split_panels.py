@@ -29,10 +29,14 @@ def split_dir_annotations(in_img_dir, in_annot_dir, out_img_dir, out_annot_dir,
                     # first of this type
                     panels_per_type[chart_type] = sub_dir_stats[chart_type]
         else:
-            print("Processing: " + element_path)
-
             # load the corresponding image
             base, ext = os.path.splitext(element)
+            if ext.lower() != ".xml":
+                # not an annotation file (e.g. the status index)
+                continue
+
+            print("Processing: " + element_path)
+
             img_path = in_img_dir + rel_path + base + ".jpg"
             current_img = cv2.imread(img_path)
 
@@ -68,9 +72,8 @@ def split_dir_annotations(in_img_dir, in_annot_dir, out_img_dir, out_annot_dir,
                 # Save panel annotation to output image directory
                 os.makedirs(out_annot_dir  + "/" + chart_type + rel_path, exist_ok=True)
                 out_panel_annotation = out_annot_dir  + "/" + chart_type + rel_path + base + "_panel_" + str(panel_idx + 1) + ".xml"
-                tempo_xml = panel_annotation.to_XML()
                 with open(out_panel_annotation, "w") as out_annot_file:
-                    out_annot_file.write(tempo_xml)
+                    panel_annotation.write_XML(out_annot_file)
 
 
     return panels_per_type
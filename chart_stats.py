@@ -8,22 +8,38 @@ from ChartInfo.util.file_stats import FileStats
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python chart_stats.py config [config2] [...]")
+        print("Usage: python chart_stats.py config [config2] [...] [--workers n]")
         print("Where")
         print("\tconfig\t= Configuration File")
+        print("\tn\t= Number of processes used to load the annotations (default = 1)")
         print("")
         return
 
+    # check for optional number of workers ...
+    config_filenames = list(sys.argv[1:])
+    workers = 1
+    if "--workers" in config_filenames:
+        pos = config_filenames.index("--workers")
+        try:
+            workers = int(config_filenames[pos + 1])
+        except:
+            print("Invalid number of workers")
+            return
+
+        del config_filenames[pos:pos + 2]
+
     all_stats = []
 
-    for config_filename in sys.argv[1:]:
+    for config_filename in config_filenames:
         print("Processing: " + config_filename, flush=True)
         config = Configuration.from_file(config_filename)
 
         charts_dir = config.get_str("CHART_DIRECTORY")
         annotations_dir = config.get_str("CHART_ANNOTATIONS")
 
-        stats = FileStats(charts_dir, annotations_dir)
+        use_index = config.get_bool("CHART_STATUS_INDEX", True)
+
+        stats = FileStats(charts_dir, annotations_dir, workers=workers, use_index=use_index)
         all_stats.append(stats)
 
     stats = FileStats.Merge(all_stats)
@@ -0,0 +1,88 @@
+import sys
+import multiprocessing
+
+from AM_CommonTools.configuration.configuration import Configuration
+
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.util.thumbnail_cache import ThumbnailCache
+
+# each worker process opens its own instance of the cache
+worker_cache = None
+
+def init_worker(cache_dir, max_dimension, max_size_mb):
+    global worker_cache
+    worker_cache = ThumbnailCache(cache_dir, max_dimension, max_size_mb)
+
+def cache_thumbnail(task):
+    # returns True if a new thumbnail was created, False if it was already cached, None if the image is invalid
+    charts_dir, chart_path = task
+    image_filename = charts_dir + chart_path
+
+    if worker_cache.contains(image_filename, chart_path):
+        return False
+
+    thumbnail = worker_cache.load(image_filename, chart_path)
+    if thumbnail is None:
+        return None
+    else:
+        return True
+
+def main():
+    # check for optional number of workers ...
+    args = list(sys.argv)
+    workers = 1
+    if "--workers" in args:
+        pos = args.index("--workers")
+        try:
+            workers = int(args[pos + 1])
+        except:
+            print("Invalid number of workers")
+            return
+
+        del args[pos:pos + 2]
+
+    if len(args) < 2:
+        print("Usage: python chart_thumbnail_cache.py config [--workers n]")
+        print("Where")
+        print("\tconfig\t= Configuration File")
+        print("\tn\t= Number of processes used to create the thumbnails (default = 1)")
+        return
+
+    config = Configuration.from_file(args[1])
+
+    charts_dir = config.get_str("CHART_DIRECTORY")
+    annotations_dir = config.get_str("CHART_ANNOTATIONS")
+
+    cache = ThumbnailCache.FromConfig(config, annotations_dir)
+    if cache is None:
+        print("The thumbnail cache is disabled")
+        return
+
+    img_list = ImageInfo.ListChartDirectory(charts_dir, "")
+    print("Chart Images Directory: " + charts_dir)
+    print("Thumbnail Cache Directory: " + cache.cache_dir)
+    print("Total Images: {0:d}".format(len(img_list)))
+
+    init_args = (cache.cache_dir, cache.max_dimension, cache.max_size / (1024 * 1024))
+    all_tasks = [(charts_dir, chart_path) for chart_path in img_list]
+
+    if workers > 1:
+        with multiprocessing.Pool(workers, init_worker, init_args) as pool:
+            results = list(pool.imap(cache_thumbnail, all_tasks, 16))
+    else:
+        init_worker(*init_args)
+        results = [cache_thumbnail(task) for task in all_tasks]
+
+    print("New Thumbnails: {0:d}".format(results.count(True)))
+    print("Already Cached: {0:d}".format(results.count(False)))
+    print("Invalid Images: {0:d}".format(results.count(None)))
+
+    # each worker only knows about its own thumbnails ... enforce the size limit over the whole cache
+    cache = ThumbnailCache(cache.cache_dir, cache.max_dimension, cache.max_size / (1024 * 1024))
+    if cache.total_size > cache.max_size:
+        cache.evict()
+
+    print("Cache Size: {0:.2f} MB".format(cache.total_size / (1024 * 1024)))
+
+if __name__ == "__main__":
+    main()
@@ -15,8 +15,9 @@ def load_stats(config_filename):
 
     charts_dir = config.get_str("CHART_DIRECTORY")
     annotations_dir = config.get_str("CHART_ANNOTATIONS")
+    use_index = config.get_bool("CHART_STATUS_INDEX", True)
 
-    stats = FileStats(charts_dir, annotations_dir)
+    stats = FileStats(charts_dir, annotations_dir, use_index=use_index)
 
     return stats
 
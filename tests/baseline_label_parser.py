@@ -0,0 +1,171 @@
+
+class BaselineLabelParser:
+    # Frozen copy of the numeric label parser (AxisValues.LabelNumericValue and its helpers) as it was before
+    # parsing was memoized and given a fast path for plain numbers. Used as the reference for the equivalence tests,
+    # do not modify.
+
+    @staticmethod
+    def IdentifyNumericPart(str_value):
+        num_start = 0
+        num_end = None
+        commas = []
+        dots = []
+        while num_start < len(str_value) and not (
+                "0" <= str_value[num_start] <= "9" or str_value[num_start] in [",", "."]):
+            num_start += 1
+
+        if num_start < len(str_value):
+            num_end = num_start
+            while num_end < len(str_value) and ("0" <= str_value[num_end] <= "9" or str_value[num_end] in [",", "."]):
+                if str_value[num_end] == ".":
+                    dots.append(num_end)
+                if str_value[num_end] == ",":
+                    commas.append(num_end)
+
+                num_end += 1
+
+        return num_start, num_end, dots, commas
+
+    @staticmethod
+    def RemoveThousandsSeparator(str_value):
+        num_start, num_end, dots, commas = BaselineLabelParser.IdentifyNumericPart(str_value)
+
+        if num_end is None:
+            raise Exception("No numeric pattern was found on input string: " + str_value)
+
+        if len(commas) > 1 and len(dots) > 1:
+            # there can be multiple commas and at most one dot or multiple dots and at most one comma
+            # there should not be both multiple commas and multiple dots
+            raise Exception("Invalid combination of digit separators was found: " + str_value)
+
+        # note that this function does not validate ... it only guesses format and tries to make sure that most strings
+        # will be correctly parsed to float
+        num_str = str_value[num_start:num_end]
+        if len(commas) > 0:
+            if len(dots) > 0:
+                # need to figure out if using "1,234.56" or "1.234,56"
+                if dots[-1] < commas[-1]:
+                    # the comma appears last ... assume "1.234,56"
+                    if len(commas) == 1:
+                        # remove dots .... then replace comma with dot
+                        num_str = num_str.replace(".", "")
+                        num_str = num_str.replace(",", ".")
+                    else:
+                        # invalid ... there can be only one comma (fraction separator)
+                        raise Exception("Invalid numeric string: " + str_value)
+                else:
+                    # the dot appears last ... assume "1,234.56"
+                    if len(dots) == 1:
+                        # remove commas
+                        num_str = num_str.replace(",", "")
+                    else:
+                        # invalid ... there can be only one dot (fraction separator)
+                        raise Exception("Invalid numeric string: " + str_value)
+            else:
+                # does not contain "dot", it could still be "1,234"="1234.00" or "1,23"="1.23"
+                if len(commas) == 1 and num_end - commas[0] <= 3:
+                    # assume comma is used as the separator for fractions ("." is for thousands but absent here)
+                    # replace comma
+                    num_str = num_str.replace(",", ".")
+                else:
+                    # assume commas are used as thousands separators, remove them
+                    num_str = num_str.replace(",", "")
+
+            result = str_value[:num_start] + num_str + str_value[num_end:]
+        elif len(dots) > 1:
+            # there is no comma on the string, but it contains more than one dot
+            # assume that dots are used as the thousands separators and remove them
+            num_str = num_str.replace(".", "")
+            result = str_value[:num_start] + num_str + str_value[num_end:]
+        else:
+            # no conversion applied
+            result = str_value
+
+        return result
+
+    @staticmethod
+    def LabelNumericValue(str_val):
+        multiplier = 1.0
+
+        # TODO: Cases not yet handled:
+        # TODO: - Fractions "1/2", "1/4" ...etc
+        # TODO: - Dates (multiple formats)
+        # TODO: - Times (multiple formats)
+        # TODO: - Roman Numbers!
+        # TODO: - Ordinals
+        # TODO: - Some labels can be used by two axis (e.g. the zero)
+        # TODO: - External multipliers (an Axis-level value multiplier, usually from a Scale Text Label)
+
+        str_val = str_val.lower()
+
+        # X,YYY,ZZZ.AA -> XYYYZZZ.AA
+        # X.XXX.XXX,XX -> XYYYZZZ.AA
+        str_val = BaselineLabelParser.RemoveThousandsSeparator(str_val)
+
+        # TODO: This is a good place to capture potential units ....
+        # keep this list sorted ... in decreasing order so "mm" will be handled before "m"
+        known_units = ["usd","s", "ms", "m", "cm", "mm", "$", "x", "€", "£"]
+        known_units = sorted([(len(unit), unit) for unit in known_units], reverse=True)
+        for l, unit in known_units:
+            if unit in "times" and "times" in str_val:
+                # some units are substrings of "times"
+                # but times is valid latex ... do not remove the unit candidate
+                continue
+
+            if unit in str_val:
+                # TODO: should this rule be extended to all units ???
+                # check if unit is "x"
+                if unit == "x":
+                    # only treat as unit and remove if it appears at the end of the string
+                    if len(str_val[str_val.index(unit) + len(unit):].strip()) == 0:
+                        str_val = str_val.replace(unit, "")
+                else:
+                    # by default, always remove the unit candidate
+                    str_val = str_val.replace(unit, "")
+
+        if "%" in str_val:
+            str_val = str_val.replace("%", "")
+            multiplier *= 0.01
+
+        if "k" in str_val:
+            str_val = str_val.replace("k", "")
+            multiplier *= 1000.0
+
+        if " " in str_val:
+            str_val = str_val.replace(" ", "")
+
+        # replace by space and strip to remove the space automatically only if they space is before or after the string
+        # but still should trigger an error if the symbol is placed between other elements
+        if "~" in str_val:
+            str_val = str_val.replace("~", " ").strip()
+        if "<" in str_val:
+            str_val = str_val.replace("<", " ").strip()
+        if ">" in str_val:
+            str_val = str_val.replace("<", " ").strip()
+        if "=" in str_val:
+            str_val = str_val.replace("<", " ").strip()
+
+        # Handle scientific notation (including LaTeX strings)
+        if "x10" in str_val:
+            str_val = str_val.replace("x10", "E")
+        if "x 10" in str_val:
+            str_val = str_val.replace("x 10", "E")
+        if "*10" in str_val:
+            str_val = str_val.replace("*10", "E")
+        if "* 10" in str_val:
+            str_val = str_val.replace("* 10", "E")
+        if "\\times10^" in str_val:
+            str_val = str_val.replace("\\times10", "E")
+        if "\\times 10^" in str_val:
+            str_val = str_val.replace("\\times 10", "E")
+        if str_val[:3] == "10^":
+            # directly starts with power of 10 and previous test would fail and next one would destroy value...
+            # replace
+            str_val = str_val.replace("10^", "1E")
+        if "^" in str_val:
+            str_val = str_val.replace("^", "")
+        if "{" in str_val and "}" in str_val:
+            str_val = str_val.replace("{", "")
+            str_val = str_val.replace("}", "")
+
+        return float(str_val.strip()) * multiplier
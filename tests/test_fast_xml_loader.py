@@ -0,0 +1,103 @@
+
+import random
+import shutil
+import tempfile
+import unittest
+
+from ChartInfo.data.image_info import ImageInfo
+from ChartInfo.data.bar_data import BarData
+from ChartInfo.data.box_data import BoxData
+from ChartInfo.data.box_values import BoxValues
+from ChartInfo.data.line_data import LineData
+from ChartInfo.data.scatter_data import ScatterData
+from ChartInfo.data.fast_xml_loader import FastXMLLoader
+
+
+class TestFastXMLLoader(unittest.TestCase):
+    # the fast loader must produce exactly the same annotations as ImageInfo.FromXML for every data class
+
+    DemoAnnotation = "data/annotations/demo_chart.xml"
+
+    def setUp(self):
+        self.tempo_dir = tempfile.mkdtemp()
+        self.rnd = random.Random(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempo_dir)
+
+    def save_with_data(self, data):
+        # the demo annotation (text, legend and axes) with different data
+        image_info = ImageInfo.FromXML(TestFastXMLLoader.DemoAnnotation, None)
+        image_info.panels[0].data = data
+
+        filename = self.tempo_dir + "/annotation.xml"
+        with open(filename, "w") as out_file:
+            out_file.write(image_info.to_XML())
+
+        return filename
+
+    def check_same_annotation(self, filename):
+        original_xml = ImageInfo.FromXML(filename, None).to_XML()
+
+        self.assertEqual(original_xml, FastXMLLoader.LoadImageInfo(filename, None).to_XML())
+        self.assertEqual(original_xml, FastXMLLoader.LoadImageInfo(filename, None, lazy=True).to_XML())
+
+    def random_value(self):
+        # integers, short and long floats (as written by str)
+        return self.rnd.choice([self.rnd.randint(-50, 500), round(self.rnd.random() * 500, 1),
+                                self.rnd.random() * 500])
+
+    def test_demo_annotation(self):
+        self.check_same_annotation(TestFastXMLLoader.DemoAnnotation)
+
+    def test_bar_data(self):
+        data = BarData([None] * 4, [None] * 7, True, BarData.GroupingByDataSeries, 1.5, 10.0, 0.5, 12.0)
+        data.bar_lengths = [[self.random_value() for cat_idx in range(7)] for s_idx in range(4)]
+
+        filename = self.save_with_data(data)
+        self.check_same_annotation(filename)
+
+    def test_box_data(self):
+        data = BoxData([None] * 3, [None] * 5, False, BoxData.GroupingByCategory, 1.5, 10.0, 0.5, 12.0)
+        for s_idx in range(3):
+            for cat_idx in range(5):
+                values = sorted([self.random_value() for value_idx in range(5)])
+                data.boxes[s_idx][cat_idx] = BoxValues(values[1], values[2], values[3], values[0], values[4])
+
+        filename = self.save_with_data(data)
+        self.check_same_annotation(filename)
+
+        # values in a different order than the one written by BoxValues.write_XML
+        with open(filename, "r") as in_file:
+            xml_content = in_file.read()
+
+        for tag in ["WhiskerMaximum", "BoxMedian"]:
+            xml_content = xml_content.replace("<" + tag + ">", "<Swapped" + tag + ">")
+            xml_content = xml_content.replace("</" + tag + ">", "</Swapped" + tag + ">")
+        xml_content = xml_content.replace("SwappedWhiskerMaximum", "BoxMedian")
+        xml_content = xml_content.replace("SwappedBoxMedian", "WhiskerMaximum")
+
+        with open(filename, "w") as out_file:
+            out_file.write(xml_content)
+
+        self.check_same_annotation(filename)
+
+    def test_line_data(self):
+        data = LineData([None] * 3)
+        for line_values in data.lines:
+            line_values.points = [(self.random_value(), self.random_value()) for point_idx in range(50)]
+
+        filename = self.save_with_data(data)
+        self.check_same_annotation(filename)
+
+    def test_scatter_data(self):
+        data = ScatterData([None] * 2)
+        for scatter_values in data.scatter_values:
+            scatter_values.points = [(self.random_value(), self.random_value()) for point_idx in range(50)]
+
+        filename = self.save_with_data(data)
+        self.check_same_annotation(filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from chart_json_export import prepare_json_incremental
+
+
+class TestJSONExportIncremental(unittest.TestCase):
+    # a second incremental export must not export again the annotations which did not change
+
+    DemoImage = "data/images/demo_chart.png"
+    DemoAnnotation = "data/annotations/demo_chart.xml"
+
+    def setUp(self):
+        self.tempo_dir = tempfile.mkdtemp()
+
+        self.img_folder = self.tempo_dir + "/images"
+        self.xml_folder = self.tempo_dir + "/annotations"
+        self.json_folder = self.tempo_dir + "/json/"
+        self.errors_filename = self.tempo_dir + "/errors.csv"
+
+        os.makedirs(self.img_folder)
+        os.makedirs(self.xml_folder)
+
+        # single panel chart (exported) ...
+        shutil.copy(TestJSONExportIncremental.DemoImage, self.img_folder + "/single_panel.png")
+        shutil.copy(TestJSONExportIncremental.DemoAnnotation, self.xml_folder + "/single_panel.xml")
+
+        # multi-panel chart (skipped by the exporter, no output file is saved) ...
+        shutil.copy(TestJSONExportIncremental.DemoImage, self.img_folder + "/multi_panel.png")
+        tree = ET.parse(TestJSONExportIncremental.DemoAnnotation)
+        xml_panels_root = tree.getroot().find("Panels")
+        xml_panels_root.append(ET.fromstring(ET.tostring(xml_panels_root[0])))
+        tree.write(self.xml_folder + "/multi_panel.xml")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempo_dir)
+
+    def export(self):
+        return prepare_json_incremental(self.img_folder, self.xml_folder, self.json_folder, self.errors_filename,
+                                        task_num=7, mask_output=False)
+
+    def test_unchanged_annotations(self):
+        self.assertEqual(2, self.export())
+        self.assertTrue(os.path.exists(self.json_folder + "/single_panel.json"))
+        self.assertFalse(os.path.exists(self.json_folder + "/multi_panel.json"))
+
+        # nothing changed ... nothing is exported again
+        self.assertEqual(0, self.export())
+
+    def test_removed_output(self):
+        self.assertEqual(2, self.export())
+
+        # only the annotation which lost its output file is exported again
+        os.remove(self.json_folder + "/single_panel.json")
+        self.assertEqual(1, self.export())
+        self.assertTrue(os.path.exists(self.json_folder + "/single_panel.json"))
+        self.assertEqual(0, self.export())
+
+
+if __name__ == "__main__":
+    unittest.main()
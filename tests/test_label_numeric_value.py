@@ -0,0 +1,156 @@
+
+import math
+import random
+import unittest
+
+from ChartInfo.data.axis_values import AxisValues
+
+from tests.baseline_label_parser import BaselineLabelParser
+
+
+def parse_result(parse_function, str_val):
+    # (value, None) or (None, error type)
+    try:
+        return parse_function(str_val), None
+    except Exception as e:
+        return None, type(e)
+
+
+def generate_structured_labels(rnd, total_labels):
+    # labels combining the formats handled by the parser (separators, units, multipliers, notations)
+    prefixes = ["", "", "", "-", "+", "$", "~", "<", " ", "usd ", "\t"]
+    suffixes = ["", "", "", "%", "k", "K", "x", " ms", "mm", "m", "cm", "s", "€", "£", " times", "x10^3",
+                " x 10^{-2}", "*10^5", "\\times10^{4}", "\\times 10^{2}", "^2", " ", "a", "\n", "e3", "."]
+
+    labels = []
+    for idx in range(total_labels):
+        integer_part = str(rnd.choice([0, 1, 5, 10, 12, 100, 250, 1000, 12345, 1234567, rnd.randint(0, 10 ** 7)]))
+        number_format = rnd.randint(0, 7)
+        if number_format == 0:
+            number = integer_part
+        elif number_format == 1:
+            number = integer_part + "." + str(rnd.randint(0, 999))
+        elif number_format == 2:
+            number = "{0:,d}".format(int(integer_part))
+        elif number_format == 3:
+            number = "{0:,d}".format(int(integer_part)).replace(",", ".")
+        elif number_format == 4:
+            number = "{0:,d}".format(int(integer_part)).replace(",", ".") + "," + str(rnd.randint(0, 99))
+        elif number_format == 5:
+            number = "{0:,.2f}".format(int(integer_part) / 100.0)
+        elif number_format == 6:
+            number = integer_part + "."
+        else:
+            number = "." + str(rnd.randint(0, 99))
+
+        if rnd.random() < 0.05:
+            label = "10^" + str(rnd.randint(-3, 6))
+        else:
+            label = rnd.choice(prefixes) + number + rnd.choice(suffixes)
+
+        if rnd.random() < 0.2:
+            label = label.upper()
+
+        labels.append(label)
+
+    return labels
+
+
+def generate_random_labels(rnd, total_labels):
+    # arbitrary short strings over the characters (and tokens) that are meaningful for the parser
+    tokens = list("0123456789") * 3 + list(",.-+ %kKxXmse^{}$~<>=*/") + ["\\times", "10^", "usd", "€", "£", "\t",
+                                                                         "inf", "nan", "_", " "]
+
+    labels = []
+    for idx in range(total_labels):
+        length = rnd.randint(0, 10)
+        labels.append("".join([rnd.choice(tokens) for token_idx in range(length)]))
+
+    return labels
+
+
+class TestLabelNumericValue(unittest.TestCase):
+    # the memoized parser (with its fast path for plain numbers) must behave exactly like the original parser
+
+    # (label, expected value) ... None if the label cannot be parsed
+    ExpectedValues = [
+        ("0", 0.0),
+        ("12", 12.0),
+        ("-3.5", -3.5),
+        ("+7", 7.0),
+        (" 42 ", 42.0),
+        (".25", 0.25),
+        ("5.", 5.0),
+        ("1,234", 1234.0),
+        ("1,23", 1.23),
+        ("1,234,567", 1234567.0),
+        ("1.234.567", 1234567.0),
+        ("1.234,56", 1234.56),
+        ("1,234.56", 1234.56),
+        ("50%", 0.5),
+        ("2k", 2000.0),
+        ("1.5K", 1500.0),
+        ("$12", 12.0),
+        ("USD 100", 100.0),
+        ("10 ms", 10.0),
+        ("25mm", 25.0),
+        ("3x", 3.0),
+        ("~40", 40.0),
+        ("<5", 5.0),
+        ("10^3", 1000.0),
+        ("2x10^3", 2000.0),
+        ("5 x 10^{-2}", 0.05),
+        ("3*10^2", 300.0),
+        ("4\\times10^{2}", 400.0),
+        ("1e3", 1000.0),
+        ("", None),
+        ("abc", None),
+        ("1,2,3.4.5", None),
+        ("1.2.3,4,5", None),
+        ("1 2", 12.0),
+    ]
+
+    def assertSameResult(self, str_val, expected, result):
+        expected_value, expected_error = expected
+        value, error = result
+
+        self.assertEqual(expected_error, error, "Different errors for " + repr(str_val))
+        if expected_error is None:
+            if math.isnan(expected_value):
+                self.assertTrue(math.isnan(value), "Expected nan for " + repr(str_val))
+            else:
+                self.assertEqual(expected_value, value, "Different values for " + repr(str_val))
+
+    def check_labels(self, labels):
+        AxisValues.LabelNumericValue.cache_clear()
+
+        for str_val in labels:
+            expected = parse_result(BaselineLabelParser.LabelNumericValue, str_val)
+
+            self.assertSameResult(str_val, expected, parse_result(AxisValues.ParseLabelNumericValue, str_val))
+            # first call (parsed) and second call (from the cache)
+            self.assertSameResult(str_val, expected, parse_result(AxisValues.LabelNumericValue, str_val))
+            self.assertSameResult(str_val, expected, parse_result(AxisValues.LabelNumericValue, str_val))
+
+    def test_expected_values(self):
+        for str_val, expected_value in TestLabelNumericValue.ExpectedValues:
+            value, error = parse_result(AxisValues.LabelNumericValue, str_val)
+
+            if expected_value is None:
+                self.assertIsNotNone(error, "Expected an error for " + repr(str_val))
+            else:
+                self.assertIsNone(error, "Unexpected error for " + repr(str_val))
+                self.assertAlmostEqual(expected_value, value, msg="Wrong value for " + repr(str_val))
+
+        # the table must also hold for the original parser
+        self.check_labels([str_val for str_val, expected_value in TestLabelNumericValue.ExpectedValues])
+
+    def test_structured_labels(self):
+        self.check_labels(generate_structured_labels(random.Random(0), 20000))
+
+    def test_random_labels(self):
+        self.check_labels(generate_random_labels(random.Random(1), 50000))
+
+
+if __name__ == "__main__":
+    unittest.main()
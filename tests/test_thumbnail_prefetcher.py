@@ -0,0 +1,63 @@
+
+import shutil
+import tempfile
+import time
+import unittest
+
+from ChartInfo.annotation.thumbnail_prefetcher import ThumbnailPrefetcher
+
+
+class TestThumbnailPrefetcher(unittest.TestCase):
+    # the preview and the status summary of each image are loaded independently
+
+    DemoImage = "data/images/demo_chart.png"
+    DemoAnnotation = "data/annotations/demo_chart.xml"
+
+    def setUp(self):
+        self.tempo_dir = tempfile.mkdtemp()
+        shutil.copy(TestThumbnailPrefetcher.DemoImage, self.tempo_dir + "/demo_chart.png")
+
+        self.prefetcher = ThumbnailPrefetcher(self.tempo_dir, 64, 64)
+
+    def tearDown(self):
+        self.prefetcher.stop()
+        shutil.rmtree(self.tempo_dir)
+
+    def get_single_result(self, annotation_filename):
+        self.prefetcher.set_requests([("/demo_chart.png", annotation_filename, True, True)])
+
+        start_time = time.time()
+        results = []
+        while len(results) == 0 and time.time() - start_time < 10.0:
+            time.sleep(0.01)
+            results = self.prefetcher.get_results()
+
+        self.assertEqual(1, len(results))
+        return results[0]
+
+    def test_valid_annotation(self):
+        chart_path, preview, signature, summary = self.get_single_result(TestThumbnailPrefetcher.DemoAnnotation)
+
+        self.assertEqual("/demo_chart.png", chart_path)
+        self.assertIsNotNone(preview)
+        self.assertIsNotNone(signature)
+        self.assertIsNotNone(summary)
+
+    def test_invalid_annotation(self):
+        # partially written annotation ... the preview must still be sent back
+        annotation_filename = self.tempo_dir + "/demo_chart.xml"
+        with open(TestThumbnailPrefetcher.DemoAnnotation, "r") as in_file:
+            xml_content = in_file.read()
+        with open(annotation_filename, "w") as out_file:
+            out_file.write(xml_content[:len(xml_content) // 2])
+
+        chart_path, preview, signature, summary = self.get_single_result(annotation_filename)
+
+        self.assertEqual("/demo_chart.png", chart_path)
+        self.assertIsNotNone(preview)
+        self.assertEqual(3, len(preview.shape))
+        self.assertIsNone(summary)
+
+
+if __name__ == "__main__":
+    unittest.main()